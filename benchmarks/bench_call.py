@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_call
+~~~~~~~~~~~~~~~~
+cost per call of LoxFunction reusing pooled environments against
+allocating and binding one per call, as it used to
+"""
+import sys
+import time
+from pylox.environment import Environment
+from pylox.interpreter import Interpreter
+from pylox.loxfunction import LoxFunction
+from pylox.parser import Parser
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner
+
+CALLS = {
+    "no arguments": "fun f() {{ return 1; }} for (var i = 0; i < {0}; i = i + 1) f();",
+    "two arguments": "fun f(a, b) {{ var c = a + b; return c; }} "
+                     "for (var i = 0; i < {0}; i = i + 1) f(i, 1);",
+    "four arguments": "fun f(a, b, c, d) {{ return d; }} "
+                      "for (var i = 0; i < {0}; i = i + 1) f(i, i, i, i);",
+}
+
+
+class AllocatingFunction(LoxFunction):
+    """ LoxFunction allocating an environment for every call """
+    def call(self, interpreter, arguments):
+        environment = Environment(self.closure, self._declaration.slots)
+        for i in range(len(arguments)):
+            environment.slots[i] = arguments[i]
+        interpreter.execute_block(self._declaration.body, environment)
+        return interpreter.return_value
+
+    def arity(self):
+        return len(self._declaration.params)
+
+
+class AllocatingInterpreter(Interpreter):
+    """ Interpreter declaring AllocatingFunctions """
+    def visit_function_stmt(self, stmt):
+        function = AllocatingFunction(stmt, self.environment)
+        if stmt.slot is None:
+            self.globals.define(stmt.name.lexeme, function)
+        else:
+            self.environment.slots[stmt.slot] = function
+
+
+def bench(interpreter_class, statements, repeat):
+    """
+    :param interpreter_class: Interpreter or a subclass
+    :param statements: resolved statements
+    :param repeat: number of runs
+    :return: best seconds
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        interpreter_class().interpret(statements)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """ Main """
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for name, source in CALLS.items():
+        source = source.format(calls)
+        statements = list(Resolver(print).resolve(
+            Parser(Scanner(source).scan_tokens(), print).parse()))
+        before = bench(AllocatingInterpreter, statements, 5)
+        after = bench(Interpreter, statements, 5)
+        print("{:<16} allocating: {:5.2f}us/call pooled: {:5.2f}us/call {:5.2f}x".format(
+            name, before * 1e6 / calls, after * 1e6 / calls, before / after))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_callcache
+~~~~~~~~~~~~~~~~
+cost per call of the Interpreter with inline caches at call sites against
+checking the callee on every call, as it used to, and the hit rates
+"""
+import io
+import sys
+import time
+import contextlib
+from pylox.error import LoxRuntimeError
+from pylox.interpreter import Interpreter
+from pylox.loxcallable import LoxCallable
+from pylox.parser import Parser
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner
+
+CALLS = {
+    "monomorphic": "fun f(a) {{ return a; }} for (var i = 0; i < {0}; i = i + 1) f(i);",
+    "fib": "fun fib(n) {{ if (n < 2) return n; return fib(n - 1) + fib(n - 2); }} "
+           "var i = 0; while (i < {0}) i = i + fib(10) * 0 + 177;",
+    "polymorphic": "fun f(a) {{ return a; }} fun g(a) {{ return a; }} fun h(a) {{ return a; }} "
+                   "fun call(x, a) {{ return x(a); }} for (var i = 0; i < {0}; i = i + 3) "
+                   "{{ call(f, i); call(g, i); call(h, i); }}",
+}
+
+
+class UncachedInterpreter(Interpreter):
+    """ Interpreter checking the callee of every call """
+    def visit_call_expr(self, expr):
+        callee = self._evaluate(expr.callee)
+        arguments = [self._evaluate(argument) for argument in expr.arguments]
+        if not isinstance(callee, LoxCallable):
+            raise LoxRuntimeError(expr.paren, "Can only call functions and classes.")
+        arity = callee.arity()
+        if len(arguments) != arity:
+            raise LoxRuntimeError(expr.paren, "Expected {} arguments, but got {}.".format(
+                arity, len(arguments)))
+        try:
+            return callee.call(self, arguments)
+        except RecursionError:
+            raise LoxRuntimeError(expr.paren, "Stack overflow.")
+
+
+def bench(interpreter_class, source, repeat):
+    """
+    :param interpreter_class: Interpreter or a subclass
+    :param source: lox source
+    :param repeat: number of runs
+    :return: best seconds and the statistics of the last run
+    """
+    best = None
+    for _ in range(repeat):
+        statements = list(Resolver(print).resolve(
+            Parser(Scanner(source).scan_tokens(), print).parse()))
+        interpreter = interpreter_class()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.interpret(statements)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, interpreter.statistics()
+
+
+def main():
+    """ Main """
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 60000
+    for name, source in CALLS.items():
+        source = source.format(calls)
+        before, _ = bench(UncachedInterpreter, source, 5)
+        after, statistics = bench(Interpreter, source, 5)
+        print("{:<12} checked: {:7.3f}s cached: {:7.3f}s {:5.2f}x hit rate {:6.1%}".format(
+            name, before, after, before / after, statistics["call cache hit rate"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_collection
+~~~~~~~~~~~~~~~~
+time of building a series of numbers and reading every element, kept in a
+chain of closures as lox had to before lists, against in a list, in every
+engine
+"""
+import sys
+import time
+from pylox.lox import Lox, ENGINES
+
+# each element is a closure returning the element at an index, O(n) to read
+CHAIN = """
+fun empty(i) {{ return nil; }}
+fun cons(head, tail) {{
+  fun at(i) {{ if (i == 0) return head; return tail(i - 1); }}
+  return at;
+}}
+var xs = empty;
+for (var i = 0; i < {size}; i = i + 1) xs = cons(i, xs);
+var s = 0;
+for (var i = 0; i < {size}; i = i + 1) s = s + xs(i);
+"""
+LIST = """
+var xs = [];
+for (var i = 0; i < {size}; i = i + 1) append(xs, i);
+var s = 0;
+for (var i = 0; i < {size}; i = i + 1) s = s + xs[i];
+"""
+
+
+def bench(engine, source):
+    """
+    :param engine: name of the engine
+    :param source: lox source
+    :return: seconds
+    """
+    lox = Lox(engine=engine)
+    start = time.perf_counter()
+    lox.run(source)
+    return time.perf_counter() - start
+
+
+def main():
+    """ Main """
+    # the chain recurses once per element, so stays under the recursion limit
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    for engine in ENGINES:
+        chain = bench(engine, CHAIN.format(size=size))
+        listed = bench(engine, LIST.format(size=size))
+        print("{:<8} closure chain: {:7.3f}s list: {:7.4f}s {:8.1f}x".format(
+            engine, chain, listed, chain / listed))
+
+
+if __name__ == "__main__":
+    main()
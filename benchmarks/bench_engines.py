@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_engines
+~~~~~~~~~~~~~~~~
+time to run the example/ programs, and a recursive fib, on every engine
+"""
+import io
+import sys
+import glob
+import time
+import contextlib
+from pylox.lox import Lox, ENGINES
+
+FIB = "fun fib(n) {{ if (n < 2) return n; return fib(n - 1) + fib(n - 2); }} print fib({0});"
+
+
+def bench(engine, source, repeat):
+    """
+    best time to parse and run source, with its output discarded
+    :param engine: engine name
+    :param source: lox source
+    :param repeat: number of runs
+    :return: seconds
+    """
+    best = None
+    for _ in range(repeat):
+        lox = Lox(engine=engine)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            lox.run(source)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """ Main """
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    programs = {}
+    for path in sorted(glob.glob("example/*.lox")):
+        with open(path) as content:
+            programs[path] = (content.read(), repeat)
+    programs["fib(20)"] = (FIB.format(20), 3)
+    for name, (source, runs) in programs.items():
+        baseline = None
+        for engine in ENGINES:
+            elapsed = bench(engine, source, runs)
+            baseline = baseline or elapsed
+            print("{:<24} {:<8} {:9.3f}ms {:6.2f}x".format(
+                name, engine, elapsed * 1000, baseline / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_loop
+~~~~~~~~~~~~~~~~
+Environment allocations and time of for loops run as a For node against
+the While loop they used to be desugared into
+"""
+import sys
+import time
+import pylox.interpreter
+import pylox.stmt as Stmt
+from pylox.environment import Environment
+from pylox.interpreter import Interpreter
+from pylox.parser import Parser
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner
+
+LOOPS = {
+    "empty body": "for (var i = 0; i < {0}; i = i + 1) {{ }}",
+    "no declarations": "var sum = 0; for (var i = 0; i < {0}; i = i + 1) {{ sum = sum + i; }}",
+    "declarations": "for (var i = 0; i < {0}; i = i + 1) {{ var j = 2; j = j + 1; }}",
+}
+
+
+class CountingEnvironment(Environment):
+    """ Environment counting its instances """
+    count = 0
+
+    def __init__(self, enclosing=None, size=0):
+        CountingEnvironment.count += 1
+        super().__init__(enclosing, size)
+
+
+def desugar(statement):
+    """
+    the While loop the Parser used to build for a For
+    :param statement: statement
+    :return: statement
+    """
+    if not isinstance(statement, Stmt.For):
+        return statement
+    body = statement.body
+    if statement.increment is not None:
+        body = Stmt.Block([body, Stmt.Expression(statement.increment)])
+    body = Stmt.While(statement.condition, body)
+    if statement.initializer is not None:
+        body = Stmt.Block([statement.initializer, body])
+    return body
+
+
+def bench(source, transform):
+    """
+    run source once
+    :param source: lox source
+    :param transform: applied to each parsed statement
+    :return: (seconds, environments allocated)
+    """
+    statements = [transform(statement)
+                  for statement in Parser(Scanner(source).scan_tokens(), print).parse()]
+    statements = list(Resolver(print).resolve(statements))
+    CountingEnvironment.count = 0
+    start = time.perf_counter()
+    Interpreter().interpret(statements)
+    return time.perf_counter() - start, CountingEnvironment.count
+
+
+def main():
+    """ Main """
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    pylox.interpreter.Environment = CountingEnvironment
+    print("{} iterations".format(iterations))
+    for name, loop in LOOPS.items():
+        source = loop.format(iterations)
+        before, before_count = bench(source, desugar)
+        after, after_count = bench(source, lambda statement: statement)
+        print("{:<16} while: {:7.3f}s {:8} environments   for: {:7.3f}s {:8} environments".format(
+            name, before, before_count, after, after_count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_memoize
+~~~~~~~~~~~~~~~~
+time of the tree-walking Interpreter with and without memoizing the
+functions found pure, and the memo hit rates
+"""
+import io
+import sys
+import time
+import contextlib
+from pylox.lox import Lox
+
+PROGRAMS = {
+    "fib": "fun fib(n) {{ if (n < 2) return n; return fib(n - 1) + fib(n - 2); }} print fib({0});",
+    "parity": "fun isOdd(n) {{ if (n == 0) return false; return isEven(n - 1); }} "
+              "fun isEven(n) {{ if (n == 0) return true; return isOdd(n - 1); }} "
+              "for (var i = 0; i < {0} * 50; i = i + 1) isEven(i - i / 20 * 20 + 40);",
+    "impure": "var total = 0; fun add(n) {{ total = total + n; return total; }} "
+              "for (var i = 0; i < {0} * 1000; i = i + 1) add(1);",
+}
+
+
+def bench(source, memoize):
+    """
+    :param source: lox source
+    :param memoize: memoize the pure functions
+    :return: seconds and the statistics
+    """
+    lox = Lox(memoize=memoize)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        lox.run(source)
+    return time.perf_counter() - start, lox.statistics()
+
+
+def main():
+    """ Main """
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for name, program in PROGRAMS.items():
+        source = program.format(size)
+        plain, _ = bench(source, False)
+        memoized, statistics = bench(source, True)
+        print("{:<8} plain: {:7.3f}s memoized: {:7.3f}s {:6.2f}x memo hit rate {:6.1%}".format(
+            name, plain, memoized, plain / memoized, statistics["memo hit rate"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_native
+~~~~~~~~~~~~~~~~
+cost per call of a native function against the same function written in
+lox, in every engine
+"""
+import sys
+import time
+from pylox.lox import Lox, ENGINES
+
+CALLS = {
+    "native": "for (var i = 0; i < {0}; i = i + 1) abs(-i);",
+    "lox": "fun loxAbs(n) {{ if (n < 0) return -n; return n; }} "
+           "for (var i = 0; i < {0}; i = i + 1) loxAbs(-i);",
+}
+
+
+def bench(engine, source):
+    """
+    :param engine: name of the engine
+    :param source: lox source
+    :return: seconds
+    """
+    lox = Lox(engine=engine)
+    start = time.perf_counter()
+    lox.run(source)
+    return time.perf_counter() - start
+
+
+def main():
+    """ Main """
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for engine in ENGINES:
+        native, lox = (bench(engine, CALLS[name].format(calls)) for name in ("native", "lox"))
+        print("{:<8} native: {:5.2f}us/call lox: {:5.2f}us/call".format(
+            engine, native * 1e6 / calls, lox * 1e6 / calls))
+
+
+if __name__ == "__main__":
+    main()
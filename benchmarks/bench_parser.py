@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_parser
+~~~~~~~~~~~~~~~~
+parse throughput of the recursive descent Parser against the PrattParser
+"""
+import sys
+import time
+from pylox.parser import Parser
+from pylox.prattparser import PrattParser
+from pylox.scanner import Scanner
+
+STATEMENT = "var x{0} = -a * (b + {0}) / c - d({0}, e or f and g) >= h == !i;\n"
+
+
+def bench(parser_class, tokens, repeat):
+    """
+    best time to parse tokens
+    :param parser_class: Parser or a subclass
+    :param tokens: scanned tokens
+    :param repeat: number of runs
+    :return: seconds
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser_class(tokens, print).parse()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """ Main """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source = "".join(STATEMENT.format(i) for i in range(count))
+    tokens = Scanner(source).scan_tokens_bulk()
+    print("{} statements, {} tokens".format(count, len(tokens)))
+    baseline = None
+    for parser_class in (Parser, PrattParser):
+        elapsed = bench(parser_class, tokens, 5)
+        baseline = baseline or elapsed
+        print("{:<12} {:8.3f}s {:10.0f} tokens/s {:6.2f}x".format(
+            parser_class.__name__, elapsed, len(tokens) / elapsed, baseline / elapsed))
+
+    depth = 100000
+    tokens = Scanner("(" * depth + "1" + ")" * depth + ";").scan_tokens_bulk()
+    PrattParser(tokens, print).parse()
+    print("PrattParser parsed {} nested parentheses".format(depth))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_property
+~~~~~~~~~~~~~~~~
+time of a loop reading and writing fields and calling methods, with the
+inline caches of property sites against with every site uncached, in
+every engine
+"""
+import sys
+import time
+from pylox.inlinecache import PropertyCache
+from pylox.lox import Lox
+
+SOURCE = """
+class Particle {{
+  init(x, v) {{ this.x = x; this.v = v; }}
+  step() {{ this.x = this.x + this.v; }}
+}}
+var p = Particle(0, 1);
+for (var i = 0; i < {size}; i = i + 1) p.step();
+print p.x;
+"""
+
+
+def bench(engine, size, max_rebinds):
+    """
+    :param engine: name of the engine
+    :param size: number of steps
+    :param max_rebinds: shape changes before a site stops caching, 0 to
+    cache none
+    :return: seconds
+    """
+    lox = Lox(engine=engine)
+    lox.interpreter.property_cache = PropertyCache(max_rebinds)
+    start = time.perf_counter()
+    lox.run(SOURCE.format(size=size))
+    return time.perf_counter() - start
+
+
+def main():
+    """ Main """
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for engine in ("tree", "closure", "vm", "python"):
+        uncached = bench(engine, size, 0)
+        cached = bench(engine, size, PropertyCache().max_rebinds)
+        print("{:<8} uncached: {:7.3f}s cached: {:7.3f}s {:8.2f}x".format(
+            engine, uncached, cached, uncached / cached))
+
+
+if __name__ == "__main__":
+    main()
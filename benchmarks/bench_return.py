@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_return
+~~~~~~~~~~~~~~~~
+call rate of deeply recursive functions when returns are signalled by the
+RETURN completion against raising an exception, as they used to be
+"""
+import sys
+import time
+from pylox.environment import Environment
+from pylox.interpreter import Interpreter
+from pylox.loxfunction import LoxFunction
+from pylox.parser import Parser
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner
+
+SOURCE = """
+fun isOdd(n) {{ if (n == 0) return false; return isEven(n - 1); }}
+fun isEven(n) {{ if (n == 0) return true; return isOdd(n - 1); }}
+for (var i = 0; i < {0}; i = i + 1) isEven({1});
+"""
+
+
+class Return(RuntimeError):
+    """ return statement run """
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+
+class RaisingFunction(LoxFunction):
+    """ LoxFunction catching the Return its body raises """
+    def call(self, interpreter, arguments):
+        environment = Environment(self.closure, self._declaration.slots)
+        for i in range(len(arguments)):
+            environment.slots[i] = arguments[i]
+        try:
+            interpreter.execute_block(self._declaration.body, environment)
+        except Return as return_error:
+            return return_error.value
+        return None
+
+
+class RaisingInterpreter(Interpreter):
+    """ Interpreter raising Return from return statements """
+    def visit_return_stmt(self, stmt):
+        raise Return(None if stmt.value is None else self._evaluate(stmt.value))
+
+    def visit_function_stmt(self, stmt):
+        function = RaisingFunction(stmt, self.environment)
+        if stmt.slot is None:
+            self.globals.define(stmt.name.lexeme, function)
+        else:
+            self.environment.slots[stmt.slot] = function
+
+
+def bench(interpreter_class, statements, repeat):
+    """
+    :param interpreter_class: Interpreter or a subclass
+    :param statements: resolved statements
+    :param repeat: number of runs
+    :return: best seconds
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        interpreter_class().interpret(statements)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """ Main """
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    runs = 200
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 50 * depth))
+    source = SOURCE.format(runs, depth)
+    statements = list(Resolver(print).resolve(Parser(Scanner(source).scan_tokens(), print).parse()))
+    calls = runs * (depth + 1)
+    baseline = None
+    for name, interpreter_class in (("exception", RaisingInterpreter),
+                                    ("completion", Interpreter)):
+        elapsed = bench(interpreter_class, statements, 3)
+        baseline = baseline or elapsed
+        print("{:<12} {:7.3f}s {:9.0f} calls/s {:5.2f}x".format(
+            name, elapsed, calls / elapsed, baseline / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_rope
+~~~~~~~~~~~~~~~~
+time of building a string a piece at a time in a lox loop, with + making
+ropes against joining at once, in every engine
+"""
+import sys
+import time
+import pylox.rope
+from pylox.lox import Lox, ENGINES
+
+SOURCE = """
+var s = "";
+for (var i = 0; i < {size}; i = i + 1) s = s + "piece " + str(i) + ", ";
+print len(s);
+"""
+
+
+def bench(engine, size, rope_min):
+    """
+    :param engine: name of the engine
+    :param size: number of pieces
+    :param rope_min: shortest string kept as a rope
+    :return: seconds
+    """
+    pylox.rope.ROPE_MIN = rope_min
+    lox = Lox(engine=engine)
+    start = time.perf_counter()
+    lox.run(SOURCE.format(size=size))
+    return time.perf_counter() - start
+
+
+def main():
+    """ Main """
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rope_min = pylox.rope.ROPE_MIN
+    for engine in ENGINES:
+        joined = bench(engine, size, float("inf"))
+        roped = bench(engine, size, rope_min)
+        print("{:<8} joined: {:7.3f}s rope: {:7.3f}s {:8.1f}x".format(
+            engine, joined, roped, joined / roped))
+    pylox.rope.ROPE_MIN = rope_min
+
+
+if __name__ == "__main__":
+    main()
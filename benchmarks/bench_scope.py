@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_scope
+~~~~~~~~~~~~~~~~
+Environment allocations and time of loops whose blocks declare nothing, run
+in the enclosing scope against given a scope each, as before scope elision
+"""
+import sys
+import time
+import pylox.interpreter
+from pylox.environment import Environment
+from pylox.interpreter import Interpreter
+from pylox.parser import Parser
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner
+
+LOOPS = {
+    "while body": "var i = 0; while (i < {0}) {{ i = i + 1; }}",
+    "if blocks": "var s = 0; var i = 0; while (i < {0}) {{ \
+        if (i > 1) {{ s = s + i; }} else {{ s = s - 1; }} i = i + 1; }}",
+    "nested blocks": "fun f(n) {{ var i = 0; while (i < n) {{ {{ {{ i = i + 1; }} }} }} return i; }} \
+        f({0});",
+}
+
+
+class CountingEnvironment(Environment):
+    """ Environment counting its instances """
+    count = 0
+
+    def __init__(self, enclosing=None, size=0):
+        CountingEnvironment.count += 1
+        super().__init__(enclosing, size)
+
+
+class ScopedResolver(Resolver):
+    """ Resolver giving every block a scope, as before scope elision """
+    def visit_block_stmt(self, stmt):
+        stmt.scoped = True
+        self._begin_scope()
+        self._resolve_statements(stmt.statements)
+        stmt.slots = self._end_scope()
+
+
+def bench(source, resolver):
+    """
+    run source once
+    :param source: lox source
+    :param resolver: Resolver class resolving it
+    :return: (seconds, environments allocated)
+    """
+    statements = Parser(Scanner(source).scan_tokens(), print).parse()
+    statements = list(resolver(print).resolve(statements))
+    CountingEnvironment.count = 0
+    start = time.perf_counter()
+    Interpreter().interpret(statements)
+    return time.perf_counter() - start, CountingEnvironment.count
+
+
+def main():
+    """ Main """
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    pylox.interpreter.Environment = CountingEnvironment
+    print("{} iterations".format(iterations))
+    for name, loop in LOOPS.items():
+        source = loop.format(iterations)
+        before, before_count = bench(source, ScopedResolver)
+        after, after_count = bench(source, Resolver)
+        print("{:<14} scoped: {:7.3f}s {:8} environments   elided: {:7.3f}s {:8} environments"
+              "   {:.2f}x".format(name, before, before_count, after, after_count, before / after))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_specialize
+~~~~~~~~~~~~~~~~
+time of the tree-walking Interpreter with and without specializing nodes,
+and its hit and deopt rates
+"""
+import io
+import sys
+import time
+import contextlib
+from pylox.lox import Lox
+from pylox.specializer import Specializer
+
+PROGRAMS = {
+    "fib": "fun fib(n) {{ if (n < 2) return n; return fib(n - 1) + fib(n - 2); }} print fib({0});",
+    "loop": "var s = 0; var i = 0; while (i < {0} * 1000) {{ s = s + i * 2; i = i + 1; }} print s;",
+    "strings": "var s = \"\"; for (var i = 0; i < {0} * 100; i = i + 1) {{ if (!(i > 5)) s = s + \"a\"; }}",
+}
+
+
+def bench(source, specializer):
+    """
+    :param source: lox source
+    :param specializer: Specializer of the Interpreter
+    :return: seconds
+    """
+    lox = Lox()
+    lox.interpreter.specializer = specializer
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        lox.run(source)
+    return time.perf_counter() - start
+
+
+def main():
+    """ Main """
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 18
+    for name, program in PROGRAMS.items():
+        source = program.format(size)
+        general = bench(source, Specializer(specialize_after=float("inf")))
+        specializer = Specializer()
+        specialized = bench(source, specializer)
+        statistics = specializer.statistics()
+        print("{:<8} general: {:7.3f}s specialized: {:7.3f}s {:5.2f}x "
+              "hit rate {:6.1%} deopt rate {:6.1%}".format(
+                  name, general, specialized, general / specialized,
+                  statistics["hit rate"], statistics["deopt rate"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_tailcall
+~~~~~~~~~~~~~~~~
+call rate of tail recursive functions run as proper tail calls against
+recursing on the Python stack, and the deepest recursion each can take
+"""
+import sys
+import time
+from pylox.interpreter import Interpreter
+from pylox.parser import Parser
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner
+
+SOURCE = """
+fun isOdd(n) {{ if (n == 0) return false; return isEven(n - 1); }}
+fun isEven(n) {{ if (n == 0) return true; return isOdd(n - 1); }}
+for (var i = 0; i < {0}; i = i + 1) isEven({1});
+"""
+
+
+def parse(source, tail):
+    """
+    :param source: lox source
+    :param tail: keep the tail calls the resolver found
+    :return: resolved statements
+    """
+    statements = list(Resolver(print).resolve(Parser(Scanner(source).scan_tokens(), print).parse()))
+    if not tail:
+        for statement in statements[:2]:
+            for body_statement in statement.body:
+                body_statement.tail = False
+    return statements
+
+
+def bench(source, tail):
+    """
+    :param source: lox source
+    :param tail: run tail calls in place
+    :return: seconds
+    """
+    statements = parse(source, tail)
+    start = time.perf_counter()
+    Interpreter().interpret(statements)
+    return time.perf_counter() - start
+
+
+def deepest(tail, limit=1 << 20):
+    """
+    :param tail: run tail calls in place
+    :param limit: deepest recursion tried
+    :return: deepest recursion that did not overflow
+    """
+    depth = 64
+    while depth < limit:
+        try:
+            Interpreter().interpret(parse(SOURCE.format(1, depth * 2), tail))
+        except Exception:
+            return depth
+        depth *= 2
+    return depth
+
+
+def main():
+    """ Main """
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    source = SOURCE.format(20000 // depth, depth)
+    recursing = bench(source, False)
+    tail = bench(source, True)
+    calls = 20000 // depth * (depth + 1)
+    print("recursing: {:5.2f}us/call tail calls: {:5.2f}us/call {:5.2f}x".format(
+        recursing * 1e6 / calls, tail * 1e6 / calls, recursing / tail))
+    print("deepest recursion: recursing {} tail calls {}+".format(
+        deepest(False), deepest(True)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench_vector
+~~~~~~~~~~~~~~~~
+time of scaling and summing a series of numbers an element at a time in a
+lox loop against in a few vector operations, in every engine
+"""
+import sys
+import time
+from pylox.lox import Lox, ENGINES
+from pylox.native import NativeFunction
+from pylox.vector import vector, numpy
+
+# x = 2 * x + 1 over the series, then its sum and dot product with itself
+SCALAR = """
+var s = 0; var d = 0;
+for (var i = 0; i < n; i = i + 1) {{ var x = 2 * at(i) + 1; s = s + x; d = d + x * x; }}
+"""
+VECTOR = "var x = 2 * series + 1; var s = sum(x); var d = dot(x, x);"
+
+
+def bench(engine, source, size):
+    """
+    :param engine: name of the engine
+    :param source: lox source
+    :param size: number of elements in the series
+    :return: seconds
+    """
+    lox = Lox(engine=engine)
+    numbers = [float(i % 100) for i in range(size)]
+    lox.interpreter.define("n", float(size))
+    lox.interpreter.define("series", vector(numbers))
+    lox.interpreter.define("at", NativeFunction("at", lambda i: numbers[int(i)], 1))
+    start = time.perf_counter()
+    lox.run(source)
+    return time.perf_counter() - start
+
+
+def main():
+    """ Main """
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print("backend: {}".format("numpy" if numpy is not None else "array('d')"))
+    for engine in ENGINES:
+        scalar = bench(engine, SCALAR.format(), size)
+        vectorized = bench(engine, VECTOR, size)
+        print("{:<8} scalar loop: {:7.3f}s vector: {:7.4f}s {:8.1f}x".format(
+            engine, scalar, vectorized, scalar / vectorized))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""
+pylox.__main__
+~~~~~~~~~~~~~~~~
+python -m pylox
+"""
+from pylox.lox import main
+
+main()
@@ -0,0 +1,101 @@
+"""
+pylox.batch
+~~~~~~~~~~~~~~~~
+check or compile many lox scripts in parallel
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pylox.cache import ASTCache, DEFAULT_DIRECTORY
+from pylox.error import locate
+from pylox.prattparser import PrattParser
+from pylox.scanner import Scanner
+
+COMMANDS = ("check", "compile")
+
+
+def find_scripts(paths):
+    """
+    expands directories and glob patterns into lox scripts
+    :param paths: files, directories or glob patterns
+    :return: list of script paths
+    """
+    scripts = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, files in os.walk(path):
+                scripts.extend(os.path.join(directory, name)
+                               for name in sorted(files) if name.endswith(".lox"))
+        elif os.path.exists(path):
+            scripts.append(path)
+        else:
+            scripts.extend(sorted(glob.glob(path, recursive=True)))
+    return scripts
+
+
+def check_file(path, cache_dir=None):
+    """
+    scans and parses a script, collecting every error instead of stopping
+    at the first one
+    :param path: script path
+    :param cache_dir: directory to cache the parsed script in, or None
+    :return: (path, list of (line, message), number of tokens)
+    """
+    diagnostics = []
+
+    def error(location, message):
+        line, where = locate(location)
+        diagnostics.append((line, "Error{}: {}".format(where, message)))
+
+    try:
+        with open(path) as content:
+            source = content.read()
+    except (OSError, UnicodeDecodeError) as read_error:
+        return path, [(0, str(read_error))], 0
+    tokens = Scanner(source, error).scan_tokens_bulk()
+    statements = PrattParser(tokens, error).parse()
+    if cache_dir and not diagnostics:
+        ASTCache(cache_dir).store(source, statements)
+    diagnostics.sort(key=lambda diagnostic: diagnostic[0])
+    return path, diagnostics, len(tokens)
+
+
+def main(argv):
+    """
+    pylox check|compile [paths]
+    :param argv: command and its arguments
+    :return: exit status
+    """
+    arg_parser = argparse.ArgumentParser(prog="pylox " + argv[0])
+    arg_parser.add_argument("paths", nargs="+", help="scripts, directories or glob patterns")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=None,
+                            help="worker processes, the number of CPUs by default")
+    if argv[0] == "compile":
+        arg_parser.add_argument("--cache-dir", default=DEFAULT_DIRECTORY,
+                                help="directory to cache parsed scripts in")
+    args = arg_parser.parse_args(argv[1:])
+    cache_dir = getattr(args, "cache_dir", None)
+
+    scripts = find_scripts(args.paths)
+    start = time.perf_counter()
+    failed = 0
+    tokens = 0
+    jobs = args.jobs or os.cpu_count() or 1
+    chunksize = max(1, len(scripts) // (4 * jobs))
+    with ProcessPoolExecutor(jobs) as executor:
+        results = executor.map(check_file, scripts, [cache_dir] * len(scripts),
+                               chunksize=chunksize)
+        for path, diagnostics, count in results:
+            tokens += count
+            if diagnostics:
+                failed += 1
+            for line, message in diagnostics:
+                print("{}:{}: {}".format(path, line, message))
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print("{} {} files, {} with errors, in {:.2f}s: {:.0f} files/s, {:.0f} tokens/s".format(
+        "checked" if argv[0] == "check" else "compiled", len(scripts), failed, elapsed,
+        len(scripts) / elapsed, tokens / elapsed), file=sys.stderr)
+    return 65 if failed else 0
@@ -0,0 +1,131 @@
+"""
+pylox.cache
+~~~~~~~~~~~~~~~~
+on-disk cache of parsed statements, keyed by the hash of the source, the
+pylox version and the definitions of the syntax tree nodes
+"""
+import os
+import pickle
+import hashlib
+import tempfile
+from pylox import __version__
+from pylox import expr, stmt
+
+DEFAULT_DIRECTORY = os.environ.get(
+    "PYLOX_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "pylox"))
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+SUFFIX = ".ast"
+
+
+def _schema():
+    """
+    :return: digest of the generated modules of the nodes pickled, so the
+    files of a build whose nodes differ are not loaded
+    """
+    digest = hashlib.sha256()
+    for module in (expr, stmt):
+        with open(module.__file__, "rb") as source:
+            digest.update(source.read())
+    return digest.digest()
+
+
+SCHEMA = _schema()
+
+
+class ASTCache:
+    """
+    Parsed statements pickled to one file per source. Files are written
+    atomically, so concurrent runs can share a directory, and the least
+    recently used are removed once the directory grows past max_size
+    """
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_size=DEFAULT_MAX_SIZE):
+        """
+        init
+        :param directory: cache directory, created when first written
+        :param max_size: size in bytes to evict cache files down to
+        """
+        self.directory = directory
+        self.max_size = max_size
+
+    def path(self, source):
+        """
+        :param source: lox source
+        :return: path of the cache file for source
+        """
+        digest = hashlib.sha256()
+        digest.update(__version__.encode())
+        digest.update(b"\0")
+        digest.update(SCHEMA)
+        digest.update(source.encode())
+        return os.path.join(self.directory, digest.hexdigest() + SUFFIX)
+
+    def load(self, source):
+        """
+        returns the cached statements for source
+        :param source: lox source
+        :return: statements or None if not cached
+        """
+        path = self.path(source)
+        try:
+            with open(path, "rb") as content:
+                statements = pickle.load(content)
+            # mark as recently used
+            os.utime(path)
+        except Exception:
+            # missing, unreadable, or written by a build whose classes differ
+            return None
+        return statements
+
+    def store(self, source, statements):
+        """
+        caches the statements parsed from source. Failing to write the cache
+        is not an error, the statements will just be parsed again next time
+        :param source: lox source
+        :param statements: parsed statements
+        :return: None
+        """
+        try:
+            data = pickle.dumps(statements, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, RecursionError):
+            return
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(descriptor, "wb") as content:
+                    content.write(data)
+                os.replace(temporary, self.path(source))
+            except OSError:
+                os.unlink(temporary)
+                raise
+            self.evict()
+        except OSError:
+            return
+
+    def evict(self):
+        """
+        removes the least recently used cache files until the cache is no
+        larger than max_size
+        :return: None
+        """
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
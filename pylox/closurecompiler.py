@@ -0,0 +1,601 @@
+"""
+pylox.closurecompiler
+~~~~~~~~~~~~~~~~
+execution engine compiling each resolved statement once into nested Python
+closures, so running it takes no accept/visit dispatch and no operator
+lookups
+"""
+import operator
+import pylox.stmt as Stmt
+from pylox.collection import new_map, get_index, set_index
+from pylox.environment import Environment
+from pylox.error import LoxRuntimeError
+from pylox.expr import Visitor
+from pylox.inlinecache import PropertyCache
+from pylox.interpreter import Interpreter
+from pylox.loxcallable import LoxCallable
+from pylox.loxclass import LoxClass, LoxInstance
+from pylox.native import NATIVES
+from pylox.rope import STRINGS, concat
+from pylox.resolver import SHARED_SCOPE, REUSED_SCOPE
+from pylox.scanner import TokenType
+from pylox.vector import Vector, arithmetic
+
+# comparisons and arithmetic taking two numbers
+_NUMBER_OPERATORS = {
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.MINUS: operator.sub,
+    TokenType.SLASH: operator.truediv,
+    TokenType.STAR: operator.mul,
+}
+
+_EQUALITY_OPERATORS = {
+    TokenType.EQUAL_EQUAL: operator.eq,
+    TokenType.BANG_EQUAL: operator.ne,
+}
+
+
+class CompiledFunction(LoxCallable):
+    """
+    CompiledFunction: a lox function whose body has been compiled
+    """
+    def __init__(self, declaration, body, closure, is_initializer=False):
+        """
+        init
+        :param declaration: Function statement
+        :param body: compiled body
+        :param closure: environment the function was declared in
+        :param is_initializer: the init method of a class, returning this
+        """
+        self._declaration = declaration
+        self._arity = len(declaration.params)
+        self._body = body
+        self.closure = closure
+        self._is_initializer = is_initializer
+
+    def bind(self, instance):
+        """
+        :param instance: LoxInstance
+        :return: the method with this bound to instance
+        """
+        environment = Environment(self.closure, 1)
+        environment.slots[0] = instance
+        return CompiledFunction(self._declaration, self._body, environment, self._is_initializer)
+
+    def arity(self):
+        """
+        returns arity
+        :return: int
+        """
+        return self._arity
+
+    def call(self, interpreter, arguments):
+        """
+        calls the function
+        :param interpreter: interpreter, unused
+        :param arguments: arguments
+        :return: the returned value
+        """
+        environment = Environment(self.closure, self._declaration.slots)
+        environment.slots[:self._arity] = arguments
+        result = self._body(environment)
+        if self._is_initializer:
+            return self.closure.slots[0]
+        return None if result is None else result[0]
+
+    def __str__(self):
+        """
+        overrides string
+        :return: str
+        """
+        return "<fn {}>".format(self._declaration.name.lexeme)
+
+
+class ClosureCompiler(Visitor):
+    """
+    ClosureCompiler: compiles an expression into a closure taking the
+    current Environment and returning its value, and a statement into a
+    closure taking the current Environment and returning None, or a 1-tuple
+    of the value when a return statement ran
+    """
+    def __init__(self, interpreter):
+        """
+        init
+        :param interpreter: the ClosureInterpreter the code runs in
+        """
+        self._interpreter = interpreter
+        self._globals = interpreter.globals.values
+
+    def compile(self, node):
+        """
+        :param node: resolved expression or statement
+        :return: closure
+        """
+        return node.accept(self)
+
+    def _statements(self, statements):
+        """
+        :param statements: statements run one after the other
+        :return: closure running them, stopping at a return
+        """
+        compiled = [self.compile(statement) for statement in statements]
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def run(environment):
+            for statement in compiled:
+                result = statement(environment)
+                if result is not None:
+                    return result
+            return None
+        return run
+
+    def visit_literal_expr(self, expr):
+        value = expr.value
+        return lambda environment: value
+
+    def visit_grouping_expr(self, expr):
+        return self.compile(expr.expression)
+
+    def visit_variable_expr(self, expr):
+        if expr.depth is None:
+            return self._global(expr.name)
+        return self._local(expr.depth, expr.slot)
+
+    @staticmethod
+    def _local(depth, slot):
+        if depth == 0:
+            return lambda environment: environment.slots[slot]
+        if depth == 1:
+            return lambda environment: environment.enclosing.slots[slot]
+        return lambda environment: environment.get_at(depth, slot)
+
+    def _global(self, name):
+        values = self._globals
+        lexeme = name.lexeme
+
+        def get(environment):
+            try:
+                return values[lexeme]
+            except KeyError:
+                raise LoxRuntimeError(name, "Undefined variable '{0}'.".format(lexeme))
+        return get
+
+    def visit_assign_expr(self, expr):
+        value = self.compile(expr.value)
+        slot = expr.slot
+        depth = expr.depth
+        if depth is None:
+            values = self._globals
+            name = expr.name
+            lexeme = name.lexeme
+
+            def assign(environment):
+                if lexeme not in values:
+                    raise LoxRuntimeError(name, "Undefined variable '{0}'.".format(lexeme))
+                result = values[lexeme] = value(environment)
+                return result
+        elif depth == 0:
+            def assign(environment):
+                result = environment.slots[slot] = value(environment)
+                return result
+        else:
+            def assign(environment):
+                result = value(environment)
+                environment.assign_at(depth, slot, result)
+                return result
+        return assign
+
+    def visit_unary_expr(self, expr):
+        right = self.compile(expr.right)
+        if expr.operator.type == TokenType.MINUS:
+            return lambda environment: -float(right(environment))
+        if expr.operator.type == TokenType.BANG:
+            def negate(environment):
+                value = right(environment)
+                return value is None or value is False
+            return negate
+        return lambda environment: None
+
+    def visit_binary_expr(self, expr):
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+        token = expr.operator
+        if token.type in _NUMBER_OPERATORS:
+            apply = _NUMBER_OPERATORS[token.type]
+
+            def binary(environment):
+                left_value = left(environment)
+                right_value = right(environment)
+                if type(left_value) is not float or type(right_value) is not float:
+                    return self._vector(token, left_value, right_value)
+                return apply(left_value, right_value)
+        elif token.type == TokenType.PLUS:
+            def binary(environment):
+                left_value = left(environment)
+                right_value = right(environment)
+                if type(left_value) is float and type(right_value) is float:
+                    return left_value + right_value
+                if type(left_value) in STRINGS and type(right_value) in STRINGS:
+                    return concat(left_value, right_value)
+                if type(left_value) is Vector or type(right_value) is Vector:
+                    return self._vector(token, left_value, right_value)
+                return None
+        elif token.type in _EQUALITY_OPERATORS:
+            apply = _EQUALITY_OPERATORS[token.type]
+
+            def binary(environment):
+                return apply(left(environment), right(environment))
+        else:
+            def binary(environment):
+                return None
+        return binary
+
+    @staticmethod
+    def _vector(token, left, right):
+        """
+        arithmetic of operands not both numbers
+        :param token: operator
+        :param left: value of the left operand
+        :param right: value of the right operand
+        :return: Vector
+        """
+        if token.lexeme not in ("+", "-", "*", "/") or \
+                (type(left) is not Vector and type(right) is not Vector):
+            raise LoxRuntimeError(token, "Operands must be numbers.")
+        try:
+            return arithmetic(token.lexeme, left, right)
+        except LoxRuntimeError as error:
+            error.token = token
+            raise
+
+    def visit_logical_expr(self, expr):
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+        if expr.operator.type == TokenType.OR:
+            def logical(environment):
+                value = left(environment)
+                if value is not None and value is not False:
+                    return value
+                return right(environment)
+        else:
+            def logical(environment):
+                value = left(environment)
+                if value is None or value is False:
+                    return value
+                return right(environment)
+        return logical
+
+    def visit_call_expr(self, expr):
+        callee = self.compile(expr.callee)
+        arguments = [self.compile(argument) for argument in expr.arguments]
+        paren = expr.paren
+        interpreter = self._interpreter
+
+        def call(environment):
+            function = callee(environment)
+            values = [argument(environment) for argument in arguments]
+            if not isinstance(function, LoxCallable):
+                raise LoxRuntimeError(paren, "Can only call functions and classes.")
+            arity = function.arity()
+            if arity is not None and len(values) != arity:
+                raise LoxRuntimeError(paren, "Expected {} arguments, but got {}.".format(
+                    arity, len(values)))
+            try:
+                return function.call(interpreter, values)
+            except RecursionError:
+                raise LoxRuntimeError(paren, "Stack overflow.")
+            except LoxRuntimeError as error:
+                if error.token is None:
+                    error.token = paren
+                raise
+        return call
+
+    def visit_list_expr(self, expr):
+        elements = [self.compile(element) for element in expr.elements]
+
+        def build(environment):
+            return [element(environment) for element in elements]
+        return build
+
+    def visit_map_expr(self, expr):
+        keys = [self.compile(key) for key in expr.keys]
+        values = [self.compile(value) for value in expr.values]
+        brace = expr.brace
+
+        def build(environment):
+            key_values = [key(environment) for key in keys]
+            value_values = [value(environment) for value in values]
+            try:
+                return new_map(key_values, value_values)
+            except LoxRuntimeError as error:
+                error.token = brace
+                raise
+        return build
+
+    def visit_index_expr(self, expr):
+        collection = self.compile(expr.collection)
+        index = self.compile(expr.index)
+        bracket = expr.bracket
+
+        def get(environment):
+            collection_value = collection(environment)
+            index_value = index(environment)
+            try:
+                return get_index(collection_value, index_value)
+            except LoxRuntimeError as error:
+                error.token = bracket
+                raise
+        return get
+
+    def visit_setindex_expr(self, expr):
+        collection = self.compile(expr.collection)
+        index = self.compile(expr.index)
+        value = self.compile(expr.value)
+        bracket = expr.bracket
+
+        def assign(environment):
+            collection_value = collection(environment)
+            index_value = index(environment)
+            assigned = value(environment)
+            try:
+                return set_index(collection_value, index_value, assigned)
+            except LoxRuntimeError as error:
+                error.token = bracket
+                raise
+        return assign
+
+    def visit_get_expr(self, expr):
+        instance = self.compile(expr.object)
+        properties = self._interpreter.property_cache
+
+        def get(environment):
+            value = instance(environment)
+            cache = expr.cache
+            if cache is not None and type(value) is LoxInstance and value.shape is cache[0]:
+                properties.hits += 1
+                slot = cache[1]
+                if slot is not None:
+                    return value.fields[slot]
+                return cache[2].bind(value)
+            return properties.get(expr, value)
+        return get
+
+    def visit_set_expr(self, expr):
+        instance = self.compile(expr.object)
+        value = self.compile(expr.value)
+        properties = self._interpreter.property_cache
+        name = expr.name
+
+        def assign(environment):
+            target = instance(environment)
+            if type(target) is not LoxInstance:
+                raise LoxRuntimeError(name, "Only instances have fields.")
+            assigned = value(environment)
+            cache = expr.cache
+            if cache is not None and target.shape is cache[0]:
+                properties.hits += 1
+                shape = cache[2]
+                if shape is None:
+                    target.fields[cache[1]] = assigned
+                else:
+                    target.fields.append(assigned)
+                    target.shape = shape
+                return assigned
+            return properties.set(expr, target, assigned)
+        return assign
+
+    def visit_this_expr(self, expr):
+        return self._local(expr.depth, expr.slot)
+
+    def visit_super_expr(self, expr):
+        superclass = self._local(expr.depth, expr.slot)
+        # this is in the scope enclosed by super's
+        instance = self._local(expr.depth - 1, 0)
+        method = expr.method
+
+        def get(environment):
+            found = superclass(environment).find_method(method.lexeme)
+            if found is None:
+                raise LoxRuntimeError(method, "Undefined property '{}'.".format(method.lexeme))
+            return found.bind(instance(environment))
+        return get
+
+    def visit_expression_stmt(self, stmt):
+        expression = self.compile(stmt.expression)
+
+        def run(environment):
+            expression(environment)
+        return run
+
+    def visit_print_stmt(self, stmt):
+        expression = self.compile(stmt.expression)
+        stringify = Interpreter.stringify
+
+        def run(environment):
+            print(stringify(expression(environment)))
+        return run
+
+    def visit_var_stmt(self, stmt):
+        initializer = self.compile(stmt.initializer) if stmt.initializer is not None \
+            else (lambda environment: None)
+        slot = stmt.slot
+        if slot is None:
+            values = self._globals
+            lexeme = stmt.name.lexeme
+
+            def run(environment):
+                values[lexeme] = initializer(environment)
+        else:
+            def run(environment):
+                environment.slots[slot] = initializer(environment)
+        return run
+
+    def visit_function_stmt(self, stmt):
+        body = self._statements(stmt.body)
+        slot = stmt.slot
+        if slot is None:
+            values = self._globals
+            lexeme = stmt.name.lexeme
+
+            def run(environment):
+                values[lexeme] = CompiledFunction(stmt, body, environment)
+        else:
+            def run(environment):
+                environment.slots[slot] = CompiledFunction(stmt, body, environment)
+        return run
+
+    def visit_class_stmt(self, stmt):
+        superclass = self.compile(stmt.superclass) if stmt.superclass is not None else None
+        methods = [(method, self._statements(method.body)) for method in stmt.methods]
+        slot = stmt.slot
+        lexeme = stmt.name.lexeme
+        values = self._globals
+
+        def run(environment):
+            parent = None
+            closure = environment
+            if superclass is not None:
+                parent = superclass(environment)
+                if type(parent) is not LoxClass:
+                    raise LoxRuntimeError(stmt.superclass.name, "Superclass must be a class.")
+                closure = Environment(environment, 1)
+                closure.slots[0] = parent
+            klass = LoxClass(lexeme, parent, {
+                method.name.lexeme: CompiledFunction(method, body, closure,
+                                                     method.name.lexeme == "init")
+                for method, body in methods})
+            if slot is None:
+                values[lexeme] = klass
+            else:
+                environment.slots[slot] = klass
+        return run
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is None:
+            return lambda environment: (None,)
+        value = self.compile(stmt.value)
+        return lambda environment: (value(environment),)
+
+    def visit_block_stmt(self, stmt):
+        statements = self._statements(stmt.statements)
+        if not stmt.scoped:
+            return statements
+        slots = stmt.slots
+        return lambda environment: statements(Environment(environment, slots))
+
+    def visit_if_stmt(self, stmt):
+        condition = self.compile(stmt.condition)
+        then_branch = self.compile(stmt.then_branch)
+        else_branch = self.compile(stmt.else_branch) if stmt.else_branch is not None \
+            else (lambda environment: None)
+
+        def run(environment):
+            value = condition(environment)
+            if value is not None and value is not False:
+                return then_branch(environment)
+            return else_branch(environment)
+        return run
+
+    def visit_while_stmt(self, stmt):
+        condition = self.compile(stmt.condition)
+        body = self.compile(stmt.body)
+
+        def run(environment):
+            while True:
+                value = condition(environment)
+                if value is None or value is False:
+                    return None
+                result = body(environment)
+                if result is not None:
+                    return result
+        return run
+
+    def visit_for_stmt(self, stmt):
+        loop_scope = isinstance(stmt.initializer, Stmt.Var)
+        initializer = self.compile(stmt.initializer) if stmt.initializer is not None \
+            else (lambda environment: None)
+        condition = self.compile(stmt.condition)
+        increment = self.compile(stmt.increment) if stmt.increment is not None \
+            else (lambda environment: None)
+        scope = stmt.scope
+        body = stmt.body
+        slots = body.slots if scope != SHARED_SCOPE else 0
+        statements = self._statements(body.statements if isinstance(body, Stmt.Block)
+                                      else [body])
+
+        def run(environment):
+            if loop_scope:
+                environment = Environment(environment, 1)
+            initializer(environment)
+            frame = Environment(environment, slots) if scope == REUSED_SCOPE else environment
+            while True:
+                value = condition(environment)
+                if value is None or value is False:
+                    return None
+                if scope == SHARED_SCOPE or scope == REUSED_SCOPE:
+                    result = statements(frame)
+                else:
+                    result = statements(Environment(environment, slots))
+                if result is not None:
+                    return result
+                increment(environment)
+        return run
+
+
+class ClosureInterpreter:
+    """
+    ClosureInterpreter: runs resolved statements by compiling each one with
+    a ClosureCompiler and calling the closure with the global environment
+    """
+    def __init__(self):
+        self.globals = Environment()
+        self.property_cache = PropertyCache()
+        self._compiler = ClosureCompiler(self)
+        for name, function in NATIVES.items():
+            self.define(name, function)
+
+    def call_function(self, callee, arguments):
+        """
+        calls a lox value from Python, e.g. from a native
+        :param callee: value called
+        :param arguments: arguments
+        :return: the returned value
+        """
+        if not isinstance(callee, LoxCallable):
+            raise LoxRuntimeError(None, "Can only call functions and classes.")
+        arity = callee.arity()
+        if arity is not None and len(arguments) != arity:
+            raise LoxRuntimeError(None, "Expected {} arguments, but got {}.".format(
+                arity, len(arguments)))
+        return callee.call(self, arguments)
+
+    def define(self, name, value):
+        """
+        defines a global, e.g. a NativeFunction
+        :param name: name
+        :param value: value
+        :return: None
+        """
+        self.globals.define(name, value)
+
+    def statistics(self):
+        """
+        :return: dict of counter name -> value
+        """
+        return self.property_cache.statistics()
+
+    def interpret(self, statements):
+        """
+        called by lox to interpret statements
+        :param statements: resolved statements
+        :return: None
+        """
+        try:
+            for statement in statements:
+                self._compiler.compile(statement)(self.globals)
+        except RuntimeError as error:
+            raise Exception(error)
@@ -0,0 +1,132 @@
+"""
+pylox.collection
+~~~~~~~~~~~~~~~~
+lists and maps: the lox values a Python list and a Python dict are, and
+indexing them, shared by every engine
+"""
+from pylox.error import LoxRuntimeError
+from pylox.rope import Rope
+from pylox.vector import Vector
+
+
+class _BoolKey:
+    """
+    _BoolKey: stands for true or false as a map key, as True == 1.0 and
+    False == 0.0 in Python and would be the same key
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+_TRUE = _BoolKey(True)
+_FALSE = _BoolKey(False)
+
+
+def key(value):
+    """
+    :param value: lox value used as a map key
+    :return: the dict key of value
+    """
+    if value is True:
+        return _TRUE
+    if value is False:
+        return _FALSE
+    if type(value) is Rope:
+        return value.flatten()
+    if type(value) is list or type(value) is dict:
+        raise LoxRuntimeError(None, "Lists and maps cannot be map keys.")
+    return value
+
+
+def lox_key(dict_key):
+    """
+    :param dict_key: key of a dict
+    :return: the lox value it is the key of
+    """
+    return dict_key.value if type(dict_key) is _BoolKey else dict_key
+
+
+def new_map(keys, values):
+    """
+    :param keys: lox values of the keys
+    :param values: values, in the order of their keys
+    :return: dict
+    """
+    return {key(map_key): value for map_key, value in zip(keys, values)}
+
+
+def _position(values, index):
+    """
+    :param values: list or Vector
+    :param index: lox value of the index
+    :return: int index into values
+    """
+    if type(index) is not float or not index.is_integer():
+        raise LoxRuntimeError(None, "Index must be an integer.")
+    position = int(index)
+    if not 0 <= position < len(values):
+        raise LoxRuntimeError(None, "Index out of range.")
+    return position
+
+
+def get_index(collection, index):
+    """
+    collection[index]: the element of a list or vector, or the value of a
+    key of a map, nil if it has none
+    :param collection: indexed value
+    :param index: lox value of the index
+    :return: value
+    """
+    if type(collection) is list:
+        return collection[_position(collection, index)]
+    if type(collection) is dict:
+        return collection.get(key(index))
+    if type(collection) is Vector:
+        return float(collection.values[_position(collection, index)])
+    raise LoxRuntimeError(None, "Can only index lists, maps and vectors.")
+
+
+def set_index(collection, index, value):
+    """
+    collection[index] = value
+    :param collection: indexed value
+    :param index: lox value of the index
+    :param value: value assigned
+    :return: value
+    """
+    if type(collection) is list:
+        collection[_position(collection, index)] = value
+    elif type(collection) is dict:
+        collection[key(index)] = value
+    elif type(collection) is Vector:
+        if type(value) is not float:
+            raise LoxRuntimeError(None, "Vector elements must be numbers.")
+        collection.values[_position(collection, index)] = value
+    else:
+        raise LoxRuntimeError(None, "Can only index lists, maps and vectors.")
+    return value
+
+
+def show(value, showing=None):
+    """
+    :param value: lox value
+    :param showing: ids of the lists and maps being shown, that contain value
+    :return: str of value as print shows it
+    """
+    if type(value) is not list and type(value) is not dict:
+        return str(value)
+    if showing is None:
+        showing = set()
+    elif id(value) in showing:
+        return "[...]" if type(value) is list else "{...}"
+    showing.add(id(value))
+    if type(value) is list:
+        text = "[{}]".format(", ".join(show(element, showing) for element in value))
+    else:
+        text = "{{{}}}".format(", ".join(
+            "{}: {}".format(show(lox_key(map_key), showing), show(map_value, showing))
+            for map_key, map_value in value.items()))
+    showing.discard(id(value))
+    return text
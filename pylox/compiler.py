@@ -0,0 +1,529 @@
+"""
+pylox.compiler
+~~~~~~~~~~~~~~~~
+compiles statements to bytecode for the VM: a stream of opcodes and their
+operands with a constant pool and a line table, one Chunk per function
+"""
+from bisect import bisect_right
+from enum import IntEnum
+from pylox.expr import Visitor
+from pylox.scanner import Token, TokenType
+
+
+class OpCode(IntEnum):
+    """ VM instructions, with the operands that follow them in the code """
+    CONSTANT = 0        # constant index
+    NIL = 1
+    TRUE = 2
+    FALSE = 3
+    POP = 4
+    GET_LOCAL = 5       # stack slot
+    SET_LOCAL = 6       # stack slot
+    GET_GLOBAL = 7      # constant index of the name
+    DEFINE_GLOBAL = 8   # constant index of the name
+    SET_GLOBAL = 9      # constant index of the name
+    GET_UPVALUE = 10    # upvalue index
+    SET_UPVALUE = 11    # upvalue index
+    EQUAL = 12
+    NOT_EQUAL = 13
+    GREATER = 14
+    GREATER_EQUAL = 15
+    LESS = 16
+    LESS_EQUAL = 17
+    ADD = 18
+    SUBTRACT = 19
+    MULTIPLY = 20
+    DIVIDE = 21
+    NOT = 22
+    NEGATE = 23
+    PRINT = 24
+    JUMP = 25           # offset forward
+    JUMP_IF_FALSE = 26  # offset forward
+    LOOP = 27           # offset back
+    CALL = 28           # argument count
+    CLOSURE = 29        # constant index of the Function, then a pair of
+                        # (is local, index) for each of its upvalues
+    CLOSE_UPVALUE = 30
+    RETURN = 31
+    BUILD_LIST = 32     # element count
+    BUILD_MAP = 33      # entry count
+    GET_INDEX = 34
+    SET_INDEX = 35
+    CLASS = 36          # constant index of the name, method count, 1 if the
+                        # superclass is the local under the methods, else 0
+    GET_PROPERTY = 37   # constant index of the Get, the site of its cache
+    SET_PROPERTY = 38   # constant index of the Set, the site of its cache
+    GET_SUPER = 39      # constant index of the method name
+
+
+_BINARY_OPCODES = {
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.SLASH: OpCode.DIVIDE,
+}
+
+
+class Chunk:
+    """
+    Chunk: the code of a function. The line table is run-length encoded:
+    lines[i] is the line of the code from offsets[i] up to offsets[i + 1]
+    """
+    def __init__(self):
+        self.code = []
+        self.constants = []
+        # (type, value) -> index, so equal constants share an index
+        self._constant_indexes = {}
+        self.offsets = []
+        self.lines = []
+
+    def write(self, value, line):
+        """
+        appends an opcode or operand
+        :param value: int
+        :param line: line of the source it was compiled from
+        :return: offset of the value
+        """
+        if not self.lines or self.lines[-1] != line:
+            self.offsets.append(len(self.code))
+            self.lines.append(line)
+        self.code.append(value)
+        return len(self.code) - 1
+
+    def add_constant(self, value):
+        """
+        :param value: constant
+        :return: index of the constant in the pool
+        """
+        key = (type(value), value)
+        if key not in self._constant_indexes:
+            self._constant_indexes[key] = len(self.constants)
+            self.constants.append(value)
+        return self._constant_indexes[key]
+
+    def line(self, offset):
+        """
+        :param offset: offset in the code
+        :return: line of the source the code at offset was compiled from
+        """
+        return self.lines[bisect_right(self.offsets, offset) - 1]
+
+
+class Function:
+    """
+    Function: compiled lox function
+    """
+    def __init__(self, name=None, arity=0):
+        """
+        init
+        :param name: name, None for a top-level script
+        :param arity: number of parameters
+        """
+        self.name = name
+        self.arity = arity
+        self.upvalue_count = 0
+        self.chunk = Chunk()
+
+    def __str__(self):
+        """
+        overrides string
+        :return: str
+        """
+        return "<script>" if self.name is None else "<fn {}>".format(self.name)
+
+
+class _FunctionState:
+    """
+    locals and upvalues of the function being compiled
+    """
+    def __init__(self, enclosing, function, method=False, initializer=False):
+        self.enclosing = enclosing
+        self.function = function
+        # [name, scope depth, captured] by stack slot; slot 0 is the callee,
+        # or this in a method
+        self.locals = [["this" if method else "", 0, False]]
+        # an init method, returning this
+        self.initializer = initializer
+        # (is local, index) by upvalue index
+        self.upvalues = []
+        self.scope_depth = 0
+
+    def resolve_local(self, name):
+        """
+        :param name: variable name
+        :return: stack slot of the local, or None
+        """
+        for slot in range(len(self.locals) - 1, -1, -1):
+            if self.locals[slot][0] == name:
+                return slot
+        return None
+
+    def resolve_upvalue(self, name):
+        """
+        :param name: variable name
+        :return: upvalue index of a local of an enclosing function, or None
+        """
+        if self.enclosing is None:
+            return None
+        slot = self.enclosing.resolve_local(name)
+        if slot is not None:
+            self.enclosing.locals[slot][2] = True
+            return self._add_upvalue(True, slot)
+        index = self.enclosing.resolve_upvalue(name)
+        if index is not None:
+            return self._add_upvalue(False, index)
+        return None
+
+    def _add_upvalue(self, is_local, index):
+        upvalue = (is_local, index)
+        if upvalue in self.upvalues:
+            return self.upvalues.index(upvalue)
+        self.upvalues.append(upvalue)
+        self.function.upvalue_count = len(self.upvalues)
+        return len(self.upvalues) - 1
+
+
+class Compiler(Visitor):
+    """
+    Compiler: compiles resolved statements in a single pass over the tree,
+    keeping locals on the VM's stack as clox does: a local's slot is its
+    position on the stack relative to the frame of its function, and locals
+    of enclosing functions are reached through upvalues. Names declared
+    outside any scope are globals, looked up by name at runtime. A method
+    has this in slot 0, and the methods of a subclass reach its superclass
+    as the local super of a scope around them
+    """
+    def __init__(self):
+        self._state = None
+        self._line = 0
+
+    def compile(self, statements):
+        """
+        compiles top-level statements into a script
+        :param statements: resolved statements
+        :return: Function
+        """
+        self._state = _FunctionState(None, Function())
+        for statement in statements:
+            self._statement(statement)
+        self._emit(OpCode.NIL)
+        self._emit(OpCode.RETURN)
+        return self._state.function
+
+    @property
+    def _chunk(self):
+        return self._state.function.chunk
+
+    def _emit(self, *values):
+        for value in values:
+            self._chunk.write(int(value), self._line)
+
+    def _emit_constant(self, value):
+        self._emit(OpCode.CONSTANT, self._chunk.add_constant(value))
+
+    def _emit_jump(self, opcode):
+        """
+        :param opcode: jump instruction
+        :return: offset of the operand to patch
+        """
+        self._emit(opcode, 0)
+        return len(self._chunk.code) - 1
+
+    def _patch_jump(self, operand):
+        self._chunk.code[operand] = len(self._chunk.code) - operand - 1
+
+    def _emit_loop(self, start):
+        self._emit(OpCode.LOOP, 0)
+        operand = len(self._chunk.code) - 1
+        self._chunk.code[operand] = operand + 1 - start
+
+    def _statement(self, stmt):
+        stmt.accept(self)
+
+    def _expression(self, expr):
+        expr.accept(self)
+
+    def _begin_scope(self):
+        self._state.scope_depth += 1
+
+    def _end_scope(self):
+        state = self._state
+        state.scope_depth -= 1
+        while len(state.locals) > 1 and state.locals[-1][1] > state.scope_depth:
+            self._emit(OpCode.CLOSE_UPVALUE if state.locals.pop()[2] else OpCode.POP)
+
+    def _declare(self, name):
+        """
+        adds a local for the value on top of the stack
+        :param name: variable name
+        :return: None
+        """
+        self._state.locals.append([name, self._state.scope_depth, False])
+
+    def _name_constant(self, name):
+        return self._chunk.add_constant(name.lexeme)
+
+    def _get(self, name):
+        self._line = name.line
+        slot = self._state.resolve_local(name.lexeme)
+        if slot is not None:
+            self._emit(OpCode.GET_LOCAL, slot)
+            return
+        index = self._state.resolve_upvalue(name.lexeme)
+        if index is not None:
+            self._emit(OpCode.GET_UPVALUE, index)
+        else:
+            self._emit(OpCode.GET_GLOBAL, self._name_constant(name))
+
+    def _set(self, name):
+        self._line = name.line
+        slot = self._state.resolve_local(name.lexeme)
+        if slot is not None:
+            self._emit(OpCode.SET_LOCAL, slot)
+            return
+        index = self._state.resolve_upvalue(name.lexeme)
+        if index is not None:
+            self._emit(OpCode.SET_UPVALUE, index)
+        else:
+            self._emit(OpCode.SET_GLOBAL, self._name_constant(name))
+
+    def visit_literal_expr(self, expr):
+        if expr.value is None:
+            self._emit(OpCode.NIL)
+        elif expr.value is True:
+            self._emit(OpCode.TRUE)
+        elif expr.value is False:
+            self._emit(OpCode.FALSE)
+        else:
+            self._emit_constant(expr.value)
+
+    def visit_grouping_expr(self, expr):
+        self._expression(expr.expression)
+
+    def visit_variable_expr(self, expr):
+        self._get(expr.name)
+
+    def visit_assign_expr(self, expr):
+        self._expression(expr.value)
+        self._set(expr.name)
+
+    def visit_unary_expr(self, expr):
+        self._expression(expr.right)
+        self._line = expr.operator.line
+        if expr.operator.type == TokenType.MINUS:
+            self._emit(OpCode.NEGATE)
+        else:
+            self._emit(OpCode.NOT)
+
+    def visit_binary_expr(self, expr):
+        self._expression(expr.left)
+        self._expression(expr.right)
+        self._line = expr.operator.line
+        self._emit(_BINARY_OPCODES[expr.operator.type])
+
+    def visit_logical_expr(self, expr):
+        self._expression(expr.left)
+        self._line = expr.operator.line
+        if expr.operator.type == TokenType.OR:
+            else_jump = self._emit_jump(OpCode.JUMP_IF_FALSE)
+            end_jump = self._emit_jump(OpCode.JUMP)
+            self._patch_jump(else_jump)
+        else:
+            end_jump = self._emit_jump(OpCode.JUMP_IF_FALSE)
+        self._emit(OpCode.POP)
+        self._expression(expr.right)
+        self._patch_jump(end_jump)
+
+    def visit_call_expr(self, expr):
+        self._expression(expr.callee)
+        for argument in expr.arguments:
+            self._expression(argument)
+        self._line = expr.paren.line
+        self._emit(OpCode.CALL, len(expr.arguments))
+
+    def visit_list_expr(self, expr):
+        for element in expr.elements:
+            self._expression(element)
+        self._line = expr.bracket.line
+        self._emit(OpCode.BUILD_LIST, len(expr.elements))
+
+    def visit_map_expr(self, expr):
+        for key, value in zip(expr.keys, expr.values):
+            self._expression(key)
+            self._expression(value)
+        self._line = expr.brace.line
+        self._emit(OpCode.BUILD_MAP, len(expr.keys))
+
+    def visit_index_expr(self, expr):
+        self._expression(expr.collection)
+        self._expression(expr.index)
+        self._line = expr.bracket.line
+        self._emit(OpCode.GET_INDEX)
+
+    def visit_setindex_expr(self, expr):
+        self._expression(expr.collection)
+        self._expression(expr.index)
+        self._expression(expr.value)
+        self._line = expr.bracket.line
+        self._emit(OpCode.SET_INDEX)
+
+    def visit_get_expr(self, expr):
+        self._expression(expr.object)
+        self._line = expr.name.line
+        self._emit(OpCode.GET_PROPERTY, self._chunk.add_constant(expr))
+
+    def visit_set_expr(self, expr):
+        self._expression(expr.object)
+        self._expression(expr.value)
+        self._line = expr.name.line
+        self._emit(OpCode.SET_PROPERTY, self._chunk.add_constant(expr))
+
+    def visit_this_expr(self, expr):
+        self._get(expr.keyword)
+
+    def visit_super_expr(self, expr):
+        self._get(Token(TokenType.THIS, "this", None, expr.keyword.line))
+        self._get(expr.keyword)
+        self._line = expr.method.line
+        self._emit(OpCode.GET_SUPER, self._name_constant(expr.method))
+
+    def visit_class_stmt(self, stmt):
+        self._line = stmt.name.line
+        local = self._state.scope_depth > 0
+        if local:
+            # the slot of the class, declared before the methods so they
+            # can refer to it
+            self._emit(OpCode.NIL)
+            self._declare(stmt.name.lexeme)
+            slot = len(self._state.locals) - 1
+        if stmt.superclass is not None:
+            self._begin_scope()
+            self._expression(stmt.superclass)
+            self._declare("super")
+        for method in stmt.methods:
+            self._line = method.name.line
+            self._function(method, True, method.name.lexeme == "init")
+        self._line = stmt.name.line if stmt.superclass is None else stmt.superclass.name.line
+        self._emit(OpCode.CLASS, self._name_constant(stmt.name), len(stmt.methods),
+                   int(stmt.superclass is not None))
+        if local:
+            self._emit(OpCode.SET_LOCAL, slot)
+            self._emit(OpCode.POP)
+        else:
+            self._emit(OpCode.DEFINE_GLOBAL, self._name_constant(stmt.name))
+        if stmt.superclass is not None:
+            self._end_scope()
+
+    def visit_expression_stmt(self, stmt):
+        self._expression(stmt.expression)
+        self._emit(OpCode.POP)
+
+    def visit_print_stmt(self, stmt):
+        self._expression(stmt.expression)
+        self._emit(OpCode.PRINT)
+
+    def visit_var_stmt(self, stmt):
+        self._line = stmt.name.line
+        if stmt.initializer is not None:
+            self._expression(stmt.initializer)
+        else:
+            self._emit(OpCode.NIL)
+        if self._state.scope_depth > 0:
+            self._declare(stmt.name.lexeme)
+        else:
+            self._emit(OpCode.DEFINE_GLOBAL, self._name_constant(stmt.name))
+
+    def visit_function_stmt(self, stmt):
+        self._line = stmt.name.line
+        local = self._state.scope_depth > 0
+        if local:
+            # declared before the body is compiled so it can call itself
+            self._declare(stmt.name.lexeme)
+        self._function(stmt)
+        if not local:
+            self._emit(OpCode.DEFINE_GLOBAL, self._name_constant(stmt.name))
+
+    def _function(self, stmt, method=False, initializer=False):
+        enclosing = self._state
+        self._state = _FunctionState(enclosing, Function(stmt.name.lexeme, len(stmt.params)),
+                                     method, initializer)
+        self._begin_scope()
+        for param in stmt.params:
+            self._declare(param.lexeme)
+        for statement in stmt.body:
+            self._statement(statement)
+        self._emit_return()
+        state = self._state
+        self._state = enclosing
+        self._emit(OpCode.CLOSURE, self._chunk.add_constant(state.function))
+        for is_local, index in state.upvalues:
+            self._emit(int(is_local), index)
+
+    def _emit_return(self):
+        """ returns nil, or this from an init method """
+        if self._state.initializer:
+            self._emit(OpCode.GET_LOCAL, 0)
+        else:
+            self._emit(OpCode.NIL)
+        self._emit(OpCode.RETURN)
+
+    def visit_return_stmt(self, stmt):
+        self._line = stmt.keyword.line
+        if stmt.value is not None:
+            self._expression(stmt.value)
+            self._emit(OpCode.RETURN)
+        else:
+            self._emit_return()
+
+    def visit_block_stmt(self, stmt):
+        self._begin_scope()
+        for statement in stmt.statements:
+            self._statement(statement)
+        self._end_scope()
+
+    def visit_if_stmt(self, stmt):
+        self._expression(stmt.condition)
+        then_jump = self._emit_jump(OpCode.JUMP_IF_FALSE)
+        self._emit(OpCode.POP)
+        self._statement(stmt.then_branch)
+        else_jump = self._emit_jump(OpCode.JUMP)
+        self._patch_jump(then_jump)
+        self._emit(OpCode.POP)
+        if stmt.else_branch is not None:
+            self._statement(stmt.else_branch)
+        self._patch_jump(else_jump)
+
+    def visit_while_stmt(self, stmt):
+        start = len(self._chunk.code)
+        self._expression(stmt.condition)
+        exit_jump = self._emit_jump(OpCode.JUMP_IF_FALSE)
+        self._emit(OpCode.POP)
+        self._statement(stmt.body)
+        self._emit_loop(start)
+        self._patch_jump(exit_jump)
+        self._emit(OpCode.POP)
+
+    def visit_for_stmt(self, stmt):
+        self._begin_scope()
+        if stmt.initializer is not None:
+            self._statement(stmt.initializer)
+        start = len(self._chunk.code)
+        self._expression(stmt.condition)
+        exit_jump = self._emit_jump(OpCode.JUMP_IF_FALSE)
+        self._emit(OpCode.POP)
+        # locals of the body are popped, and closed over, every iteration,
+        # so each iteration captures variables of its own
+        self._statement(stmt.body)
+        if stmt.increment is not None:
+            self._expression(stmt.increment)
+            self._emit(OpCode.POP)
+        self._emit_loop(start)
+        self._patch_jump(exit_jump)
+        self._emit(OpCode.POP)
+        self._end_scope()
@@ -7,11 +7,21 @@ from pylox.error import LoxRuntimeError
 
 class Environment:
     """
-    Environment
+    Environment: the global environment keeps variables by name in values,
+    every other one is a fixed-size frame keeping its variables in slots,
+    numbered by the Resolver
     """
-    def __init__(self, enclosing=None):
-        self.values = {}
-        self._enclosing = enclosing
+    __slots__ = ("values", "slots", "enclosing")
+
+    def __init__(self, enclosing=None, size=0):
+        """
+        init
+        :param enclosing: enclosing environment, None for the globals
+        :param size: number of slots
+        """
+        self.values = {} if enclosing is None else None
+        self.slots = [None] * size
+        self.enclosing = enclosing
 
     def define(self, name, value):
         """
@@ -27,12 +37,9 @@ class Environment:
         :param name: key
         :return: str
         """
-        if self.values.get(name.lexeme) is not None:
+        if name.lexeme in self.values:
             return self.values[name.lexeme]
-
-        if self._enclosing:
-            return self._enclosing.values.get(name.lexeme)
-        raise LoxRuntimeError(name, "Undefined variable {0}.".format(name.lexeme))
+        raise LoxRuntimeError(name, "Undefined variable '{0}'.".format(name.lexeme))
 
     def assign(self, name, value):
         """
@@ -41,11 +48,34 @@ class Environment:
         :param value: val
         :return: None
         """
-        if self.values.get(name.lexeme):
+        if name.lexeme in self.values:
             self.values[name.lexeme] = value
             return
-        if self._enclosing:
-            key = name.lexeme
-            self._enclosing.values[str(key)] = value
-            return
-        raise LoxRuntimeError(name, "Undefined variable {0}.".format(name.lexeme))
+        raise LoxRuntimeError(name, "Undefined variable '{0}'.".format(name.lexeme))
+
+    def ancestor(self, depth):
+        """
+        :param depth: number of environments up
+        :return: the enclosing environment depth levels up
+        """
+        environment = self
+        for _ in range(depth):
+            environment = environment.enclosing
+        return environment
+
+    def get_at(self, depth, slot):
+        """
+        :param depth: number of environments up
+        :param slot: slot of the variable
+        :return: value
+        """
+        return self.ancestor(depth).slots[slot]
+
+    def assign_at(self, depth, slot, value):
+        """
+        :param depth: number of environments up
+        :param slot: slot of the variable
+        :param value: val
+        :return: None
+        """
+        self.ancestor(depth).slots[slot] = value
@@ -2,6 +2,20 @@
 Errors
 ~~~~~~~~~~~~~~~~
 """
+from pylox.scanner import TokenType
+
+
+def locate(location):
+    """
+    line and description of where an error was found
+    :param location: line number, or the token the error was found at
+    :return: (line, where)
+    """
+    if isinstance(location, int):
+        return location, ""
+    if location.type == TokenType.EOF:
+        return location.line, " at end"
+    return location.line, " at '{}'".format(location.lexeme)
 
 
 class LoxRuntimeError(RuntimeError):
@@ -9,19 +23,18 @@ class LoxRuntimeError(RuntimeError):
     Lox Runtime Error
     """
     def __init__(self, token=None, message=None):
+        """
+        init
+        :param token: token the error happened at, or its line number
+        :param message: error message
+        """
         self.token = token
         self.message = message
 
     def __str__(self):
-        return "{}\n[line {}]".format(self.message, self.token.line)
+        return "{}\n[line {}]".format(self.message, locate(self.token)[0])
 
 
-class Return(RuntimeError):
-    """
-    Return
-    """
-    def __init__(self, value):
-        self.value = value
-
-    def __str__(self):
-        return "return error: {}".format(self.value)
+# completion of a statement that ran a return statement; the value returned
+# is left in the interpreter's return_value
+RETURN = object()
@@ -68,6 +68,46 @@ class Visitor(ABC):
     def visit_return_stmt(self):
         pass
 
+    @abstractmethod    
+    def visit_for_stmt(self):
+        pass
+
+    @abstractmethod    
+    def visit_list_expr(self):
+        pass
+
+    @abstractmethod    
+    def visit_map_expr(self):
+        pass
+
+    @abstractmethod    
+    def visit_index_expr(self):
+        pass
+
+    @abstractmethod    
+    def visit_setindex_expr(self):
+        pass
+
+    @abstractmethod    
+    def visit_get_expr(self):
+        pass
+
+    @abstractmethod    
+    def visit_set_expr(self):
+        pass
+
+    @abstractmethod    
+    def visit_this_expr(self):
+        pass
+
+    @abstractmethod    
+    def visit_super_expr(self):
+        pass
+
+    @abstractmethod    
+    def visit_class_stmt(self):
+        pass
+
 
 # ExprVisitor
 class Expr(ABC):
@@ -80,6 +120,8 @@ class Unary(Expr):
     def __init__(self, operator, right):
         self.operator = operator
         self.right = right
+        self.specialization = None
+        self.feedback = None
 
     def accept(self, visitor):
         return visitor.visit_unary_expr(self)
@@ -89,6 +131,8 @@ class Assign(Expr):
     def __init__(self, name, value):
         self.name = name
         self.value = value
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor):
         return visitor.visit_assign_expr(self)
@@ -99,6 +143,8 @@ class Binary(Expr):
         self.left = left
         self.operator = operator
         self.right = right
+        self.specialization = None
+        self.feedback = None
 
     def accept(self, visitor):
         return visitor.visit_binary_expr(self)
@@ -109,6 +155,8 @@ class Call(Expr):
         self.callee = callee
         self.paren = paren
         self.arguments = arguments
+        self.cache = None
+        self.rebinds = None
 
     def accept(self, visitor):
         return visitor.visit_call_expr(self)
@@ -135,6 +183,8 @@ class Logical(Expr):
         self.left = left
         self.operator = operator
         self.right = right
+        self.specialization = None
+        self.feedback = None
 
     def accept(self, visitor):
         return visitor.visit_logical_expr(self)
@@ -152,8 +202,94 @@ class Chain(Expr):
 class Variable(Expr):
     def __init__(self, name):
         self.name = name
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor):
         return visitor.visit_variable_expr(self)
 
 
+class List(Expr):
+    def __init__(self, bracket, elements):
+        self.bracket = bracket
+        self.elements = elements
+
+    def accept(self, visitor):
+        return visitor.visit_list_expr(self)
+
+
+class Map(Expr):
+    def __init__(self, brace, keys, values):
+        self.brace = brace
+        self.keys = keys
+        self.values = values
+
+    def accept(self, visitor):
+        return visitor.visit_map_expr(self)
+
+
+class Index(Expr):
+    def __init__(self, collection, bracket, index):
+        self.collection = collection
+        self.bracket = bracket
+        self.index = index
+
+    def accept(self, visitor):
+        return visitor.visit_index_expr(self)
+
+
+class SetIndex(Expr):
+    def __init__(self, collection, bracket, index, value):
+        self.collection = collection
+        self.bracket = bracket
+        self.index = index
+        self.value = value
+
+    def accept(self, visitor):
+        return visitor.visit_setindex_expr(self)
+
+
+class Get(Expr):
+    def __init__(self, object, name):
+        self.object = object
+        self.name = name
+        self.cache = None
+        self.rebinds = None
+
+    def accept(self, visitor):
+        return visitor.visit_get_expr(self)
+
+
+class Set(Expr):
+    def __init__(self, object, name, value):
+        self.object = object
+        self.name = name
+        self.value = value
+        self.cache = None
+        self.rebinds = None
+
+    def accept(self, visitor):
+        return visitor.visit_set_expr(self)
+
+
+class This(Expr):
+    def __init__(self, keyword):
+        self.keyword = keyword
+        self.depth = None
+        self.slot = None
+
+    def accept(self, visitor):
+        return visitor.visit_this_expr(self)
+
+
+class Super(Expr):
+    def __init__(self, keyword, method):
+        self.keyword = keyword
+        self.method = method
+        self.depth = None
+        self.slot = None
+
+    def accept(self, visitor):
+        return visitor.visit_super_expr(self)
+
+
@@ -0,0 +1,174 @@
+"""
+pylox.inlinecache
+~~~~~~~~~~~~~~~~
+monomorphic inline caches of Call nodes: a call site remembers the last
+callee it checked, so calling the same function again skips the type and
+arity checks. Get and Set nodes remember the last shape they saw, and
+where their property is in instances of that shape
+"""
+from pylox.error import LoxRuntimeError
+from pylox.loxcallable import LoxCallable
+from pylox.loxclass import LoxInstance
+
+# times a call site changes callee before it stops caching
+MAX_REBINDS = 4
+
+
+class _Megamorphic:
+    """ callee cached by a site that gave up caching, never called """
+    __slots__ = ()
+
+
+# cache of a call site that has seen too many callees
+MEGAMORPHIC = _Megamorphic()
+
+# cache of a property site that has seen too many shapes: its shape is
+# never an instance's
+MEGAMORPHIC_PROPERTY = (None, None, None)
+
+
+class CallCache:
+    """
+    CallCache: checks the callee of a call site missing its cache and
+    caches it, and counts how it goes
+    """
+    def __init__(self, max_rebinds=MAX_REBINDS):
+        """
+        init
+        :param max_rebinds: callee changes before a site stops caching
+        """
+        self.max_rebinds = max_rebinds
+        # calls whose callee was the cached one
+        self.hits = 0
+        self.misses = 0
+        self.megamorphic = 0
+
+    def miss(self, expr, callee, count):
+        """
+        checks the callee of a call whose cache missed and caches it
+        :param expr: Call
+        :param callee: value called
+        :param count: number of arguments
+        :return: None
+        """
+        self.misses += 1
+        if not isinstance(callee, LoxCallable):
+            raise LoxRuntimeError(expr.paren, "Can only call functions and classes.")
+        arity = callee.arity()
+        if arity is not None and count != arity:
+            raise LoxRuntimeError(expr.paren, "Expected {} arguments, but got {}.".format(
+                arity, count))
+        cache = expr.cache
+        if cache is MEGAMORPHIC:
+            return
+        if cache is not None:
+            expr.rebinds = (expr.rebinds or 0) + 1
+            if expr.rebinds >= self.max_rebinds:
+                expr.cache = MEGAMORPHIC
+                self.megamorphic += 1
+                return
+        expr.cache = callee
+
+    def statistics(self):
+        """
+        :return: dict of counter name -> value
+        """
+        calls = self.hits + self.misses
+        return {
+            "call cache hits": self.hits,
+            "call cache misses": self.misses,
+            "megamorphic call sites": self.megamorphic,
+            "call cache hit rate": self.hits / calls if calls else 0.0,
+        }
+
+
+class PropertyCache:
+    """
+    PropertyCache: looks up the property of a Get or Set site missing its
+    cache, and caches it for the shape of the instance. The cache of a Get
+    is (shape, slot of the field, None), or (shape, None, method) when no
+    instance of the shape has a field of that name. The cache of a Set is
+    (shape, slot, None) when the field exists, or (shape, slot, next shape)
+    when setting it adds the field
+    """
+    def __init__(self, max_rebinds=MAX_REBINDS):
+        """
+        init
+        :param max_rebinds: shape changes before a site stops caching
+        """
+        self.max_rebinds = max_rebinds
+        # property reads and writes on an instance of the cached shape
+        self.hits = 0
+        self.misses = 0
+        self.megamorphic = 0
+
+    def get(self, expr, instance):
+        """
+        :param expr: Get
+        :param instance: value of its object
+        :return: the field, or the method bound to instance
+        """
+        self.misses += 1
+        if type(instance) is not LoxInstance:
+            raise LoxRuntimeError(expr.name, "Only instances have properties.")
+        shape = instance.shape
+        name = expr.name.lexeme
+        slot = shape.slots.get(name)
+        if slot is not None:
+            self._cache(expr, (shape, slot, None))
+            return instance.fields[slot]
+        method = shape.klass.find_method(name)
+        if method is None:
+            raise LoxRuntimeError(expr.name, "Undefined property '{}'.".format(name))
+        self._cache(expr, (shape, None, method))
+        return method.bind(instance)
+
+    def set(self, expr, instance, value):
+        """
+        :param expr: Set
+        :param instance: LoxInstance, value of its object
+        :param value: value assigned
+        :return: value
+        """
+        self.misses += 1
+        shape = instance.shape
+        slot = shape.slots.get(expr.name.lexeme)
+        if slot is not None:
+            instance.fields[slot] = value
+            self._cache(expr, (shape, slot, None))
+        else:
+            instance.shape = shape.add(expr.name.lexeme)
+            instance.fields.append(value)
+            self._cache(expr, (shape, len(shape.slots), instance.shape))
+        return value
+
+    def _cache(self, expr, entry):
+        """
+        :param expr: Get or Set
+        :param entry: cache for the shape it missed on
+        :return: None
+        """
+        cache = expr.cache
+        if cache is MEGAMORPHIC_PROPERTY:
+            return
+        rebinds = expr.rebinds or 0
+        if cache is not None:
+            rebinds = expr.rebinds = rebinds + 1
+        # with a max_rebinds of 0 no site caches
+        if rebinds >= self.max_rebinds:
+            expr.cache = MEGAMORPHIC_PROPERTY
+            self.megamorphic += 1
+            return
+        expr.cache = entry
+
+    def statistics(self):
+        """
+        :return: dict of counter name -> value
+        """
+        accesses = self.hits + self.misses
+        return {
+            "property cache hits": self.hits,
+            "property cache misses": self.misses,
+            "megamorphic property sites": self.megamorphic,
+            "property cache hit rate": self.hits / accesses if accesses else 0.0,
+        }
@@ -2,24 +2,69 @@
 Interpreter
 ~~~~~~~~~~~~~~~~
 """
-import time
+import pylox.stmt as Stmt
 from pylox.expr import Visitor
 from pylox.scanner import TokenType
+from pylox.collection import new_map, get_index, set_index, show
 from pylox.environment import Environment
 from pylox.error import LoxRuntimeError
-from pylox.error import Return as ReturnError
+from pylox.error import RETURN
+from pylox.inlinecache import CallCache, PropertyCache
 from pylox.loxcallable import LoxCallable
+from pylox.loxclass import LoxClass, LoxInstance
 from pylox.loxfunction import LoxFunction
+from pylox.native import NATIVES
+from pylox.rope import STRINGS, concat
+from pylox.resolver import SHARED_SCOPE, REUSED_SCOPE
+from pylox.specializer import Specializer, BINARY_SPECIALIZATIONS, UNARY_SPECIALIZATIONS, \
+    LOGICAL_SPECIALIZATIONS
+from pylox.vector import Vector, arithmetic
 
+# operators working elementwise on vectors
+_VECTOR_OPERATORS = (TokenType.PLUS, TokenType.MINUS, TokenType.STAR, TokenType.SLASH)
 
-class Interpreter(Visitor, LoxCallable):
+class Interpreter(Visitor):
     """
     interpreter class
     """
     def __init__(self):
         self.globals = Environment()
         self.environment = self.globals
-        # self.globals.define("clock", LoxCallable())
+        self.specializer = Specializer()
+        self.call_cache = CallCache()
+        self.property_cache = PropertyCache()
+        # Memoizer of the functions to memoize, None to memoize none
+        self.memoizer = None
+        # value of the last return statement run
+        self.return_value = None
+        # (LoxFunction, arguments) of the call a return statement left to run
+        self.tail_call = None
+        for name, function in NATIVES.items():
+            self.define(name, function)
+
+    def call_function(self, callee, arguments):
+        """
+        calls a lox value from Python, e.g. from a native
+        :param callee: value called
+        :param arguments: arguments
+        :return: the returned value
+        """
+        if not isinstance(callee, LoxCallable):
+            raise LoxRuntimeError(None, "Can only call functions and classes.")
+        arity = callee.arity()
+        if arity is not None and len(arguments) != arity:
+            raise LoxRuntimeError(None, "Expected {} arguments, but got {}.".format(
+                arity, len(arguments)))
+        return callee.call(self, arguments)
+
+    def define(self, name, value):
+        """
+        defines a global, e.g. a NativeFunction
+        :param name: name
+        :param value: value
+        :return: None
+        """
+        self.globals.define(name, value)
 
     def interpret(self, statements):
         """
@@ -46,33 +91,71 @@ class Interpreter(Visitor, LoxCallable):
         execute block statements
         :param statements: statement
         :param environment: environment
-        :return: None
+        :return: RETURN if a return statement ran, else None
         """
         previous = self.environment
         try:
             self.environment = environment
             for statement in statements:
-                self._execute(statement)
+                if self._execute(statement) is RETURN:
+                    return RETURN
         finally:
             self.environment = previous
+        return None
 
     def _execute(self, stmt):
         """
         execute statement
         :param stmt: statement
-        :return:
+        :return: RETURN if a return statement ran, else None
         """
-        stmt.accept(self)
+        return stmt.accept(self)
+
+    def statistics(self):
+        """
+        :return: dict of counter name -> value
+        """
+        statistics = self.specializer.statistics()
+        statistics.update(self.call_cache.statistics())
+        statistics.update(self.property_cache.statistics())
+        if self.memoizer is not None:
+            statistics.update(self.memoizer.statistics())
+        return statistics
 
     def visit_binary_expr(self, expr):
         """
-        binary expression
+        binary expression, run by its specialization while its guard holds
         :param expr: expr
         :return:
         """
         left = self._evaluate(expr.left)
         right = self._evaluate(expr.right)
+        specialization = expr.specialization
+        if specialization is not None:
+            types, operation = specialization
+            if type(left) is types[1] and type(right) is types[2]:
+                self.specializer.hits += 1
+                return operation(left, right)
+            self.specializer.deoptimize(expr)
+        self.specializer.observe(expr, (expr.operator.type, type(left), type(right)),
+                                 BINARY_SPECIALIZATIONS)
+        return self._binary(expr, left, right)
+
+    def _binary(self, expr, left, right):
+        """
+        general path of binary expressions
+        :param expr: expr
+        :param left: value of the left operand
+        :param right: value of the right operand
+        :return:
+        """
         op_type = expr.operator.type
+        if (type(left) is Vector or type(right) is Vector) and op_type in _VECTOR_OPERATORS:
+            try:
+                return arithmetic(expr.operator.lexeme, left, right)
+            except LoxRuntimeError as error:
+                error.token = expr.operator
+                raise
 
         if op_type == TokenType.GREATER:
             self._check_number_operands(expr.operator, left, right)
@@ -92,8 +175,8 @@ class Interpreter(Visitor, LoxCallable):
         elif op_type == TokenType.PLUS:
             if isinstance(left, float) and isinstance(right, float):
                 return float(left) + float(right)
-            if isinstance(left, str) and isinstance(right, str):
-                return str(left) + str(right)
+            if type(left) in STRINGS and type(right) in STRINGS:
+                return concat(left, right)
         elif op_type == TokenType.SLASH:
             self._check_number_operands(expr.operator, left, right)
             return float(left) / float(right)
@@ -126,96 +209,296 @@ class Interpreter(Visitor, LoxCallable):
 
     def visit_unary_expr(self, expr):
         """
-        unary expressions
+        unary expressions, run by their specialization while its guard holds
         :param expr: expressions
         :return:
         """
         right = self._evaluate(expr.right)
+        specialization = expr.specialization
+        if specialization is not None:
+            types, operation = specialization
+            if type(right) is types[1]:
+                self.specializer.hits += 1
+                return operation(right)
+            self.specializer.deoptimize(expr)
+        self.specializer.observe(expr, (expr.operator.type, type(right)), UNARY_SPECIALIZATIONS)
         op_type = expr.operator.type
         if op_type == TokenType.MINUS:
             return -float(right)
         elif op_type == TokenType.BANG:
-            return not self._is_truthy(right)
+            return not self.is_truthy(right)
         else:
             return None
 
     def visit_variable_expr(self, expr):
-        return self.environment.get(expr.name)
+        depth = expr.depth
+        if depth is None:
+            return self.globals.get(expr.name)
+        if depth == 0:
+            return self.environment.slots[expr.slot]
+        return self.environment.get_at(depth, expr.slot)
 
     def visit_assign_expr(self, expr):
         value = self._evaluate(expr.value)
-        self.environment.assign(expr.name, value)
+        depth = expr.depth
+        if depth is None:
+            self.globals.assign(expr.name, value)
+        elif depth == 0:
+            self.environment.slots[expr.slot] = value
+        else:
+            self.environment.assign_at(depth, expr.slot, value)
         return value
 
     def visit_logical_expr(self, expr):
         left = self._evaluate(expr.left)
-        if expr.operator.type == TokenType.OR:
-            if self._is_truthy(left):
-                return left
+        specialization = expr.specialization
+        if specialization is not None and type(left) is specialization[0]:
+            self.specializer.hits += 1
+            truthy = specialization[1](left)
         else:
-            if self._is_truthy(left):
-                return left
+            if specialization is not None:
+                self.specializer.deoptimize(expr)
+            self.specializer.observe(expr, type(left), LOGICAL_SPECIALIZATIONS)
+            truthy = self.is_truthy(left)
+        if truthy == (expr.operator.type == TokenType.OR):
+            return left
         return self._evaluate(expr.right)
 
+    def visit_list_expr(self, expr):
+        return [self._evaluate(element) for element in expr.elements]
+
+    def visit_map_expr(self, expr):
+        keys = [self._evaluate(key) for key in expr.keys]
+        values = [self._evaluate(value) for value in expr.values]
+        try:
+            return new_map(keys, values)
+        except LoxRuntimeError as error:
+            error.token = expr.brace
+            raise
+
+    def visit_index_expr(self, expr):
+        collection = self._evaluate(expr.collection)
+        index = self._evaluate(expr.index)
+        try:
+            return get_index(collection, index)
+        except LoxRuntimeError as error:
+            error.token = expr.bracket
+            raise
+
+    def visit_setindex_expr(self, expr):
+        collection = self._evaluate(expr.collection)
+        index = self._evaluate(expr.index)
+        value = self._evaluate(expr.value)
+        try:
+            return set_index(collection, index, value)
+        except LoxRuntimeError as error:
+            error.token = expr.bracket
+            raise
+
+    def visit_get_expr(self, expr):
+        """
+        property read, from the slot or method cached for the instance's
+        shape while it is the cached one
+        :param expr: Get
+        :return: the field, or the bound method
+        """
+        instance = self._evaluate(expr.object)
+        cache = expr.cache
+        if cache is not None and type(instance) is LoxInstance and instance.shape is cache[0]:
+            self.property_cache.hits += 1
+            slot = cache[1]
+            if slot is not None:
+                return instance.fields[slot]
+            return cache[2].bind(instance)
+        return self.property_cache.get(expr, instance)
+
+    def visit_set_expr(self, expr):
+        instance = self._evaluate(expr.object)
+        if type(instance) is not LoxInstance:
+            raise LoxRuntimeError(expr.name, "Only instances have fields.")
+        value = self._evaluate(expr.value)
+        cache = expr.cache
+        if cache is not None and instance.shape is cache[0]:
+            self.property_cache.hits += 1
+            shape = cache[2]
+            if shape is None:
+                instance.fields[cache[1]] = value
+            else:
+                instance.fields.append(value)
+                instance.shape = shape
+            return value
+        return self.property_cache.set(expr, instance, value)
+
+    def visit_this_expr(self, expr):
+        return self.environment.get_at(expr.depth, expr.slot)
+
+    def visit_super_expr(self, expr):
+        superclass = self.environment.get_at(expr.depth, expr.slot)
+        # this is in the scope enclosed by super's
+        instance = self.environment.get_at(expr.depth - 1, 0)
+        method = superclass.find_method(expr.method.lexeme)
+        if method is None:
+            raise LoxRuntimeError(expr.method, "Undefined property '{}'.".format(
+                expr.method.lexeme))
+        return method.bind(instance)
+
+    def visit_class_stmt(self, stmt):
+        superclass = None
+        if stmt.superclass is not None:
+            superclass = self._evaluate(stmt.superclass)
+            if type(superclass) is not LoxClass:
+                raise LoxRuntimeError(stmt.superclass.name, "Superclass must be a class.")
+        closure = self.environment
+        if superclass is not None:
+            closure = Environment(closure, 1)
+            closure.slots[0] = superclass
+        methods = {method.name.lexeme: LoxFunction(method, closure, method.name.lexeme == "init")
+                   for method in stmt.methods}
+        klass = LoxClass(stmt.name.lexeme, superclass, methods)
+        if stmt.slot is None:
+            self.globals.define(stmt.name.lexeme, klass)
+        else:
+            self.environment.slots[stmt.slot] = klass
+
     def visit_block_stmt(self, stmt):
-        self.execute_block(stmt.statements, Environment(enclosing=self.environment))
+        if not stmt.scoped:
+            for statement in stmt.statements:
+                if self._execute(statement) is RETURN:
+                    return RETURN
+            return None
+        return self.execute_block(stmt.statements, Environment(self.environment, stmt.slots))
 
     def visit_if_stmt(self, stmt):
-        if self._is_truthy(self._evaluate(stmt.condition)):
-            self._execute(stmt.then_branch)
-        elif stmt.else_branch is not None:
-            self._execute(stmt.else_branch)
+        if self.is_truthy(self._evaluate(stmt.condition)):
+            return self._execute(stmt.then_branch)
+        if stmt.else_branch is not None:
+            return self._execute(stmt.else_branch)
+        return None
 
     def visit_while_stmt(self, stmt):
-        while self._is_truthy(self._evaluate(stmt.condition)):
-            self._execute(stmt.body)
+        while self.is_truthy(self._evaluate(stmt.condition)):
+            if self._execute(stmt.body) is RETURN:
+                return RETURN
+        return None
+
+    def visit_for_stmt(self, stmt):
+        scope = stmt.scope
+        body = stmt.body
+        statements = body.statements if isinstance(body, Stmt.Block) else [body]
+        previous = self.environment
+        try:
+            if isinstance(stmt.initializer, Stmt.Var):
+                self.environment = Environment(previous, 1)
+            if stmt.initializer is not None:
+                self._execute(stmt.initializer)
+            loop = self.environment
+            reused = Environment(loop, body.slots) if scope == REUSED_SCOPE else None
+            while self.is_truthy(self._evaluate(stmt.condition)):
+                if scope == SHARED_SCOPE:
+                    for statement in statements:
+                        if self._execute(statement) is RETURN:
+                            return RETURN
+                elif scope == REUSED_SCOPE:
+                    if self.execute_block(statements, reused) is RETURN:
+                        return RETURN
+                elif self.execute_block(statements, Environment(loop, body.slots)) is RETURN:
+                    return RETURN
+                if stmt.increment is not None:
+                    self._evaluate(stmt.increment)
+        finally:
+            self.environment = previous
+        return None
 
     def visit_var_stmt(self, stmt):
         value = None
         if stmt.initializer is not None:
             value = self._evaluate(stmt.initializer)
-        self.environment.define(stmt.name.lexeme, value)
+        if stmt.slot is None:
+            self.globals.define(stmt.name.lexeme, value)
+        else:
+            self.environment.slots[stmt.slot] = value
 
     def visit_expression_stmt(self, stmt):
         self._evaluate(stmt.expression)
 
     def visit_function_stmt(self, stmt):
-        function = LoxFunction(stmt, self.environment)
-        self.environment.define(stmt.name.lexeme, function)
+        if self.memoizer is None:
+            function = LoxFunction(stmt, self.environment)
+        else:
+            function = self.memoizer.function(stmt, self.environment)
+        if stmt.slot is None:
+            self.globals.define(stmt.name.lexeme, function)
+        else:
+            self.environment.slots[stmt.slot] = function
 
     def visit_print_stmt(self, stmt):
         value = self._evaluate(stmt.expression)
-        print(self._stringify(value))
+        print(self.stringify(value))
 
     def visit_return_stmt(self, stmt):
+        """
+        return statement. A LoxFunction, memoized or not, called in tail
+        position is left to the LoxFunction.call in progress to run once
+        this call's frame is gone, so tail recursion takes no Python stack
+        :param stmt: stmt
+        :return: RETURN
+        """
+        if stmt.tail:
+            callee, arguments = self._callee_and_arguments(stmt.value)
+            if isinstance(callee, LoxFunction):
+                self.tail_call = (callee, arguments)
+                return RETURN
+            self.return_value = self._call(stmt.value, callee, arguments)
+            return RETURN
         value = None
         if stmt.value is not None:
             value = self._evaluate(stmt.value)
-        raise ReturnError(value)
+        self.return_value = value
+        return RETURN
 
     def visit_call_expr(self, expr):
-        callee = self._evaluate(expr.callee)
-        arguments = []
-        for argument in expr.arguments:
-            arguments.append(self._evaluate(argument))
-        if not isinstance(callee, LoxCallable):
-            raise LoxRuntimeError(expr.paren, "Can only call functions and classes.")
-        function = callee
-        # check arity
-        if len(arguments) is not function.arity():
-            error_msg = "Expected {} arguments, but got {}."\
-                .format(function.arity(), len(arguments))
-            raise LoxRuntimeError(expr.paren, error_msg)
-        return function.call(self, arguments)
+        """
+        call expression
+        :param expr: expr
+        :return: the returned value
+        """
+        callee, arguments = self._callee_and_arguments(expr)
+        return self._call(expr, callee, arguments)
 
-    def arity(self):
-        return 0
+    def _callee_and_arguments(self, expr):
+        """
+        evaluates the callee and arguments of a call, skipping the callee
+        checks while it is the callee cached at the call site
+        :param expr: Call
+        :return: (callee, arguments)
+        """
+        callee = self._evaluate(expr.callee)
+        arguments = [self._evaluate(argument) for argument in expr.arguments]
+        if callee is expr.cache:
+            self.call_cache.hits += 1
+        else:
+            self.call_cache.miss(expr, callee, len(arguments))
+        return callee, arguments
 
-    def call(self):
-        return time.time()
+    def _call(self, expr, callee, arguments):
+        """
+        :param expr: Call
+        :param callee: checked callee
+        :param arguments: arguments
+        :return: the returned value
+        """
+        try:
+            return callee.call(self, arguments)
+        except RecursionError:
+            raise LoxRuntimeError(expr.paren, "Stack overflow.")
+        except LoxRuntimeError as error:
+            # raised by a native, which knows no token
+            if error.token is None:
+                error.token = expr.paren
+            raise
 
     @staticmethod
-    def _is_truthy(object):
+    def is_truthy(object):
         """
         evaluate true/false of an object
         :param object: object
@@ -230,7 +513,9 @@ class Interpreter(Visitor, LoxCallable):
     @staticmethod
     def _is_equal(left, right):
         """
-        test equality
+        test equality, of lists and maps by their elements. Equal
+        string literals are interned, so == finds them the same str
+        without comparing characters
         :param left: left
         :param right: right
         :return: bool
@@ -255,7 +540,7 @@ class Interpreter(Visitor, LoxCallable):
         raise LoxRuntimeError(operator, "Operands must be numbers.")
 
     @staticmethod
-    def _stringify(object):
+    def stringify(object):
         """
         returns string of an object
         :param object: object
@@ -267,4 +552,4 @@ class Interpreter(Visitor, LoxCallable):
                 if text[-2:] == '.0':
                     text = text[:-2]
                 return text
-        return str(object)
+        return show(object)
@@ -5,26 +5,100 @@ lox.lox
 The main file for the lox programming language interpreter
 """
 import sys
+import argparse
+from pylox import batch
+from pylox.cache import ASTCache, DEFAULT_DIRECTORY
+from pylox.closurecompiler import ClosureInterpreter
+from pylox.error import locate
+from pylox.memoizer import Memoizer, CACHE_SIZE
+from pylox.native import NativeFunction
+from pylox.optimizer import Optimizer
 from pylox.parser import Parser
+from pylox.prattparser import PrattParser
+from pylox.purity import Purity
 from pylox.interpreter import Interpreter
-from pylox.scanner import Scanner
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner, TokenStream
+from pylox.transpiler import TranspiledInterpreter
+from pylox.vm import VM
+
+# characters read from a script at a time when streaming
+CHUNK_SIZE = 1 << 16
+
+# interpreters that can run resolved statements, by --engine name
+ENGINES = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+    "vm": VM,
+    "python": TranspiledInterpreter,
+}
 
 
 class Lox:
     """ Lox class"""
-    def __init__(self):
+    def __init__(self, bulk=False, compact=False, stream=False, pratt=False,
+                 cache_dir=None, optimize=False, engine="tree", max_depth=None,
+                 memoize=False, memo_size=CACHE_SIZE, pure=()):
+        """
+        init
+        :param bulk: scan with the bulk (one pattern per lexeme) scanner
+        :param compact: bulk scan into a compact TokenBuffer
+        :param stream: run files a statement at a time as they are read
+        :param pratt: parse expressions with the PrattParser
+        :param cache_dir: directory to cache files parsed by run_file in,
+        None to not cache
+        :param optimize: fold constants and drop dead branches before running
+        :param engine: name of the engine in ENGINES that runs the statements
+        :param max_depth: most calls in progress at once in the vm engine,
+        None for its default
+        :param memoize: memoize the functions found pure, in the tree engine
+        :param memo_size: most results kept per memoized function
+        :param pure: names of functions to memoize whether or not they are
+        found pure, in the tree engine
+        """
+        self.bulk = bulk
+        self.compact = compact
+        self.stream = stream
+        self.parser_class = PrattParser if pratt else Parser
+        self.cache = ASTCache(cache_dir) if cache_dir else None
+        self.optimizer = Optimizer() if optimize else None
+        self.resolver = Resolver(self.error)
         self.had_error = False
         self.had_runtime_error = False
-        self.interpreter = Interpreter()
+        self.interpreter = ENGINES[engine]()
+        if max_depth is not None:
+            self.interpreter.max_depth = max_depth
+        self.purity = Purity() if memoize else None
+        if memoize or pure:
+            self.interpreter.memoizer = Memoizer(memo_size, pure)
+
+    def define_native(self, name, function, arity=None):
+        """
+        makes a Python callable a global function of lox code. It is called
+        with the lox values of the arguments, and is to return a lox value:
+        a float, str, bool or None
+        :param name: name in lox
+        :param function: Python callable
+        :param arity: number of arguments, None for any number
+        :return: None
+        """
+        self.interpreter.define(name, NativeFunction(name, function, arity))
 
     def run_file(self, file):
         """ Runs file
         :param file: input file
         """
         with open(file) as content:
-            program = content.read()
+            if self.stream:
+                self.run_stream(iter(lambda: content.read(CHUNK_SIZE), ""))
+            elif self.cache:
+                self.run_cached(content.read())
+            else:
+                self.run(content.read())
+        self.exit_on_error()
 
-        self.run(program)
+    def exit_on_error(self):
+        """ exits with the error status if running failed """
         if self.had_error:
             sys.exit(65)
         elif self.had_runtime_error:
@@ -44,20 +118,93 @@ class Lox:
         """ Runs the input
         :param line: line to tokenize and eval
         """
-        scanner = Scanner(line)
-        tokens = scanner.scan_tokens()
-        parser = Parser(tokens, self.error)
-        statements = parser.parse()
-        self.interpreter.interpret(statements)
+        statements = self.parse(line)
+        self.execute(statements)
         if self.had_error:
             return
 
+    def run_cached(self, source):
+        """
+        Runs source, parsing it only if it is not in the cache
+        :param source: source to run
+        """
+        statements = self.cache.load(source)
+        if statements is None:
+            statements = self.parse(source)
+            if self.had_error:
+                return
+            self.cache.store(source, statements)
+        self.execute(statements)
+
+    def parse(self, line):
+        """ Scans and parses the input
+        :param line: line to tokenize and parse
+        :return: statements
+        """
+        scanner = Scanner(line, self.error)
+        if self.compact:
+            tokens = scanner.scan_buffer()
+        elif self.bulk:
+            tokens = scanner.scan_tokens_bulk()
+        else:
+            tokens = scanner.scan_tokens()
+        parser = self.parser_class(tokens, self.error)
+        return parser.parse()
+
+    def run_stream(self, chunks):
+        """
+        Runs source arriving in chunks, executing each top-level statement
+        as soon as it is parsed, so only the statement being run has to be
+        held in memory
+        :param chunks: iterable of source strings, e.g. a file object
+        """
+        scanner = Scanner(set_error=self.error)
+        tokens = TokenStream(scanner.scan_chunks(chunks))
+        parser = self.parser_class(tokens, self.error)
+        self.execute(parser.declarations(), streamed=True)
+
+    def execute(self, statements, streamed=False):
+        """
+        Optimizes, if enabled, resolves, finds the pure functions, if
+        memoizing, and interprets parsed statements
+        :param statements: iterable of statements
+        :param streamed: resolve each statement just before it runs, instead
+        of the whole program first and none of it if that found errors
+        """
+        if self.optimizer:
+            statements = self.optimizer.optimize(statements)
+        statements = self.resolver.resolve(statements)
+        if not streamed:
+            statements = list(statements)
+            if self.had_error:
+                return
+        if self.purity:
+            # the whole program, as a function may call one declared later
+            statements = list(statements)
+            self.purity.analyse(statements)
+        self.interpreter.interpret(statements)
+
+    def statistics(self):
+        """
+        :return: dict of counter name -> value of the engine, empty if it
+        keeps none
+        """
+        statistics = getattr(self.interpreter, "statistics", None)
+        return statistics() if statistics else {}
+
+    def print_statistics(self):
+        """ prints the engine's counters to stderr """
+        for name, value in self.statistics().items():
+            print("{}: {}".format(name, "{:.1%}".format(value) if isinstance(value, float)
+                                  else value), file=sys.stderr)
+
     def error(self, line, message):
         """ error
-        :param line: the location of error
+        :param line: the location of error, a line or token
         :param message: error message
         """
-        self.report(line + " " + message)
+        line, where = locate(line)
+        self.report(line, where, message)
 
     def runtimeerror(self, error):
         """
@@ -65,31 +212,79 @@ class Lox:
         :param error: error message
         :return: None
         """
-        error_message = "{0} \n [line {1}]".format(error.get_message(), error.token.line)
+        error_message = "{0} \n [line {1}]".format(error.get_message(), locate(error.token)[0])
         print(error_message)
         self.had_runtime_error = True
 
-    def report(self, line, where=None, message=None):
+    def report(self, line, where="", message=None):
         """ error
         :param line: line of error
         :param where: location of error
         :param: message: error message
         """
         self.had_error = True
-        raise Exception("[Line {0}] Error {1}: {2} ".format(line, where, message))
+        raise Exception("[Line {0}] Error{1}: {2}".format(line, where, message))
 
 
 def main():
     """ Main """
-    lox = Lox()
-    print(sys.argv)
-    if len(sys.argv) > 2:
-        print("Usage: jlox [script]")
-        sys.exit(64)
-    elif len(sys.argv) == 2:
-        lox.run_file(sys.argv[1])
-    else:
-        lox.run_prompt()
+    if len(sys.argv) > 1 and sys.argv[1] in batch.COMMANDS:
+        sys.exit(batch.main(sys.argv[1:]))
+    arg_parser = argparse.ArgumentParser(prog="pylox")
+    arg_parser.add_argument("script", nargs="?",
+                            help="lox script to run, or - to stream stdin")
+    arg_parser.add_argument("--bulk", action="store_true",
+                            help="scan a whole lexeme at a time")
+    arg_parser.add_argument("--compact", action="store_true",
+                            help="bulk scan into a compact token buffer")
+    arg_parser.add_argument("--stream", action="store_true",
+                            help="run each statement as soon as it is read")
+    arg_parser.add_argument("--pratt", action="store_true",
+                            help="parse expressions by precedence climbing")
+    arg_parser.add_argument("--cache", dest="cache_dir", action="store_const",
+                            const=DEFAULT_DIRECTORY,
+                            help="cache parsed scripts in {} ($PYLOX_CACHE_DIR)".format(
+                                DEFAULT_DIRECTORY))
+    arg_parser.add_argument("--cache-dir", default=None,
+                            help="cache parsed scripts in this directory")
+    arg_parser.add_argument("--no-cache", dest="cache_dir", action="store_const", const=None,
+                            help="do not cache parsed scripts, the default")
+    arg_parser.add_argument("-O", dest="optimize", action="store_true",
+                            help="fold constants and drop dead branches")
+    arg_parser.add_argument("--engine", choices=ENGINES, default="tree",
+                            help="walk the syntax tree, or run it compiled to closures, bytecode "
+                            "or Python")
+    arg_parser.add_argument("--max-depth", type=int, default=None,
+                            help="most calls in progress at once in the vm engine, whose "
+                            "call stack is not Python's")
+    arg_parser.add_argument("--memoize", action="store_true",
+                            help="cache the results of the functions found pure")
+    arg_parser.add_argument("--memo-size", type=int, default=CACHE_SIZE,
+                            help="most results cached per memoized function")
+    arg_parser.add_argument("--pure", action="append", default=[], metavar="NAME",
+                            help="cache the results of the functions of this name, pure or not")
+    arg_parser.add_argument("--stats", action="store_true",
+                            help="print the engine's counters to stderr after running")
+    args = arg_parser.parse_args()
+    if args.max_depth is not None and args.engine != "vm":
+        arg_parser.error("--max-depth needs --engine=vm")
+    if (args.memoize or args.pure) and args.engine != "tree":
+        arg_parser.error("--memoize and --pure need --engine=tree")
+    lox = Lox(bulk=args.bulk, compact=args.compact, stream=args.stream, pratt=args.pratt,
+              cache_dir=args.cache_dir, optimize=args.optimize, engine=args.engine,
+              max_depth=args.max_depth, memoize=args.memoize, memo_size=args.memo_size,
+              pure=args.pure)
+    try:
+        if args.script == "-":
+            lox.run_stream(sys.stdin)
+            lox.exit_on_error()
+        elif args.script:
+            lox.run_file(args.script)
+        else:
+            lox.run_prompt()
+    finally:
+        if args.stats:
+            lox.print_statistics()
 
 
 if __name__ == "__main__":
@@ -14,6 +14,7 @@ class LoxCallable(ABC):
     def arity(self):
         """
         checks arity
+        :return: number of arguments, None for any number
         """
 
     @abstractmethod
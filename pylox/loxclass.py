@@ -0,0 +1,126 @@
+"""
+pylox.loxclass
+~~~~~~~~~~~~~~~~
+classes and their instances. An instance keeps its fields in a list, at
+the slots its Shape gives their names, instead of in a dict of its own:
+instances given the same fields in the same order share a Shape, so a
+property site that saw a shape knows where the field is, or which method
+the name is, for every instance of that shape
+"""
+from pylox.loxcallable import LoxCallable
+
+
+class Shape:
+    """
+    Shape: the fields an instance of a class has, by name -> slot. Adding a
+    field moves an instance to the next shape, made once per name and
+    shared by all the instances taking the same transition
+    """
+    __slots__ = ("klass", "slots", "_transitions")
+
+    def __init__(self, klass, slots):
+        """
+        init
+        :param klass: LoxClass of the instances of this shape
+        :param slots: dict of field name -> slot
+        """
+        self.klass = klass
+        self.slots = slots
+        # field name -> the shape with that field added
+        self._transitions = {}
+
+    def add(self, name):
+        """
+        :param name: name of a field not in this shape
+        :return: Shape of this one's fields and name, in the next slot
+        """
+        shape = self._transitions.get(name)
+        if shape is None:
+            slots = dict(self.slots)
+            slots[name] = len(slots)
+            shape = self._transitions[name] = Shape(self.klass, slots)
+        return shape
+
+
+class LoxInstance:
+    """
+    LoxInstance: an instance, its fields kept in the slots of its shape
+    """
+    __slots__ = ("shape", "fields")
+
+    def __init__(self, shape):
+        """
+        init
+        :param shape: Shape of an instance without fields
+        """
+        self.shape = shape
+        self.fields = []
+
+    def __str__(self):
+        """
+        overrides string
+        :return: str
+        """
+        return "{} instance".format(self.shape.klass.name)
+
+
+class LoxClass(LoxCallable):
+    """
+    LoxClass: a class, called to make an instance. Its methods are the
+    functions of the engine running it, bound to an instance by their bind
+    """
+    def __init__(self, name, superclass, methods):
+        """
+        init
+        :param name: name of the class
+        :param superclass: LoxClass it inherits from, or None
+        :param methods: dict of name -> function, of its own methods
+        """
+        self.name = name
+        self.superclass = superclass
+        self.methods = methods
+        # shape of its instances when made
+        self.shape = Shape(self, {})
+        # its init method, or None
+        self.initializer = self.find_method("init")
+        self._arity = 0 if self.initializer is None else self.initializer.arity()
+
+    def find_method(self, name):
+        """
+        :param name: name of a method
+        :return: the method of that name of the class or the closest
+        superclass having one, or None
+        """
+        klass = self
+        while klass is not None:
+            method = klass.methods.get(name)
+            if method is not None:
+                return method
+            klass = klass.superclass
+        return None
+
+    def arity(self):
+        """
+        returns arity
+        :return: int, the arity of init
+        """
+        return self._arity
+
+    def call(self, interpreter, arguments):
+        """
+        makes an instance, running init on it if the class has one
+        :param interpreter: engine running the call
+        :param arguments: arguments of init
+        :return: LoxInstance
+        """
+        instance = LoxInstance(self.shape)
+        if self.initializer is not None:
+            self.initializer.bind(instance).call(interpreter, arguments)
+        return instance
+
+    def __str__(self):
+        """
+        overrides string
+        :return: str
+        """
+        return self.name
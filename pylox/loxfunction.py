@@ -5,28 +5,47 @@ class LoxFunction that implements LoxCallable
 """
 from pylox.loxcallable import LoxCallable
 from pylox.environment import Environment
-from pylox.error import Return
+from pylox.error import RETURN
 
 
 class LoxFunction(LoxCallable):
     """
     LoxFunction
     """
-    def __init__(self, declaration=None, closure=None):
+    def __init__(self, declaration=None, closure=None, is_initializer=False):
         """
         init
         :param declaration: declarations
         :param closure: closure
+        :param is_initializer: the init method of a class, returning this
         """
         self._declaration = declaration
         self.closure = closure
+        self._arity = len(declaration.params)
+        self._is_initializer = is_initializer
+        # environments of finished calls, ready for the next one; only a
+        # leaf function's are, as nothing can refer to them once it returns
+        self._frames = [] if declaration.leaf else None
+
+    def bind(self, instance):
+        """
+        :param instance: LoxInstance
+        :return: the method with this bound to instance, in a scope of its
+        own enclosing the method's closure
+        """
+        environment = Environment(self.closure, 1)
+        environment.slots[0] = instance
+        method = LoxFunction(self._declaration, environment, self._is_initializer)
+        # the environments of every binding differ only in what encloses them
+        method._frames = self._frames
+        return method
 
     def arity(self):
         """
         returns arity
         :return: int
         """
-        return len(self._declaration.params)
+        return self._arity
 
     def call(self, interpreter, arguments):
         """
@@ -35,14 +54,46 @@ class LoxFunction(LoxCallable):
         :param arguments: arguments
         :return: None
         """
-        environment = Environment(self.closure)
-        for i in range(len(arguments)):
-            environment.define(self._declaration.params[i].lexeme, arguments[i])
-        try:
-            interpreter.execute_block(self._declaration.body, environment)
-        except Return as return_error:
-            return return_error.value
-        return None
+        function = self
+        # (MemoizedFunction, key) of the memoized functions tail called,
+        # whose result is this call's
+        memoized = None
+        while True:
+            declaration = function._declaration
+            frames = function._frames
+            if frames:
+                environment = frames.pop()
+                environment.enclosing = function.closure
+            else:
+                environment = Environment(function.closure, declaration.slots)
+            environment.slots[:function._arity] = arguments
+            completion = interpreter.execute_block(declaration.body, environment)
+            if frames is not None:
+                frames.append(environment)
+            if completion is not RETURN:
+                result = function.closure.slots[0] if function._is_initializer else None
+                break
+            if interpreter.tail_call is None:
+                result = function.closure.slots[0] if function._is_initializer \
+                    else interpreter.return_value
+                break
+            # returned a call of a LoxFunction: run it in place of this one
+            function, arguments = interpreter.tail_call
+            interpreter.tail_call = None
+            if type(function) is not LoxFunction:
+                # a MemoizedFunction, whose result may be cached
+                key = function.key(arguments)
+                if key is not None:
+                    found, result = function.lookup(key)
+                    if found:
+                        break
+                    if memoized is None:
+                        memoized = []
+                    memoized.append((function, key))
+        if memoized is not None:
+            for function, key in memoized:
+                function.store(key, result)
+        return result
 
     def __str__(self):
         """
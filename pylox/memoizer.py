@@ -0,0 +1,153 @@
+"""
+pylox.memoizer
+~~~~~~~~~~~~~~~~
+result caches for pure functions: a call with arguments seen before
+returns the result of the first call, without running the body
+"""
+from collections import OrderedDict
+from pylox.loxfunction import LoxFunction
+from pylox.vector import Vector
+
+# results kept per function, by default
+CACHE_SIZE = 256
+
+# types of the arguments whose calls are not cached
+_MUTABLE = frozenset((list, dict, Vector))
+
+
+class _Counter:
+    """
+    _Counter: how the caches of the functions of one name went
+    """
+    __slots__ = ("hits", "misses", "evictions")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+class MemoizedFunction(LoxFunction):
+    """
+    MemoizedFunction: LoxFunction keeping the results of its latest calls,
+    least recently used dropped first
+    """
+    def __init__(self, declaration, closure, size, counter):
+        """
+        init
+        :param declaration: Function statement
+        :param closure: environment the function was declared in
+        :param size: most results kept
+        :param counter: _Counter of the function's name
+        """
+        super().__init__(declaration, closure)
+        self._size = size
+        self._counter = counter
+        # (arguments, their types) -> result
+        self._results = OrderedDict()
+
+    def key(self, arguments):
+        """
+        :param arguments: arguments of a call
+        :return: key of the call's result, or None if it is not to be cached
+        """
+        argument_types = tuple(map(type, arguments))
+        if not _MUTABLE.isdisjoint(argument_types):
+            # a list, map or vector could be changed before the next call
+            return None
+        # with the types, as 1 == true in Python
+        return tuple(arguments), argument_types
+
+    def lookup(self, key):
+        """
+        :param key: key of a call's result
+        :return: (True, result) if it is cached, else (False, None)
+        """
+        results = self._results
+        if key in results:
+            self._counter.hits += 1
+            results.move_to_end(key)
+            return True, results[key]
+        self._counter.misses += 1
+        return False, None
+
+    def store(self, key, result):
+        """
+        keeps a call's result, dropping the least recently used if full
+        :param key: key of the call's result
+        :param result: the returned value
+        :return: None
+        """
+        results = self._results
+        results[key] = result
+        if len(results) > self._size:
+            results.popitem(last=False)
+            self._counter.evictions += 1
+
+    def call(self, interpreter, arguments):
+        """
+        calls the function, unless it was called with the same arguments
+        :param interpreter: interpreter
+        :param arguments: arguments
+        :return: the returned value
+        """
+        key = self.key(arguments)
+        if key is None:
+            return super().call(interpreter, arguments)
+        found, result = self.lookup(key)
+        if found:
+            return result
+        result = super().call(interpreter, arguments)
+        self.store(key, result)
+        return result
+
+
+class Memoizer:
+    """
+    Memoizer: declares the functions marked pure, or named to be, as
+    MemoizedFunctions, and counts how their caches go
+    """
+    def __init__(self, size=CACHE_SIZE, names=()):
+        """
+        init
+        :param size: most results kept per function
+        :param names: names of functions to memoize whether or not they
+        were found pure
+        """
+        self.size = size
+        self.names = frozenset(names)
+        # function name -> _Counter
+        self._counters = {}
+
+    def function(self, stmt, closure):
+        """
+        :param stmt: Function statement
+        :param closure: environment the function is declared in
+        :return: MemoizedFunction if the function is to be memoized, else
+        LoxFunction
+        """
+        name = stmt.name.lexeme
+        if not stmt.pure and name not in self.names:
+            return LoxFunction(stmt, closure)
+        counter = self._counters.get(name)
+        if counter is None:
+            counter = self._counters[name] = _Counter()
+        return MemoizedFunction(stmt, closure, self.size, counter)
+
+    def statistics(self):
+        """
+        :return: dict of counter name -> value
+        """
+        counters = self._counters.values()
+        hits = sum(counter.hits for counter in counters)
+        calls = hits + sum(counter.misses for counter in counters)
+        statistics = {
+            "memo hits": hits,
+            "memo misses": calls - hits,
+            "memo evictions": sum(counter.evictions for counter in counters),
+            "memo hit rate": hits / calls if calls else 0.0,
+        }
+        for name, counter in self._counters.items():
+            calls = counter.hits + counter.misses
+            statistics["memo hit rate " + name] = counter.hits / calls if calls else 0.0
+        return statistics
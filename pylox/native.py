@@ -0,0 +1,314 @@
+"""
+pylox.native
+~~~~~~~~~~~~~~~~
+functions written in Python that lox code can call, and the standard ones
+every engine defines as globals
+"""
+import math
+import time
+from pylox.collection import key, lox_key, show
+from pylox.error import LoxRuntimeError
+from pylox.loxcallable import LoxCallable
+from pylox.rope import Rope
+from pylox.vector import Vector, vector, total, part, dot as vector_dot
+
+
+class NativeFunction(LoxCallable):
+    """
+    NativeFunction: a Python callable called with the lox arguments as they
+    are, and returning a lox value
+    """
+    __slots__ = ("name", "function", "_arity", "with_engine")
+
+    def __init__(self, name, function, arity=None, with_engine=False):
+        """
+        init
+        :param name: name in lox
+        :param function: Python callable
+        :param arity: number of arguments, None for any number
+        :param with_engine: pass the engine running the call first, for
+        natives calling lox functions with its call_function
+        """
+        self.name = name
+        self.function = function
+        self._arity = arity
+        self.with_engine = with_engine
+
+    def arity(self):
+        """
+        returns arity
+        :return: int, None for any number of arguments
+        """
+        return self._arity
+
+    def call(self, interpreter, arguments):
+        """
+        calls the Python callable
+        :param interpreter: engine running the call
+        :param arguments: arguments
+        :return: the returned value
+        """
+        if self.with_engine:
+            return self.function(interpreter, *arguments)
+        return self.function(*arguments)
+
+    def __str__(self):
+        """
+        overrides string
+        :return: str
+        """
+        return "<native fn {}>".format(self.name)
+
+
+# name -> NativeFunction, of the standard natives
+NATIVES = {}
+
+
+def native(arity=None, name=None, with_engine=False):
+    """
+    decorator adding a Python function to the standard natives
+    :param arity: number of arguments, None for any number
+    :param name: name in lox, the function's by default
+    :param with_engine: pass the engine running the call first
+    :return: decorator
+    """
+    def register(function):
+        lox_name = name or function.__name__.rstrip("_")
+        NATIVES[lox_name] = NativeFunction(lox_name, function, arity, with_engine)
+        return function
+    return register
+
+
+def _number(value):
+    """
+    :param value: argument
+    :return: value, if a number
+    """
+    if type(value) is not float:
+        raise LoxRuntimeError(None, "Argument must be a number.")
+    return value
+
+
+def _vector(value):
+    """
+    :param value: argument
+    :return: value, if a vector
+    """
+    if type(value) is not Vector:
+        raise LoxRuntimeError(None, "Argument must be a vector.")
+    return value
+
+
+def _list(value):
+    """
+    :param value: argument
+    :return: value, if a list
+    """
+    if type(value) is not list:
+        raise LoxRuntimeError(None, "Argument must be a list.")
+    return value
+
+
+def _map(value):
+    """
+    :param value: argument
+    :return: value, if a map
+    """
+    if type(value) is not dict:
+        raise LoxRuntimeError(None, "Argument must be a map.")
+    return value
+
+
+def _string(value):
+    """
+    :param value: argument
+    :return: value, if a string
+    """
+    if type(value) is Rope:
+        return value.flatten()
+    if type(value) is not str:
+        raise LoxRuntimeError(None, "Argument must be a string.")
+    return value
+
+
+@native(arity=0)
+def clock():
+    """ clock(): seconds since an arbitrary point, for timing """
+    return time.perf_counter()
+
+
+@native(arity=1)
+def abs_(value):
+    """ abs(x): x without its sign """
+    return abs(_number(value))
+
+
+@native(arity=1)
+def floor(value):
+    """ floor(x): x rounded down """
+    try:
+        return float(math.floor(_number(value)))
+    except (OverflowError, ValueError) as error:
+        raise LoxRuntimeError(None, "Math error: {}.".format(error)) from error
+
+
+@native(arity=1)
+def ceil(value):
+    """ ceil(x): x rounded up """
+    try:
+        return float(math.ceil(_number(value)))
+    except (OverflowError, ValueError) as error:
+        raise LoxRuntimeError(None, "Math error: {}.".format(error)) from error
+
+
+@native(arity=1)
+def sqrt(value):
+    """ sqrt(x): square root of x """
+    if _number(value) < 0:
+        raise LoxRuntimeError(None, "Square root of a negative number.")
+    return math.sqrt(value)
+
+
+@native(arity=2)
+def pow_(base, exponent):
+    """ pow(x, y): x to the power y """
+    try:
+        return math.pow(_number(base), _number(exponent))
+    except (ValueError, OverflowError) as error:
+        raise LoxRuntimeError(None, "Math error: {}.".format(error)) from error
+
+
+@native()
+def min_(*values):
+    """ min(x, ...): the least of the numbers """
+    if not values:
+        raise LoxRuntimeError(None, "Expected at least 1 argument.")
+    return min(map(_number, values))
+
+
+@native()
+def max_(*values):
+    """ max(x, ...): the greatest of the numbers """
+    if not values:
+        raise LoxRuntimeError(None, "Expected at least 1 argument.")
+    return max(map(_number, values))
+
+
+@native(arity=1)
+def len_(value):
+    """ len(x): length of a string, list, map or vector """
+    if type(value) in (Vector, list, dict, Rope):
+        return float(len(value))
+    return float(len(_string(value)))
+
+
+@native(arity=3)
+def substr(string, start, end):
+    """ substr(s, start, end): the characters of s from start up to end """
+    return _string(string)[int(_number(start)):int(_number(end))]
+
+
+@native(arity=1)
+def upper(string):
+    """ upper(s): s in upper case """
+    return _string(string).upper()
+
+
+@native(arity=1)
+def lower(string):
+    """ lower(s): s in lower case """
+    return _string(string).lower()
+
+
+@native(arity=1)
+def str_(value):
+    """ str(x): x as print shows it """
+    return show(value)
+
+
+@native(arity=1)
+def num(string):
+    """ num(s): the number s spells, or nil """
+    try:
+        return float(_string(string))
+    except ValueError:
+        return None
+
+
+@native()
+def vec(*values):
+    """ vec(x, ...): vector of the numbers """
+    return vector(map(_number, values))
+
+
+@native(arity=1)
+def sum_(values):
+    """ sum(v): sum of the elements of a vector """
+    return total(_vector(values))
+
+
+@native(arity=2)
+def dot(left, right):
+    """ dot(v, w): dot product of two vectors """
+    return vector_dot(_vector(left), _vector(right))
+
+
+@native(arity=2, with_engine=True)
+def map_(engine, function, values):
+    """ map(f, v): vector of f of each element of v """
+    return vector(_number(engine.call_function(function, [float(value)]))
+                  for value in _vector(values).values)
+
+
+@native(arity=3)
+def slice_(values, start, end):
+    """ slice(v, start, end): vector of the elements of v from start up to end """
+    return part(_vector(values), int(_number(start)), int(_number(end)))
+
+
+@native(arity=2)
+def append(values, value):
+    """ append(list, x): adds x to the end of list """
+    _list(values).append(value)
+
+
+@native(arity=1)
+def pop(values):
+    """ pop(list): removes and returns the last element of list """
+    if not _list(values):
+        raise LoxRuntimeError(None, "Pop from an empty list.")
+    return values.pop()
+
+
+@native(arity=2)
+def fill(count, value):
+    """ fill(n, x): list of n x """
+    if _number(count) < 0 or not count.is_integer():
+        raise LoxRuntimeError(None, "Count must be a whole number.")
+    return [value] * int(count)
+
+
+@native()
+def dict_(*entries):
+    """ dict(key, value, key, value, ...): map of the keys to their values """
+    if len(entries) % 2:
+        raise LoxRuntimeError(None, "Expected a value for every key.")
+    return {key(entries[index]): entries[index + 1] for index in range(0, len(entries), 2)}
+
+
+@native(arity=1)
+def keys(entries):
+    """ keys(map): list of the keys of map """
+    return [lox_key(map_key) for map_key in _map(entries)]
+
+
+@native(arity=2)
+def has(entries, map_key):
+    """ has(map, key): whether map has key """
+    return key(map_key) in _map(entries)
+
+
+@native(arity=2)
+def remove(entries, map_key):
+    """ remove(map, key): removes key from map, returning its value or nil """
+    return _map(entries).pop(key(map_key), None)
@@ -0,0 +1,207 @@
+"""
+pylox.optimizer
+~~~~~~~~~~~~~~~~
+constant folding and dead branch elimination between the Parser and the
+Interpreter
+"""
+import pylox.expr as Expr
+import pylox.stmt as Stmt
+from pylox.expr import Visitor
+from pylox.interpreter import Interpreter
+from pylox.rope import flat
+from pylox.scanner import TokenType
+
+
+class Optimizer(Visitor):
+    """
+    Rewrites statements in place: constant Unary, Binary and Logical
+    expressions become Literals, Groupings are removed, and branches whose
+    condition is a Literal that can never run are dropped. Constants are
+    evaluated by an Interpreter, so folding gives exactly the value the
+    expression would have at runtime, and an expression that would fail at
+    runtime is left as it is to fail there
+    """
+    def __init__(self):
+        self._interpreter = Interpreter()
+
+    def optimize(self, statements):
+        """
+        optimize statements, dropping those that can never run
+        :param statements: iterable of statements
+        :return: generator of statements
+        """
+        for statement in statements:
+            statement = self._statement(statement)
+            if statement is not None:
+                yield statement
+
+    def _statement(self, stmt):
+        """
+        :param stmt: statement or None
+        :return: optimized statement or None if it does nothing
+        """
+        if stmt is None:
+            return None
+        return stmt.accept(self)
+
+    def _statements(self, statements):
+        return [statement for statement in map(self._statement, statements)
+                if statement is not None]
+
+    def _expression(self, expr):
+        return expr.accept(self)
+
+    def _fold(self, expr):
+        """
+        evaluate a constant expression
+        :param expr: expression with only Literal operands
+        :return: Literal of its value, or expr if evaluating it fails. A
+        long string is joined, as a Literal's value is a constant of the
+        code the engines generate
+        """
+        try:
+            return Expr.Literal(flat(expr.accept(self._interpreter)))
+        except (RuntimeError, ArithmeticError, ValueError, TypeError):
+            return expr
+
+    def visit_binary_expr(self, expr):
+        expr.left = self._expression(expr.left)
+        expr.right = self._expression(expr.right)
+        if isinstance(expr.left, Expr.Literal) and isinstance(expr.right, Expr.Literal):
+            return self._fold(expr)
+        return expr
+
+    def visit_grouping_expr(self, expr):
+        return self._expression(expr.expression)
+
+    def visit_literal_expr(self, expr):
+        return expr
+
+    def visit_unary_expr(self, expr):
+        expr.right = self._expression(expr.right)
+        if isinstance(expr.right, Expr.Literal):
+            return self._fold(expr)
+        return expr
+
+    def visit_assign_expr(self, expr):
+        expr.value = self._expression(expr.value)
+        return expr
+
+    def visit_variable_expr(self, expr):
+        return expr
+
+    def visit_logical_expr(self, expr):
+        expr.left = self._expression(expr.left)
+        expr.right = self._expression(expr.right)
+        if not isinstance(expr.left, Expr.Literal):
+            return expr
+        truthy = Interpreter.is_truthy(expr.left.value)
+        if truthy == (expr.operator.type == TokenType.OR):
+            return expr.left
+        return expr.right
+
+    def visit_call_expr(self, expr):
+        expr.callee = self._expression(expr.callee)
+        expr.arguments = [self._expression(argument) for argument in expr.arguments]
+        return expr
+
+    def visit_list_expr(self, expr):
+        expr.elements = [self._expression(element) for element in expr.elements]
+        return expr
+
+    def visit_map_expr(self, expr):
+        expr.keys = [self._expression(key) for key in expr.keys]
+        expr.values = [self._expression(value) for value in expr.values]
+        return expr
+
+    def visit_index_expr(self, expr):
+        expr.collection = self._expression(expr.collection)
+        expr.index = self._expression(expr.index)
+        return expr
+
+    def visit_setindex_expr(self, expr):
+        expr.collection = self._expression(expr.collection)
+        expr.index = self._expression(expr.index)
+        expr.value = self._expression(expr.value)
+        return expr
+
+    def visit_get_expr(self, expr):
+        expr.object = self._expression(expr.object)
+        return expr
+
+    def visit_set_expr(self, expr):
+        expr.object = self._expression(expr.object)
+        expr.value = self._expression(expr.value)
+        return expr
+
+    def visit_this_expr(self, expr):
+        return expr
+
+    def visit_super_expr(self, expr):
+        return expr
+
+    def visit_class_stmt(self, stmt):
+        for method in stmt.methods:
+            self.visit_function_stmt(method)
+        return stmt
+
+    def visit_block_stmt(self, stmt):
+        stmt.statements = self._statements(stmt.statements)
+        return stmt
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression = self._expression(stmt.expression)
+        return stmt
+
+    def visit_function_stmt(self, stmt):
+        stmt.body = self._statements(stmt.body)
+        return stmt
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition = self._expression(stmt.condition)
+        stmt.then_branch = self._statement(stmt.then_branch)
+        stmt.else_branch = self._statement(stmt.else_branch)
+        if isinstance(stmt.condition, Expr.Literal):
+            if Interpreter.is_truthy(stmt.condition.value):
+                return stmt.then_branch
+            return stmt.else_branch
+        if stmt.then_branch is None:
+            stmt.then_branch = Stmt.Block([])
+        return stmt
+
+    def visit_print_stmt(self, stmt):
+        stmt.expression = self._expression(stmt.expression)
+        return stmt
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is not None:
+            stmt.value = self._expression(stmt.value)
+        return stmt
+
+    def visit_var_stmt(self, stmt):
+        if stmt.initializer is not None:
+            stmt.initializer = self._expression(stmt.initializer)
+        return stmt
+
+    def visit_while_stmt(self, stmt):
+        stmt.condition = self._expression(stmt.condition)
+        if isinstance(stmt.condition, Expr.Literal) \
+                and not Interpreter.is_truthy(stmt.condition.value):
+            return None
+        stmt.body = self._statement(stmt.body)
+        if stmt.body is None:
+            stmt.body = Stmt.Block([])
+        return stmt
+
+    def visit_for_stmt(self, stmt):
+        stmt.initializer = self._statement(stmt.initializer)
+        stmt.condition = self._expression(stmt.condition)
+        if isinstance(stmt.condition, Expr.Literal) \
+                and not Interpreter.is_truthy(stmt.condition.value):
+            return None if stmt.initializer is None else Stmt.Block([stmt.initializer])
+        if stmt.increment is not None:
+            stmt.increment = self._expression(stmt.increment)
+        stmt.body = self._statement(stmt.body)
+        if stmt.body is None:
+            stmt.body = Stmt.Block([])
+        return stmt
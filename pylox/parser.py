@@ -4,7 +4,7 @@ Parser
 """
 import pylox.expr as Expr
 import pylox.stmt as Stmt
-from pylox.scanner import TokenType
+from pylox.scanner import TokenType, TokenBuffer
 
 
 class Parser:
@@ -12,22 +12,38 @@ class Parser:
     Parser class
     """
     def __init__(self, tokens, set_error):
+        """
+        init
+        :param tokens: list of Tokens or a TokenBuffer
+        :param set_error: error handler
+        """
         self._current = 0
         self.tokens = tokens
         self.error_handler = set_error
+        if isinstance(tokens, TokenBuffer):
+            self._type_at = tokens.type_at
+        else:
+            self._type_at = lambda index: tokens[index].type
 
     def parse(self):
         """
         parse declarations or statements
         :return: expressions
         """
-        statements = []
+        return list(self.declarations())
+
+    def declarations(self):
+        """
+        parse one top-level declaration at a time
+        :return: generator of statements
+        """
         while not self._at_end():
-            statements.append(self._declaration())
-        return statements
+            yield self._declaration()
 
     def _declaration(self):
         try:
+            if self._match(types=[TokenType.CLASS]):
+                return self._class_declaration()
             if self._match(types=[TokenType.FUN]):
                 return self._function("function")
             if self._match(types=[TokenType.VAR]):
@@ -37,6 +53,23 @@ class Parser:
             self._synchronize()
             return None
 
+    def _class_declaration(self):
+        """
+        classDecl → "class" IDENTIFIER ( "<" IDENTIFIER )? "{" function* "}" ;
+        :return: statement
+        """
+        name = self._consume(TokenType.IDENTIFIER, "Expect class name.")
+        superclass = None
+        if self._match(types=[TokenType.LESS]):
+            self._consume(TokenType.IDENTIFIER, "Expect superclass name.")
+            superclass = Expr.Variable(self._previous())
+        self._consume(TokenType.LEFT_BRACE, "Expect '{' before class body.")
+        methods = []
+        while not self._check(TokenType.RIGHT_BRACE) and not self._at_end():
+            methods.append(self._function("method"))
+        self._consume(TokenType.RIGHT_BRACE, "Expect '}' after class body.")
+        return Stmt.Class(name, superclass, methods)
+
     def _function(self, kind):
         name = self._consume(TokenType.IDENTIFIER, "Expect" + kind + "name")
         self._consume(TokenType.LEFT_PAREN, "Expect '(' after " + kind + " name.")
@@ -101,14 +134,9 @@ class Parser:
             increment = self._expression()
         self._consume(TokenType.RIGHT_PAREN, "Expect ')' after for clauses.")
         body = self._statement()
-        if increment:
-            body = Stmt.Block([body, Stmt.Expression(increment)])
         if condition is None:
             condition = Expr.Literal(True)
-        body = Stmt.While(condition, body)
-        if initializer:
-            body = Stmt.Block([initializer, body])
-        return body
+        return Stmt.For(initializer, condition, increment, body)
 
     def _if_statement(self):
         self._consume(TokenType.LEFT_PAREN, "Expect '(' after 'if'.")
@@ -161,6 +189,10 @@ class Parser:
             if isinstance(expr, Expr.Variable):
                 name = expr.name
                 return Expr.Assign(name, value)
+            if isinstance(expr, Expr.Index):
+                return Expr.SetIndex(expr.collection, expr.bracket, expr.index, value)
+            if isinstance(expr, Expr.Get):
+                return Expr.Set(expr.object, expr.name, value)
             self._error(equals, "Invalid assignment target.")
         return expr
 
@@ -253,11 +285,70 @@ class Parser:
         paren = self._consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
         return Expr.Call(callee, paren, arguments)
 
+    def _finish_index(self, collection):
+        """
+        index → call "[" expression "]" ;
+        :param collection: indexed expression
+        :return: expression
+        """
+        bracket = self._previous()
+        index = self._expression()
+        self._consume(TokenType.RIGHT_BRACKET, "Expect ']' after index.")
+        return Expr.Index(collection, bracket, index)
+
+    def _super(self):
+        """
+        "super" "." IDENTIFIER
+        :return: expression
+        """
+        keyword = self._previous()
+        self._consume(TokenType.DOT, "Expect '.' after 'super'.")
+        method = self._consume(TokenType.IDENTIFIER, "Expect superclass method name.")
+        return Expr.Super(keyword, method)
+
+    def _list(self):
+        """
+        list → "[" ( expression ( "," expression )* )? "]" ;
+        :return: expression
+        """
+        bracket = self._previous()
+        elements = []
+        if not self._check(TokenType.RIGHT_BRACKET):
+            while True:
+                elements.append(self._expression())
+                if not self._match(types=[TokenType.COMMA]):
+                    break
+        self._consume(TokenType.RIGHT_BRACKET, "Expect ']' after list elements.")
+        return Expr.List(bracket, elements)
+
+    def _map(self):
+        """
+        map → "{" ( expression ":" expression ( "," expression ":" expression )* )? "}" ;
+        :return: expression
+        """
+        brace = self._previous()
+        keys = []
+        values = []
+        if not self._check(TokenType.RIGHT_BRACE):
+            while True:
+                keys.append(self._expression())
+                self._consume(TokenType.COLON, "Expect ':' after map key.")
+                values.append(self._expression())
+                if not self._match(types=[TokenType.COMMA]):
+                    break
+        self._consume(TokenType.RIGHT_BRACE, "Expect '}' after map entries.")
+        return Expr.Map(brace, keys, values)
+
     def _call(self):
         expr = self._primary()
         while True:
             if self._match(types=[TokenType.LEFT_PAREN]):
                 expr = self._finish_call(expr)
+            elif self._match(types=[TokenType.LEFT_BRACKET]):
+                expr = self._finish_index(expr)
+            elif self._match(types=[TokenType.DOT]):
+                name = self._consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
+                expr = Expr.Get(expr, name)
             else:
                 break
         return expr
@@ -265,7 +356,7 @@ class Parser:
     def _primary(self):
         """
         primary → NUMBER | STRING | "false" | "true" | "nil"
-        | "(" expression ")" ;
+        | "(" expression ")" | list | map | "this" | "super" "." IDENTIFIER ;
         :return: expression
         """
         if self._match(types=[TokenType.FALSE]):
@@ -278,10 +369,18 @@ class Parser:
             return Expr.Literal(self._previous().literal)
         if self._match(types=[TokenType.IDENTIFIER]):
             return Expr.Variable(self._previous())
+        if self._match(types=[TokenType.THIS]):
+            return Expr.This(self._previous())
+        if self._match(types=[TokenType.SUPER]):
+            return self._super()
         if self._match(types=[TokenType.LEFT_PAREN]):
             expr = self._expression()
             self._consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
             return Expr.Grouping(expr)
+        if self._match(types=[TokenType.LEFT_BRACKET]):
+            return self._list()
+        if self._match(types=[TokenType.LEFT_BRACE]):
+            return self._map()
         raise self._error(self._peek(), "Expect expression.")
 
     def _block(self):
@@ -297,9 +396,12 @@ class Parser:
         :param types:
         :return: boolean
         """
+        current = self._type_at(self._current)
+        if current == TokenType.EOF:
+            return False
         for t in types:
-            if self._check(t):
-                self._advance()
+            if current == t:
+                self._current += 1
                 return True
         return False
 
@@ -322,16 +424,15 @@ class Parser:
         :param token_type:
         :return: boolean
         """
-        if self._at_end():
-            return False
-        return self._peek().type == token_type
+        current = self._type_at(self._current)
+        return current != TokenType.EOF and current == token_type
 
     def _at_end(self):
         """
         checks if there are anymore tokens
         :return: boolean
         """
-        return self._peek().type == TokenType.EOF
+        return self._type_at(self._current) == TokenType.EOF
 
     def _peek(self):
         """
@@ -375,7 +476,7 @@ class Parser:
         """
         self._advance()
         while not self._at_end():
-            if self._previous().type == TokenType.SEMICOLON:
+            if self._type_at(self._current - 1) == TokenType.SEMICOLON:
                 return
             tokens = [
                 TokenType.CLASS,
@@ -387,7 +488,7 @@ class Parser:
                 TokenType.PRINT,
                 TokenType.RETURN
             ]
-            if self._peek().type in tokens:
+            if self._type_at(self._current) in tokens:
                 return
             self._advance()
 
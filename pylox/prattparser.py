@@ -0,0 +1,218 @@
+"""
+pylox.prattparser
+~~~~~~~~~~~~~~~~
+Parser whose expressions are parsed by precedence climbing over explicit
+operand and operator stacks instead of one recursive method per
+precedence level
+"""
+import pylox.expr as Expr
+from pylox.parser import Parser
+from pylox.scanner import TokenType
+
+# kinds of entries on the operator stack
+_INFIX = 0
+_UNARY = 1
+_GROUP = 2
+_CALL = 3
+
+# precedence of a prefix operator, binding tighter than any infix one
+_UNARY_PRECEDENCE = 8
+
+# token type -> (precedence, node class) of every infix operator. The
+# precedences follow the grammar: assignment, or, and, equality,
+# comparison, addition, multiplication. Assignment has no node class,
+# it builds an Assign from its target
+_INFIX_OPERATORS = {
+    TokenType.EQUAL: (1, None),
+    TokenType.OR: (2, Expr.Logical),
+    TokenType.AND: (3, Expr.Logical),
+    TokenType.BANG_EQUAL: (4, Expr.Binary),
+    TokenType.EQUAL_EQUAL: (4, Expr.Binary),
+    TokenType.GREATER: (5, Expr.Binary),
+    TokenType.GREATER_EQUAL: (5, Expr.Binary),
+    TokenType.LESS: (5, Expr.Binary),
+    TokenType.LESS_EQUAL: (5, Expr.Binary),
+    TokenType.MINUS: (6, Expr.Binary),
+    TokenType.PLUS: (6, Expr.Binary),
+    TokenType.SLASH: (7, Expr.Binary),
+    TokenType.STAR: (7, Expr.Binary)
+}
+
+_PREFIX_OPERATORS = {TokenType.BANG, TokenType.MINUS}
+
+# token type -> value of the keyword literals
+_KEYWORD_LITERALS = {
+    TokenType.FALSE: False,
+    TokenType.TRUE: True,
+    TokenType.NIL: None
+}
+
+
+class PrattParser(Parser):
+    """
+    Parser that builds the same Expr nodes as Parser without recursing per
+    precedence level or per nested expression, so deeply nested
+    expressions do not hit Python's recursion limit
+    """
+    def _expression(self):
+        """
+        expression → assignment, parsed with operand and operator stacks.
+        Entries on the operator stack are (precedence, kind, token, data);
+        open parentheses and calls have precedence 0 so nothing is reduced
+        past them until they are closed
+        :return: expression
+        """
+        operands = []
+        operators = []
+        while True:
+            self._prefix(operators)
+            operands.append(self._operand(self._type_at(self._current)))
+            if not self._postfix(operands, operators):
+                return operands.pop()
+
+    def _prefix(self, operators):
+        """
+        operand position: pushes the prefix operators and open parentheses
+        before a primary
+        :param operators: operator stack
+        :return: None
+        """
+        token_type = self._type_at(self._current)
+        while token_type in _PREFIX_OPERATORS or token_type == TokenType.LEFT_PAREN:
+            self._current += 1
+            if token_type == TokenType.LEFT_PAREN:
+                operators.append((0, _GROUP, None, None))
+            else:
+                operators.append((_UNARY_PRECEDENCE, _UNARY, self._previous(), None))
+            token_type = self._type_at(self._current)
+
+    def _postfix(self, operands, operators):
+        """
+        operator position: calls, indexes, properties and closing
+        parentheses, until an infix operator or the end of the expression
+        :param operands: operand stack
+        :param operators: operator stack
+        :return: True if an operand follows, False at the end of the
+        expression, left alone on the operand stack
+        """
+        while True:
+            token_type = self._type_at(self._current)
+            if token_type == TokenType.LEFT_PAREN:
+                self._current += 1
+                if self._check(TokenType.RIGHT_PAREN):
+                    paren = self._advance()
+                    operands.append(Expr.Call(operands.pop(), paren, []))
+                    continue
+                operators.append((0, _CALL, None, (operands.pop(), [])))
+                return True
+            if token_type == TokenType.LEFT_BRACKET:
+                self._current += 1
+                operands.append(self._finish_index(operands.pop()))
+                continue
+            if token_type == TokenType.DOT:
+                self._current += 1
+                name = self._consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
+                operands.append(Expr.Get(operands.pop(), name))
+                continue
+            infix = _INFIX_OPERATORS.get(token_type)
+            if infix is not None:
+                precedence, node = infix
+                # assignment is right associative, the rest are left
+                self._reduce(operands, operators,
+                             precedence if node is None else precedence - 1)
+                self._current += 1
+                operators.append((precedence, _INFIX, self._previous(), node))
+                return True
+            self._reduce(operands, operators, 0)
+            if not operators:
+                return False
+            if not self._close(operands, operators, token_type):
+                return True
+
+    def _close(self, operands, operators, token_type):
+        """
+        ends the operand of the open parenthesis or call on top of the
+        operator stack, at a closing parenthesis or a comma
+        :param operands: operand stack
+        :param operators: operator stack
+        :param token_type: type of the current token
+        :return: True if a parenthesis was closed, False if an argument
+        follows a comma
+        """
+        _, kind, _, call = operators[-1]
+        if token_type == TokenType.RIGHT_PAREN:
+            operators.pop()
+            paren = self._advance()
+            if kind == _GROUP:
+                operands.append(Expr.Grouping(operands.pop()))
+            else:
+                callee, arguments = call
+                arguments.append(operands.pop())
+                operands.append(Expr.Call(callee, paren, arguments))
+            return True
+        if kind == _CALL and token_type == TokenType.COMMA:
+            arguments = call[1]
+            arguments.append(operands.pop())
+            self._current += 1
+            if len(arguments) >= 255:
+                self._error(self._peek(), "Cannot have more than 255 arguments.")
+            return False
+        if kind == _GROUP:
+            raise self._error(self._peek(), "Expect ')' after expression.")
+        raise self._error(self._peek(), "Expect ')' after arguments.")
+
+    def _operand(self, token_type):
+        """
+        primary → NUMBER | STRING | "false" | "true" | "nil" | IDENTIFIER
+        | list | map | "this" | "super" "." IDENTIFIER. The elements of a
+        list or map literal and an index are parsed as expressions of their
+        own
+        :param token_type: type of the current token
+        :return: expression
+        """
+        if token_type in _KEYWORD_LITERALS:
+            self._current += 1
+            return Expr.Literal(_KEYWORD_LITERALS[token_type])
+        if token_type in (TokenType.NUMBER, TokenType.STRING):
+            return Expr.Literal(self._advance().literal)
+        if token_type == TokenType.IDENTIFIER:
+            return Expr.Variable(self._advance())
+        if token_type == TokenType.THIS:
+            return Expr.This(self._advance())
+        if token_type == TokenType.SUPER:
+            self._current += 1
+            return self._super()
+        if token_type == TokenType.LEFT_BRACKET:
+            self._current += 1
+            return self._list()
+        if token_type == TokenType.LEFT_BRACE:
+            self._current += 1
+            return self._map()
+        raise self._error(self._peek(), "Expect expression.")
+
+    def _reduce(self, operands, operators, precedence):
+        """
+        pops and applies the operators binding tighter than precedence
+        :param operands: operand stack
+        :param operators: operator stack
+        :param precedence: precedence to reduce above
+        :return: None
+        """
+        while operators and operators[-1][0] > precedence:
+            _, kind, operator, node = operators.pop()
+            right = operands.pop()
+            if kind == _UNARY:
+                operands.append(Expr.Unary(operator, right))
+            elif node is not None:
+                operands.append(node(operands.pop(), operator, right))
+            else:
+                target = operands[-1]
+                if isinstance(target, Expr.Variable):
+                    operands[-1] = Expr.Assign(target.name, right)
+                elif isinstance(target, Expr.Index):
+                    operands[-1] = Expr.SetIndex(target.collection, target.bracket,
+                                                 target.index, right)
+                elif isinstance(target, Expr.Get):
+                    operands[-1] = Expr.Set(target.object, target.name, right)
+                else:
+                    self._error(operator, "Invalid assignment target.")
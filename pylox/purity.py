@@ -0,0 +1,275 @@
+"""
+pylox.purity
+~~~~~~~~~~~~~~~~
+static pass marking the functions whose result depends on nothing but
+their arguments, so calls to them can be memoized
+"""
+import pylox.expr as Expr
+from pylox.expr import Visitor
+
+
+class _Function:
+    """
+    _Function: what the body of one function was seen to do
+    """
+    __slots__ = ("stmt", "base", "impure", "globals", "locals")
+
+    def __init__(self, stmt, base):
+        self.stmt = stmt
+        # index of the function's own scope
+        self.base = base
+        self.impure = False
+        # names of the global functions it refers to
+        self.globals = set()
+        # Function statements of the enclosing scopes it refers to or declares
+        self.locals = set()
+
+
+class Purity(Visitor):
+    """
+    Purity: marks a Function pure when its body prints nothing, uses no
+    list, map or instance, assigns only its own variables, reads no
+    variable of an enclosing scope but functions never assigned, and calls
+    and declares only pure functions.
+    Scopes are dicts of name -> Function statement, or None for other
+    variables, like the Resolver's. A whole program is analysed at once,
+    as functions may call the ones declared after them
+    """
+    def __init__(self):
+        self._scopes = []
+        # global name -> Function statement, None once it is anything else
+        self._globals = {}
+        # Function statements whose name is assigned
+        self._assigned = set()
+        self._functions = []
+        self._function = None
+
+    def analyse(self, statements):
+        """
+        sets pure on every Function of a program
+        :param statements: resolved statements
+        :return: None
+        """
+        for statement in statements:
+            statement.accept(self)
+        pure = {function.stmt: function for function in self._functions
+                if not function.impure}
+        changed = True
+        while changed:
+            changed = False
+            for stmt, function in list(pure.items()):
+                if not self._calls_pure(function, pure):
+                    del pure[stmt]
+                    changed = True
+        for function in self._functions:
+            function.stmt.pure = function.stmt in pure
+        self._globals.clear()
+        self._assigned.clear()
+        self._functions = []
+
+    def _calls_pure(self, function, pure):
+        """
+        :param function: _Function
+        :param pure: Function statement -> _Function, of those still pure
+        :return: True if all the functions it refers to are pure
+        """
+        for name in function.globals:
+            stmt = self._globals.get(name)
+            if stmt is None or stmt not in pure or stmt in self._assigned:
+                return False
+        return all(stmt in pure and stmt not in self._assigned for stmt in function.locals)
+
+    def _declare(self, name, stmt):
+        """
+        :param name: token
+        :param stmt: Function statement, or None for a variable
+        :return: None
+        """
+        if self._scopes:
+            self._scopes[-1][name.lexeme] = stmt
+        elif name.lexeme in self._globals:
+            self._globals[name.lexeme] = None
+        else:
+            self._globals[name.lexeme] = stmt
+
+    def _lookup(self, name):
+        """
+        :param name: token
+        :return: (index of the scope declaring name, its Function statement
+        or None), index None for a global
+        """
+        for index in range(len(self._scopes) - 1, -1, -1):
+            scope = self._scopes[index]
+            if name.lexeme in scope:
+                return index, scope[name.lexeme]
+        return None, None
+
+    def _analyse(self, statements):
+        for statement in statements:
+            statement.accept(self)
+
+    def _scoped(self, statements):
+        self._scopes.append({})
+        self._analyse(statements)
+        self._scopes.pop()
+
+    def visit_function_stmt(self, stmt):
+        self._declare(stmt.name, stmt)
+        enclosing = self._function
+        if enclosing is not None:
+            enclosing.locals.add(stmt)
+        self._function = _Function(stmt, len(self._scopes))
+        self._functions.append(self._function)
+        self._scopes.append({param.lexeme: None for param in stmt.params})
+        self._analyse(stmt.body)
+        self._scopes.pop()
+        self._function = enclosing
+
+    def visit_class_stmt(self, stmt):
+        # methods are not memoized, so their bodies are not analysed
+        if self._function is not None:
+            self._function.impure = True
+        if stmt.superclass is not None:
+            stmt.superclass.accept(self)
+        self._declare(stmt.name, None)
+
+    def visit_var_stmt(self, stmt):
+        if stmt.initializer is not None:
+            stmt.initializer.accept(self)
+        self._declare(stmt.name, None)
+
+    def visit_block_stmt(self, stmt):
+        self._scoped(stmt.statements)
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression.accept(self)
+
+    def visit_print_stmt(self, stmt):
+        if self._function is not None:
+            self._function.impure = True
+        stmt.expression.accept(self)
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is not None:
+            stmt.value.accept(self)
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition.accept(self)
+        stmt.then_branch.accept(self)
+        if stmt.else_branch is not None:
+            stmt.else_branch.accept(self)
+
+    def visit_while_stmt(self, stmt):
+        stmt.condition.accept(self)
+        stmt.body.accept(self)
+
+    def visit_for_stmt(self, stmt):
+        self._scopes.append({})
+        if stmt.initializer is not None:
+            stmt.initializer.accept(self)
+        stmt.condition.accept(self)
+        if stmt.increment is not None:
+            stmt.increment.accept(self)
+        stmt.body.accept(self)
+        self._scopes.pop()
+
+    def visit_variable_expr(self, expr):
+        function = self._function
+        index, stmt = self._lookup(expr.name)
+        if function is None or (index is not None and index >= function.base):
+            return
+        if index is None:
+            function.globals.add(expr.name.lexeme)
+        elif stmt is not None:
+            function.locals.add(stmt)
+        else:
+            function.impure = True
+
+    def visit_assign_expr(self, expr):
+        expr.value.accept(self)
+        index, stmt = self._lookup(expr.name)
+        if index is None:
+            self._globals[expr.name.lexeme] = None
+        elif stmt is not None:
+            self._assigned.add(stmt)
+        function = self._function
+        if function is not None and (index is None or index < function.base):
+            function.impure = True
+
+    def visit_call_expr(self, expr):
+        function = self._function
+        if function is not None:
+            if not isinstance(expr.callee, Expr.Variable):
+                function.impure = True
+            else:
+                index, stmt = self._lookup(expr.callee.name)
+                if index is not None and stmt is None:
+                    # a parameter or variable: could be any function
+                    function.impure = True
+        expr.callee.accept(self)
+        for argument in expr.arguments:
+            argument.accept(self)
+
+    def _mutable(self):
+        """
+        the function builds or indexes a list or map, or uses an instance,
+        which are mutable: its result could change between calls or be
+        changed by a caller
+        :return: None
+        """
+        if self._function is not None:
+            self._function.impure = True
+
+    def visit_list_expr(self, expr):
+        self._mutable()
+        for element in expr.elements:
+            element.accept(self)
+
+    def visit_map_expr(self, expr):
+        self._mutable()
+        for key, value in zip(expr.keys, expr.values):
+            key.accept(self)
+            value.accept(self)
+
+    def visit_index_expr(self, expr):
+        self._mutable()
+        expr.collection.accept(self)
+        expr.index.accept(self)
+
+    def visit_setindex_expr(self, expr):
+        self._mutable()
+        expr.collection.accept(self)
+        expr.index.accept(self)
+        expr.value.accept(self)
+
+    def visit_get_expr(self, expr):
+        self._mutable()
+        expr.object.accept(self)
+
+    def visit_set_expr(self, expr):
+        self._mutable()
+        expr.object.accept(self)
+        expr.value.accept(self)
+
+    def visit_this_expr(self, expr):
+        self._mutable()
+
+    def visit_super_expr(self, expr):
+        self._mutable()
+
+    def visit_binary_expr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_logical_expr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_unary_expr(self, expr):
+        expr.right.accept(self)
+
+    def visit_grouping_expr(self, expr):
+        expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        pass
@@ -0,0 +1,319 @@
+"""
+pylox.resolver
+~~~~~~~~~~~~~~~~
+static pass numbering every local variable with the (depth, slot) of the
+scope it lives in, so the Interpreter can find it by index
+"""
+import pylox.expr as Expr
+import pylox.stmt as Stmt
+from pylox.expr import Visitor
+
+# how the body of a for loop gets its scope
+# the body declares nothing: it runs in the loop's scope
+SHARED_SCOPE = 1
+# the body declares variables but no closure can capture them: one scope
+# is reused for every iteration
+REUSED_SCOPE = 2
+# a closure may capture the body's variables: a new scope per iteration
+FRESH_SCOPE = 3
+
+# kinds of class the resolved code is in
+_NO_CLASS = 0
+_CLASS = 1
+_SUBCLASS = 2
+
+
+def declares_function(stmt):
+    """
+    checks if a statement declares a function, or a class and so its
+    methods, anywhere inside it
+    :param stmt: statement
+    :return: boolean
+    """
+    if isinstance(stmt, (Stmt.Function, Stmt.Class)):
+        return True
+    if isinstance(stmt, Stmt.Block):
+        return any(declares_function(statement) for statement in stmt.statements)
+    if isinstance(stmt, Stmt.If):
+        return declares_function(stmt.then_branch) or \
+            (stmt.else_branch is not None and declares_function(stmt.else_branch))
+    if isinstance(stmt, Stmt.While):
+        return declares_function(stmt.body)
+    if isinstance(stmt, Stmt.For):
+        return (stmt.initializer is not None and declares_function(stmt.initializer)) \
+            or declares_function(stmt.body)
+    return False
+
+
+def _declares(statements):
+    """
+    checks if any of the statements declares a name in their scope
+    :param statements: statements
+    :return: boolean
+    """
+    return any(isinstance(statement, (Stmt.Var, Stmt.Function, Stmt.Class))
+               for statement in statements)
+
+
+class Resolver(Visitor):
+    """
+    Resolver: every scope the Interpreter will create an Environment for is
+    mirrored by a dict of the names declared in it so far. A name is given
+    the next slot of its scope when declared, and every Variable and Assign
+    is annotated with how many scopes up (depth) and which slot its
+    variable is in. Names not found in any scope are globals and keep a
+    depth of None. A block declaring no name has no scope of its own. A
+    method's this is slot 0 of a scope enclosing it, and a subclass's super
+    slot 0 of the scope enclosing that
+    """
+    def __init__(self, set_error):
+        """
+        init
+        :param set_error: error handler, called with the token and message
+        """
+        self.error_handler = set_error
+        # name -> (slot, defined) for each scope, innermost last
+        self._scopes = []
+        self._in_function = False
+        self._in_initializer = False
+        self._class = _NO_CLASS
+
+    def resolve(self, statements):
+        """
+        resolve top-level statements
+        :param statements: iterable of statements
+        :return: generator of the resolved statements
+        """
+        for statement in statements:
+            if statement is not None:
+                self._resolve_statement(statement)
+                yield statement
+
+    def _resolve_statement(self, stmt):
+        stmt.accept(self)
+
+    def _resolve_statements(self, statements):
+        for statement in statements:
+            statement.accept(self)
+
+    def _resolve_expression(self, expr):
+        expr.accept(self)
+
+    def _begin_scope(self):
+        self._scopes.append({})
+
+    def _end_scope(self):
+        """
+        :return: number of slots in the scope
+        """
+        return len(self._scopes.pop())
+
+    def _declare(self, name):
+        """
+        declares a name in the innermost scope
+        :param name: token
+        :return: slot, or None for a global
+        """
+        if not self._scopes:
+            return None
+        scope = self._scopes[-1]
+        if name.lexeme in scope:
+            self.error_handler(name, "Already a variable with this name in this scope.")
+            return scope[name.lexeme][0]
+        slot = len(scope)
+        scope[name.lexeme] = (slot, False)
+        return slot
+
+    def _define(self, name):
+        if self._scopes:
+            scope = self._scopes[-1]
+            scope[name.lexeme] = (scope[name.lexeme][0], True)
+
+    def _resolve_local(self, expr, name):
+        """
+        annotates expr with the depth and slot of name
+        :param expr: Variable or Assign
+        :param name: token
+        :return: None
+        """
+        for depth, scope in enumerate(reversed(self._scopes)):
+            if name.lexeme in scope:
+                expr.depth = depth
+                expr.slot = scope[name.lexeme][0]
+                return
+
+    def _resolve_function(self, stmt, initializer=False):
+        enclosing = self._in_function
+        enclosing_initializer = self._in_initializer
+        self._in_function = True
+        self._in_initializer = initializer
+        self._begin_scope()
+        for param in stmt.params:
+            self._declare(param)
+            self._define(param)
+        self._resolve_statements(stmt.body)
+        stmt.slots = self._end_scope()
+        # no closure can outlive a call of a function declaring none
+        stmt.leaf = not any(declares_function(statement) for statement in stmt.body)
+        self._in_function = enclosing
+        self._in_initializer = enclosing_initializer
+
+    def visit_block_stmt(self, stmt):
+        # a block declaring nothing gets no scope: it runs in the enclosing one
+        stmt.scoped = _declares(stmt.statements)
+        if not stmt.scoped:
+            self._resolve_statements(stmt.statements)
+            stmt.slots = 0
+            return
+        self._begin_scope()
+        self._resolve_statements(stmt.statements)
+        stmt.slots = self._end_scope()
+
+    def visit_var_stmt(self, stmt):
+        stmt.slot = self._declare(stmt.name)
+        if stmt.initializer is not None:
+            self._resolve_expression(stmt.initializer)
+        self._define(stmt.name)
+
+    def visit_function_stmt(self, stmt):
+        stmt.slot = self._declare(stmt.name)
+        self._define(stmt.name)
+        self._resolve_function(stmt)
+
+    def visit_class_stmt(self, stmt):
+        enclosing = self._class
+        self._class = _CLASS
+        stmt.slot = self._declare(stmt.name)
+        self._define(stmt.name)
+        if stmt.superclass is not None:
+            if stmt.superclass.name.lexeme == stmt.name.lexeme:
+                self.error_handler(stmt.superclass.name, "A class cannot inherit from itself.")
+            self._class = _SUBCLASS
+            self._resolve_expression(stmt.superclass)
+            self._begin_scope()
+            self._scopes[-1]["super"] = (0, True)
+        self._begin_scope()
+        self._scopes[-1]["this"] = (0, True)
+        for method in stmt.methods:
+            self._resolve_function(method, method.name.lexeme == "init")
+        self._end_scope()
+        if stmt.superclass is not None:
+            self._end_scope()
+        self._class = enclosing
+
+    def visit_expression_stmt(self, stmt):
+        self._resolve_expression(stmt.expression)
+
+    def visit_if_stmt(self, stmt):
+        self._resolve_expression(stmt.condition)
+        self._resolve_statement(stmt.then_branch)
+        if stmt.else_branch is not None:
+            self._resolve_statement(stmt.else_branch)
+
+    def visit_print_stmt(self, stmt):
+        self._resolve_expression(stmt.expression)
+
+    def visit_return_stmt(self, stmt):
+        if not self._in_function:
+            self.error_handler(stmt.keyword, "Cannot return from top-level code.")
+        if self._in_initializer and stmt.value is not None:
+            self.error_handler(stmt.keyword, "Cannot return a value from an initializer.")
+        # the returning function has nothing left to do after the call
+        stmt.tail = isinstance(stmt.value, Expr.Call)
+        if stmt.value is not None:
+            self._resolve_expression(stmt.value)
+
+    def visit_while_stmt(self, stmt):
+        self._resolve_expression(stmt.condition)
+        self._resolve_statement(stmt.body)
+
+    def visit_for_stmt(self, stmt):
+        # the loop variable gets a scope of its own
+        loop_scope = isinstance(stmt.initializer, Stmt.Var)
+        if loop_scope:
+            self._begin_scope()
+        if stmt.initializer is not None:
+            self._resolve_statement(stmt.initializer)
+        self._resolve_expression(stmt.condition)
+        if stmt.increment is not None:
+            self._resolve_expression(stmt.increment)
+        body = stmt.body
+        if isinstance(body, Stmt.Block) and _declares(body.statements):
+            stmt.scope = FRESH_SCOPE if declares_function(body) else REUSED_SCOPE
+            self._resolve_statement(body)
+        else:
+            stmt.scope = SHARED_SCOPE
+            self._resolve_statements(body.statements if isinstance(body, Stmt.Block) else [body])
+        if loop_scope:
+            self._end_scope()
+
+    def visit_variable_expr(self, expr):
+        if self._scopes:
+            declared = self._scopes[-1].get(expr.name.lexeme)
+            if declared is not None and not declared[1]:
+                self.error_handler(expr.name, "Cannot read local variable in its own initializer.")
+        self._resolve_local(expr, expr.name)
+
+    def visit_assign_expr(self, expr):
+        self._resolve_expression(expr.value)
+        self._resolve_local(expr, expr.name)
+
+    def visit_binary_expr(self, expr):
+        self._resolve_expression(expr.left)
+        self._resolve_expression(expr.right)
+
+    def visit_call_expr(self, expr):
+        self._resolve_expression(expr.callee)
+        for argument in expr.arguments:
+            self._resolve_expression(argument)
+
+    def visit_list_expr(self, expr):
+        for element in expr.elements:
+            self._resolve_expression(element)
+
+    def visit_map_expr(self, expr):
+        for key, value in zip(expr.keys, expr.values):
+            self._resolve_expression(key)
+            self._resolve_expression(value)
+
+    def visit_index_expr(self, expr):
+        self._resolve_expression(expr.collection)
+        self._resolve_expression(expr.index)
+
+    def visit_setindex_expr(self, expr):
+        self._resolve_expression(expr.collection)
+        self._resolve_expression(expr.index)
+        self._resolve_expression(expr.value)
+
+    def visit_get_expr(self, expr):
+        self._resolve_expression(expr.object)
+
+    def visit_set_expr(self, expr):
+        self._resolve_expression(expr.value)
+        self._resolve_expression(expr.object)
+
+    def visit_this_expr(self, expr):
+        if self._class == _NO_CLASS:
+            self.error_handler(expr.keyword, "Cannot use 'this' outside of a class.")
+            return
+        self._resolve_local(expr, expr.keyword)
+
+    def visit_super_expr(self, expr):
+        if self._class == _NO_CLASS:
+            self.error_handler(expr.keyword, "Cannot use 'super' outside of a class.")
+        elif self._class != _SUBCLASS:
+            self.error_handler(expr.keyword, "Cannot use 'super' in a class with no superclass.")
+        self._resolve_local(expr, expr.keyword)
+
+    def visit_grouping_expr(self, expr):
+        self._resolve_expression(expr.expression)
+
+    def visit_literal_expr(self, expr):
+        pass
+
+    def visit_logical_expr(self, expr):
+        self._resolve_expression(expr.left)
+        self._resolve_expression(expr.right)
+
+    def visit_unary_expr(self, expr):
+        self._resolve_expression(expr.right)
@@ -0,0 +1,113 @@
+"""
+pylox.rope
+~~~~~~~~~~~~~~~~
+Rope, the lox value of a long string built by +, kept as the list of its
+parts and joined only once it is printed, compared, hashed or passed to a
+native, so building a string in a loop does not copy it every iteration
+"""
+
+# shortest result of + kept as a Rope: shorter strings are joined at once,
+# as copying them costs less than keeping their parts
+ROPE_MIN = 64
+
+
+class Rope:
+    """
+    Rope: the first count parts of a list of str. Ropes made by appending
+    to one another share the list: a Rope appended to owns the list's tail
+    when the list has just its count parts, and appends in place, so a
+    series of + is amortized O(1) each. Appending to a Rope whose list has
+    grown past it copies its parts first
+    """
+    __slots__ = ("_parts", "_count", "length", "_flat")
+
+    def __init__(self, parts, count, length):
+        """
+        init
+        :param parts: list of str, shared
+        :param count: number of parts in this rope
+        :param length: total length of its parts
+        """
+        self._parts = parts
+        self._count = count
+        self.length = length
+        self._flat = None
+
+    def flatten(self):
+        """
+        joins the parts, once
+        :return: str
+        """
+        flat = self._flat
+        if flat is None:
+            parts = self._parts
+            if len(parts) != self._count:
+                parts = parts[:self._count]
+            flat = self._flat = "".join(parts)
+        return flat
+
+    def __len__(self):
+        return self.length
+
+    def __eq__(self, other):
+        if type(other) is Rope:
+            other = other.flatten()
+        return self.flatten() == other
+
+    def __hash__(self):
+        # the hash of the joined str, which str caches
+        return hash(self.flatten())
+
+    def __str__(self):
+        """
+        overrides string
+        :return: str
+        """
+        return self.flatten()
+
+
+# types of lox strings
+STRINGS = (str, Rope)
+
+
+def _parts(string):
+    """
+    :param string: str or Rope
+    :return: list of its parts
+    """
+    if type(string) is str:
+        return [string]
+    if string._flat is not None:
+        return [string._flat]
+    return string._parts[:string._count]
+
+
+def concat(left, right):
+    """
+    left + right
+    :param left: str or Rope
+    :param right: str or Rope
+    :return: str if short, else Rope
+    """
+    length = len(left) + len(right)
+    if type(left) is str:
+        if length < ROPE_MIN and type(right) is str:
+            return left + right
+        parts = [left] + _parts(right)
+        return Rope(parts, len(parts), length)
+    parts = left._parts
+    if len(parts) != left._count:
+        parts = parts[:left._count]
+    if type(right) is str:
+        parts.append(right)
+    else:
+        parts.extend(_parts(right))
+    return Rope(parts, len(parts), length)
+
+
+def flat(value):
+    """
+    :param value: lox value
+    :return: value, as a str if a Rope
+    """
+    return value.flatten() if type(value) is Rope else value
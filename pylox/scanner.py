@@ -3,6 +3,9 @@ lox.scanner
 ~~~~~~~~~~~~~~~~
 handles lexing
 """
+import re
+import sys
+from array import array
 from enum import Enum, auto
 
 
@@ -21,6 +24,9 @@ class TokenType(Enum):
     SEMICOLON = auto()
     SLASH = auto()
     STAR = auto()
+    LEFT_BRACKET = auto()
+    RIGHT_BRACKET = auto()
+    COLON = auto()
 
     # One or two character tokens.
     BANG = auto()
@@ -70,10 +76,162 @@ class Token:
         return "{0} {1} {2}".format(self.type, self.lexeme, self.literal)
 
 
+# token types by their value, for decoding TokenBuffer.types
+_TOKEN_TYPES = [None] * (len(TokenType) + 1)
+for _token_type in TokenType:
+    _TOKEN_TYPES[_token_type.value] = _token_type
+
+
+class TokenBuffer:
+    """
+    Tokens stored column-wise in arrays: the type, start and end offsets in
+    the source, and line of every token. Lexemes and literals are sliced
+    from the source, and Token objects built, only when asked for.
+    """
+    def __init__(self, source):
+        """
+        init
+        :param source: the scanned source
+        """
+        self.source = source
+        self.types = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.lines = array('I')
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        """
+        builds the Token at index
+        :param index: token index
+        :return: Token
+        """
+        return Token(self.type_at(index), self.lexeme(index),
+                     self.literal(index), self.lines[index])
+
+    def append(self, token_type, start, end, line):
+        """
+        adds a token
+        :param token_type: TokenType
+        :param start: offset of the first character of the lexeme
+        :param end: offset after the last character of the lexeme
+        :param line: line of the token
+        :return: None
+        """
+        self.types.append(token_type.value)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def type_at(self, index):
+        """
+        :param index: token index
+        :return: TokenType
+        """
+        return _TOKEN_TYPES[self.types[index]]
+
+    def lexeme(self, index):
+        """
+        :param index: token index
+        :return: str
+        """
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def literal(self, index):
+        """
+        :param index: token index
+        :return: float for numbers, str for strings, otherwise None
+        """
+        token_type = self.types[index]
+        if token_type == TokenType.NUMBER.value:
+            return float(self.lexeme(index))
+        if token_type == TokenType.STRING.value:
+            return sys.intern(self.source[self.starts[index] + 1:self.ends[index] - 1])
+        return None
+
+
+# one lexeme per match: a run of newlines, an identifier or keyword, a
+# number, an operator, a comment, a (possibly unterminated) string, or any
+# other single character. The spaces before a lexeme are matched with it,
+# and spaces at the end of the source, with no lexeme after them, not at all.
+_LEXEME = re.compile(r"""
+    ([ \t\r]*)(
+        \n[ \t\r\n]*
+      | [^\W\d_][^\W_]*
+      | \d+(?:\.\d+)?
+      | [!=<>]=?
+      | //[^\n]*
+      | "[^"]*"?
+      | [^ \t\r]
+    )""", re.VERBOSE | re.DOTALL)
+
+_OPERATORS = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "/": TokenType.SLASH,
+    "*": TokenType.STAR,
+    "[": TokenType.LEFT_BRACKET,
+    "]": TokenType.RIGHT_BRACKET,
+    ":": TokenType.COLON,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL
+}
+
+
+class TokenStream:
+    """
+    A window over an iterator of Tokens that the Parser can index like a
+    list of Tokens. Only the current and previous token are kept, so
+    tokens are dropped as soon as the Parser moves past them.
+    """
+    def __init__(self, tokens):
+        """
+        init
+        :param tokens: iterable of Tokens, ending with EOF
+        """
+        self._tokens = iter(tokens)
+        self._window = []
+        self._offset = 0
+
+    def __getitem__(self, index):
+        """
+        returns the token at index, reading ahead as needed
+        :param index: token index, at most one behind the furthest read
+        :return: Token
+        """
+        window = self._window
+        while index >= self._offset + len(window):
+            window.append(next(self._tokens))
+            if len(window) > 2:
+                del window[0]
+                self._offset += 1
+        return window[index - self._offset]
+
+
 class Scanner:
     """ Scanner class"""
-    def __init__(self, source):
-        self.error = None
+    def __init__(self, source="", set_error=None):
+        """
+        init
+        :param source: source to scan
+        :param set_error: error handler, called with the line and message
+        """
+        self.error = set_error
         self.tokens = []
         self._start = 0
         self._current = 0
@@ -107,9 +265,124 @@ class Scanner:
         while not self._at_end():
             self._start = self._current
             self._scan_token()
-        self.tokens.append(Token(TokenType.EOF, "", None, self._source))
+        self.tokens.append(Token(TokenType.EOF, "", None, self._line))
+        return self.tokens
+
+    def scan_tokens_bulk(self):
+        """
+        scan tokens a whole lexeme at a time with one compiled pattern,
+        dispatching on the leading character instead of a character at a
+        time. Produces the same tokens as scan_tokens
+        :return: tokens
+        """
+        self.tokens.extend(self.scan_chunks([self._source]))
         return self.tokens
 
+    def scan_chunks(self, chunks):
+        """
+        bulk scan source text arriving in chunks, yielding tokens as soon
+        as they are found. The lexeme at the end of a chunk is held back and
+        rescanned with the next chunk, in case it continues there, and so is
+        the number before it when it is a decimal point right after one
+        :param chunks: iterable of source strings
+        :return: generator of tokens, ending with EOF
+        """
+        keywords = self._keywords
+        operator = _OPERATORS.get
+        line = self._line
+        chunks = iter(chunks)
+        pending = ""
+        more = True
+        while more:
+            chunk = next(chunks, "")
+            more = chunk != ""
+            source = pending + chunk if pending else chunk
+            lexemes = _LEXEME.findall(source)
+            if more and lexemes:
+                space, text = lexemes.pop()
+                if text == "." and not space and lexemes and lexemes[-1][1][-1:].isdigit():
+                    lexemes.pop()
+            position = 0
+            for space, text in lexemes:
+                position += len(space) + len(text)
+                token_type = operator(text)
+                if token_type is not None:
+                    yield Token(token_type, text, None, line)
+                    continue
+                c = text[0]
+                if c == '\n':
+                    line += text.count('\n')
+                elif c.isalpha():
+                    yield Token(keywords.get(text, TokenType.IDENTIFIER), text, None, line)
+                elif c.isdigit():
+                    yield Token(TokenType.NUMBER, text, float(text), line)
+                elif c == '"':
+                    line += text.count('\n')
+                    if len(text) < 2 or text[-1] != '"':
+                        self.error(line, "Unterminated string.")
+                        more = False
+                        break
+                    yield Token(TokenType.STRING, text, sys.intern(text[1:-1]), line)
+                elif c == '/':
+                    pass
+                else:
+                    self.error(line, "unexpected character: {}".format(c))
+            pending = source[position:]
+        self._current = len(self._source)
+        self._line = line
+        yield Token(TokenType.EOF, "", None, line)
+
+    def scan_buffer(self):
+        """
+        bulk scan the source into a TokenBuffer instead of a list of Tokens
+        :return: TokenBuffer
+        """
+        buffer = TokenBuffer(self._source)
+        keywords = {text: token_type.value for text, token_type in self._keywords.items()}
+        operators = {text: token_type.value for text, token_type in _OPERATORS.items()}
+        operator = operators.get
+        add_type = buffer.types.append
+        add_start = buffer.starts.append
+        add_end = buffer.ends.append
+        add_line = buffer.lines.append
+        identifier = TokenType.IDENTIFIER.value
+        number = TokenType.NUMBER.value
+        string = TokenType.STRING.value
+        line = self._line
+        position = self._current
+        for space, text in _LEXEME.findall(self._source):
+            start = position + len(space)
+            position = start + len(text)
+            token_type = operator(text)
+            if token_type is None:
+                c = text[0]
+                if c == '\n':
+                    line += text.count('\n')
+                    continue
+                if c.isalpha():
+                    token_type = keywords.get(text, identifier)
+                elif c.isdigit():
+                    token_type = number
+                elif c == '"':
+                    line += text.count('\n')
+                    if len(text) < 2 or text[-1] != '"':
+                        self.error(line, "Unterminated string.")
+                        break
+                    token_type = string
+                elif c == '/':
+                    continue
+                else:
+                    self.error(line, "unexpected character: {}".format(c))
+                    continue
+            add_type(token_type)
+            add_start(start)
+            add_end(position)
+            add_line(line)
+        self._current = len(self._source)
+        self._line = line
+        buffer.append(TokenType.EOF, self._current, self._current, line)
+        return buffer
+
     def _at_end(self):
         """
         check if end
@@ -143,6 +416,12 @@ class Scanner:
             self._add_token(TokenType.SEMICOLON)
         elif c == '*':
             self._add_token(TokenType.STAR)
+        elif c == '[':
+            self._add_token(TokenType.LEFT_BRACKET)
+        elif c == ']':
+            self._add_token(TokenType.RIGHT_BRACKET)
+        elif c == ':':
+            self._add_token(TokenType.COLON)
 
         # operators
         elif c == '!':
@@ -227,14 +506,15 @@ class Scanner:
                 self._line += 1
             self._advance()
         if self._at_end():
-            self.error = "{0} Unterminated string.".format(self._line)
+            self.error(self._line, "Unterminated string.")
             return
 
             # advance to find "
         self._advance()
 
-        # trim the surrounding quotes
-        value = self._source[self._start + 1: self._current - 1]
+        # trim the surrounding quotes. Literals are interned, so equal ones
+        # are the same str and compare by identity
+        value = sys.intern(self._source[self._start + 1: self._current - 1])
         self._add_token(TokenType.STRING, value)
 
     def _number(self):
@@ -0,0 +1,140 @@
+"""
+pylox.specializer
+~~~~~~~~~~~~~~~~
+type feedback for Binary, Unary and Logical nodes: a node that keeps
+seeing the same operand types is specialized to an operation for just
+those types, guarded by a type check falling back to the general path
+"""
+import operator
+from pylox.rope import Rope, STRINGS, concat
+from pylox.scanner import TokenType
+
+# executions with the same operand types before a node is specialized
+SPECIALIZE_AFTER = 8
+# deoptimizations before a node is left on the general path for good
+MAX_DEOPTS = 4
+
+# (operator, left type, right type) -> operation
+BINARY_SPECIALIZATIONS = {}
+for _token_type, _operation in (
+        (TokenType.MINUS, operator.sub), (TokenType.STAR, operator.mul),
+        (TokenType.SLASH, operator.truediv), (TokenType.PLUS, operator.add),
+        (TokenType.GREATER, operator.gt), (TokenType.GREATER_EQUAL, operator.ge),
+        (TokenType.LESS, operator.lt), (TokenType.LESS_EQUAL, operator.le)):
+    BINARY_SPECIALIZATIONS[_token_type, float, float] = _operation
+for _left in STRINGS:
+    for _right in STRINGS:
+        BINARY_SPECIALIZATIONS[TokenType.PLUS, _left, _right] = concat
+for _type in (float, str, Rope, bool, type(None)):
+    BINARY_SPECIALIZATIONS[TokenType.EQUAL_EQUAL, _type, _type] = operator.eq
+    BINARY_SPECIALIZATIONS[TokenType.BANG_EQUAL, _type, _type] = operator.ne
+
+# (operator, operand type) -> operation
+UNARY_SPECIALIZATIONS = {
+    (TokenType.MINUS, float): operator.neg,
+    (TokenType.BANG, bool): operator.not_,
+    (TokenType.BANG, type(None)): lambda value: True,
+}
+
+# type of the left operand -> its truthiness
+LOGICAL_SPECIALIZATIONS = {
+    bool: bool,
+    type(None): lambda value: False,
+    float: lambda value: True,
+    str: lambda value: True,
+    Rope: lambda value: True,
+}
+
+
+class Feedback:
+    """
+    Feedback: operand types a node has seen in a row
+    """
+    __slots__ = ("types", "count", "deopts")
+
+    def __init__(self):
+        self.types = None
+        self.count = 0
+        self.deopts = 0
+
+
+# feedback of a node left on the general path
+GENERIC = Feedback()
+
+
+class Specializer:
+    """
+    Specializer: installs and removes the specialization of nodes, as a
+    (operand types, operation) pair, and counts how it goes
+    """
+    def __init__(self, specialize_after=SPECIALIZE_AFTER, max_deopts=MAX_DEOPTS):
+        """
+        init
+        :param specialize_after: executions with the same types before
+        specializing
+        :param max_deopts: deoptimizations before giving up on a node
+        """
+        self.specialize_after = specialize_after
+        self.max_deopts = max_deopts
+        # executions of a specialization whose guard held
+        self.hits = 0
+        # executions on the general path
+        self.misses = 0
+        self.specializations = 0
+        self.deopts = 0
+
+    def observe(self, expr, types, table):
+        """
+        records the operand types of a node run on the general path,
+        specializing it once they have been the same often enough
+        :param expr: Binary, Unary or Logical
+        :param types: operand types
+        :param table: key of types -> operation
+        :return: None
+        """
+        self.misses += 1
+        feedback = expr.feedback
+        if feedback is None:
+            feedback = expr.feedback = Feedback()
+        elif feedback is GENERIC:
+            return
+        if feedback.types != types:
+            feedback.types = types
+            feedback.count = 0
+        feedback.count += 1
+        if feedback.count < self.specialize_after:
+            return
+        operation = table.get(types)
+        if operation is None:
+            expr.feedback = GENERIC
+            return
+        expr.specialization = (types, operation)
+        self.specializations += 1
+
+    def deoptimize(self, expr):
+        """
+        removes the specialization of a node whose guard failed
+        :param expr: Binary, Unary or Logical
+        :return: None
+        """
+        self.deopts += 1
+        expr.specialization = None
+        feedback = expr.feedback
+        feedback.count = 0
+        feedback.deopts += 1
+        if feedback.deopts >= self.max_deopts:
+            expr.feedback = GENERIC
+
+    def statistics(self):
+        """
+        :return: dict of counter name -> value
+        """
+        executions = self.hits + self.misses
+        return {
+            "specializations": self.specializations,
+            "specialized hits": self.hits,
+            "general path executions": self.misses,
+            "deopts": self.deopts,
+            "hit rate": self.hits / executions if executions else 0.0,
+            "deopt rate": self.deopts / self.specializations if self.specializations else 0.0,
+        }
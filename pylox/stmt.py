@@ -13,11 +13,24 @@ class Stmt(ABC):
 class Block(Stmt):
     def __init__(self, statements):
         self.statements = statements
+        self.slots = None
+        self.scoped = None
 
     def accept(self, visitor):
         return visitor.visit_block_stmt(self)
 
 
+class Class(Stmt):
+    def __init__(self, name, superclass, methods):
+        self.name = name
+        self.superclass = superclass
+        self.methods = methods
+        self.slot = None
+
+    def accept(self, visitor):
+        return visitor.visit_class_stmt(self)
+
+
 class Expression(Stmt):
     def __init__(self, expression):
         self.expression = expression
@@ -31,6 +44,10 @@ class Function(Stmt):
         self.name = name
         self.params = params
         self.body = body
+        self.slot = None
+        self.slots = None
+        self.leaf = None
+        self.pure = None
 
     def accept(self, visitor):
         return visitor.visit_function_stmt(self)
@@ -58,6 +75,7 @@ class Return(Stmt):
     def __init__(self, keyword, value):
         self.keyword = keyword
         self.value = value
+        self.tail = None
 
     def accept(self, visitor):
         return visitor.visit_return_stmt(self)
@@ -67,6 +85,7 @@ class Var(Stmt):
     def __init__(self, name, initializer):
         self.name = name
         self.initializer = initializer
+        self.slot = None
 
     def accept(self, visitor):
         return visitor.visit_var_stmt(self)
@@ -81,3 +100,15 @@ class While(Stmt):
         return visitor.visit_while_stmt(self)
 
 
+class For(Stmt):
+    def __init__(self, initializer, condition, increment, body):
+        self.initializer = initializer
+        self.condition = condition
+        self.increment = increment
+        self.body = body
+        self.scope = None
+
+    def accept(self, visitor):
+        return visitor.visit_for_stmt(self)
+
+
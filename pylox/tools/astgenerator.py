@@ -16,20 +16,53 @@ base_desc = {
         "Literal" : [["object", "value"]],
         "Logical": [["Expr", "left"], ["Token", "operator"], ["Expr", "right"]],
         "Chain": [["Expr", "left"], ["Expr", "right"]],
-        "Variable": [["Token", "name"]]
+        "Variable": [["Token", "name"]],
+        "List": [["Token", "bracket"], ["List", "elements"]],
+        "Map": [["Token", "brace"], ["List", "keys"], ["List", "values"]],
+        "Index": [["Expr", "collection"], ["Token", "bracket"], ["Expr", "index"]],
+        "SetIndex": [["Expr", "collection"], ["Token", "bracket"], ["Expr", "index"],
+                     ["Expr", "value"]],
+        "Get": [["Expr", "object"], ["Token", "name"]],
+        "Set": [["Expr", "object"], ["Token", "name"], ["Expr", "value"]],
+        "This": [["Token", "keyword"]],
+        "Super": [["Token", "keyword"], ["Token", "method"]]
     },
     "Stmt": {
         "Block": [["Stmt", "statements"]],
+        "Class": [["Token", "name"], ["Expr", "superclass"], ["Stmt", "methods"]],
         "Expression": [["Expr", "expression"]],
         "Function": [["Token", "name"], ["Token", "params"], ["Stmt", "body"]],
         "If": [["Expr", "condition"], ["Stmt", "then_branch"], ["Stmt", "else_branch"]],
         "Print": [["Expr", "expression"]],
         "Return": [["Token", "keyword"], ["Expr", "value"]],
         "Var": [["Token", "name"], ["Expr", "initializer"]],
-        "While": [["Expr", "condition"], ["Stmt", "body"]]
+        "While": [["Expr", "condition"], ["Stmt", "body"]],
+        "For": [["Stmt", "initializer"], ["Expr", "condition"], ["Expr", "increment"],
+                ["Stmt", "body"]]
     }
 }
 
+# attributes filled in after parsing by the passes that analyse the tree,
+# None until then
+annotations = {
+    "Assign": ["depth", "slot"],
+    "Binary": ["specialization", "feedback"],
+    "Call": ["cache", "rebinds"],
+    "Logical": ["specialization", "feedback"],
+    "Unary": ["specialization", "feedback"],
+    "Variable": ["depth", "slot"],
+    "Block": ["slots", "scoped"],
+    "Function": ["slot", "slots", "leaf", "pure"],
+    "Var": ["slot"],
+    "Class": ["slot"],
+    "Get": ["cache", "rebinds"],
+    "Set": ["cache", "rebinds"],
+    "This": ["depth", "slot"],
+    "Super": ["depth", "slot"],
+    "Return": ["tail"],
+    "For": ["scope"]
+}
+
 
 def begin(con):
     """
@@ -53,7 +86,10 @@ def define_visitor(con):
                 "visit_expression_stmt", "visit_print_stmt", "visit_var_stmt",
                 "visit_block_stmt", "visit_variable_expr", "visit_if_stmt",
                 "visit_logical_expr", "visit_while_stmt", "visit_call_expr",
-                "visit_function_stmt", "visit_return_stmt"]
+                "visit_function_stmt", "visit_return_stmt", "visit_for_stmt",
+                "visit_list_expr", "visit_map_expr", "visit_index_expr",
+                "visit_setindex_expr", "visit_get_expr", "visit_set_expr",
+                "visit_this_expr", "visit_super_expr", "visit_class_stmt"]
     visitor_def = [tab + "@abstractmethod" + tab + "\n" + tab + "def "\
                    + visitor + "(self):\n" + tab + tab + "pass\n\n" \
                    for visitor in visitors]
@@ -94,6 +130,8 @@ def define_type(con, base_name, class_name, fields):
                    tab +
                    "def __init__(self, {0}):".format(field_str))
     init_stmts = [tab + tab + "self." + name + " = " + name + "\n" for name in names]
+    init_stmts += [tab + tab + "self." + name + " = None\n"
+                   for name in annotations.get(class_name, [])]
     con.write("\n")
     con.writelines(init_stmts)
     con.write("\n")
@@ -0,0 +1,767 @@
+"""
+pylox.transpiler
+~~~~~~~~~~~~~~~~
+execution engine translating resolved statements into a Python ast.Module,
+compiled to CPython bytecode and run with exec
+"""
+import ast
+import types
+import warnings
+import pylox.expr as Expr
+from pylox.collection import new_map, get_index, set_index
+from pylox.error import LoxRuntimeError
+from pylox.expr import Visitor
+from pylox.inlinecache import PropertyCache
+from pylox.interpreter import Interpreter
+from pylox.loxcallable import LoxCallable
+from pylox.loxclass import LoxClass, LoxInstance
+from pylox.native import NATIVES, NativeFunction
+from pylox.resolver import declares_function
+from pylox.rope import STRINGS, concat
+from pylox.scanner import Token, TokenType
+from pylox.vector import Vector, arithmetic
+
+# file name of the generated code in tracebacks
+FILENAME = "<lox>"
+
+_COMPARISONS = {
+    TokenType.GREATER: ast.Gt,
+    TokenType.GREATER_EQUAL: ast.GtE,
+    TokenType.LESS: ast.Lt,
+    TokenType.LESS_EQUAL: ast.LtE,
+}
+
+_ARITHMETIC = {
+    TokenType.MINUS: ast.Sub,
+    TokenType.SLASH: ast.Div,
+    TokenType.STAR: ast.Mult,
+}
+
+_EQUALITY = {
+    TokenType.EQUAL_EQUAL: ast.Eq,
+    TokenType.BANG_EQUAL: ast.NotEq,
+}
+
+
+def lox_name(name):
+    """
+    :param name: name of a variable in the generated code
+    :return: name of the lox variable
+    """
+    return name.split("_", 1)[1]
+
+
+def _name(name, store=False):
+    return ast.Name(id=name, ctx=ast.Store() if store else ast.Load())
+
+
+def _call(function, *arguments):
+    return ast.Call(func=_name(function), args=list(arguments), keywords=[])
+
+
+def _is(left, right, negate=False):
+    return ast.Compare(left=left, ops=[ast.IsNot() if negate else ast.Is()], comparators=[right])
+
+
+class _Method:
+    """
+    _Method: a method of a LoxClass, the Python function of it taking this
+    before its parameters
+    """
+    __slots__ = ("function",)
+
+    def __init__(self, function):
+        self.function = function
+
+    def arity(self):
+        """
+        :return: int, the parameters of the method, this not counted
+        """
+        return self.function.__code__.co_argcount - 1
+
+    def bind(self, instance):
+        """
+        :param instance: LoxInstance
+        :return: the function with this bound to instance
+        """
+        return types.MethodType(self.function, instance)
+
+
+class _Frame:
+    """
+    a Python function being generated, or the module, and the names it
+    binds and those of enclosing frames it assigns to
+    """
+    def __init__(self, enclosing, returns):
+        self.enclosing = enclosing
+        # a return statement may run in the frame
+        self.returns = returns
+        self.names = set()
+        self.nonlocals = set()
+        self.globals = set()
+
+    def declarations(self):
+        """
+        :return: global and nonlocal statements the frame needs
+        """
+        declarations = []
+        if self.globals:
+            declarations.append(ast.Global(names=sorted(self.globals)))
+        if self.nonlocals:
+            declarations.append(ast.Nonlocal(names=sorted(self.nonlocals)))
+        return declarations
+
+
+class Transpiler(Visitor):
+    """
+    Transpiler: every lox variable becomes a Python variable of a name of
+    its own, so Python's scoping can be used as is: globals are named v_
+    and the lox name, locals v, a number, _ and the lox name, and a lox
+    function is a Python function. As Python has no block scopes, the body
+    of a loop declaring a function, whose variables each iteration must
+    capture afresh, is a Python function called every iteration. A method
+    is a Python function taking this first, made by a Python function of
+    the class that takes super, if it has a superclass, and returns the
+    class. A Get or Set passes its node, the site of its property cache, as
+    a global named p, a number, _ and the property's name.
+    Generated code carries the line numbers of the lox source, so the line
+    table of the code object maps an error back to its lox line
+    """
+    def __init__(self):
+        self._count = 0
+        self._scopes = []
+        self._frame = None
+        self._line = 1
+        # in an init method, returning this
+        self._initializer = False
+        # name -> Get or Set, of the sites of the code transpiled
+        self.sites = {}
+
+    def transpile(self, statements):
+        """
+        :param statements: resolved statements
+        :return: ast.Module
+        """
+        self._frame = _Frame(None, False)
+        body = []
+        for statement in statements:
+            body.extend(self._statement(statement))
+        return ast.fix_missing_locations(ast.Module(body=body, type_ignores=[]))
+
+    def _unique(self, prefix):
+        self._count += 1
+        return "{}{}".format(prefix, self._count)
+
+    def _at(self, node, token=None):
+        """
+        sets the line of a generated node
+        :param node: ast node
+        :param token: token of the source it comes from, if any
+        :return: node
+        """
+        if token is not None:
+            self._line = token.line
+        node.lineno = node.end_lineno = self._line
+        node.col_offset = node.end_col_offset = 0
+        return node
+
+    def _statement(self, stmt):
+        """
+        :param stmt: statement
+        :return: list of Python statements
+        """
+        return [self._at(node) for node in stmt.accept(self)]
+
+    def _block(self, statements):
+        body = []
+        for statement in statements:
+            body.extend(self._statement(statement))
+        return body or [self._at(ast.Pass())]
+
+    def _expression(self, expr):
+        return expr.accept(self)
+
+    def _declare(self, name):
+        """
+        declares a lox variable in the innermost scope
+        :param name: token
+        :return: name of the Python variable
+        """
+        if not self._scopes:
+            return "v_" + name.lexeme
+        variable = self._unique("v") + "_" + name.lexeme
+        self._scopes[-1][name.lexeme] = variable
+        self._frame.names.add(variable)
+        return variable
+
+    def _lookup(self, name):
+        for scope in reversed(self._scopes):
+            if name.lexeme in scope:
+                return scope[name.lexeme]
+        return "v_" + name.lexeme
+
+    def _assigns(self, variable):
+        """
+        declares variable global or nonlocal in the frame if it belongs to
+        an enclosing one
+        :param variable: Python name
+        :return: None
+        """
+        frame = self._frame
+        if frame.enclosing is None or variable in frame.names:
+            return
+        owner = frame.enclosing
+        while owner.enclosing is not None and variable not in owner.names:
+            owner = owner.enclosing
+        if owner.enclosing is None:
+            frame.globals.add(variable)
+        else:
+            frame.nonlocals.add(variable)
+
+    def _operand(self, expr):
+        """
+        :param expr: expression
+        :return: (node evaluating expr, node for its value afterwards)
+        """
+        value = self._expression(expr)
+        if isinstance(expr, (Expr.Variable, Expr.Literal)):
+            return value, value
+        temporary = self._unique("t")
+        return ast.NamedExpr(target=_name(temporary, True), value=value), _name(temporary)
+
+    def _truthy(self, expr):
+        """
+        :param expr: expression
+        :return: node testing if its value is truthy
+        """
+        if isinstance(expr, Expr.Binary) and \
+                (expr.operator.type in _COMPARISONS or expr.operator.type in _EQUALITY) \
+                or isinstance(expr, Expr.Unary) and expr.operator.type == TokenType.BANG:
+            return self._expression(expr)
+        return self._test(expr, *self._operand(expr))
+
+    @staticmethod
+    def _test(expr, evaluate, value):
+        """
+        :param expr: expression
+        :param evaluate: node evaluating it
+        :param value: node for its value afterwards
+        :return: node testing if the value is truthy
+        """
+        if isinstance(expr, Expr.Literal):
+            return ast.Constant(Interpreter.is_truthy(expr.value))
+        return ast.BoolOp(op=ast.And(), values=[
+            _is(evaluate, ast.Constant(None), True), _is(value, ast.Constant(False), True)])
+
+    def _function(self, name, body, returns, params=()):
+        """
+        :param name: Python name
+        :param body: callback generating the body in the new frame
+        :param returns: a lox return statement may run in it
+        :param params: tokens of the parameters
+        :return: ast.FunctionDef
+        """
+        frame = self._frame = _Frame(self._frame, returns)
+        params = [self._declare(param) for param in params]
+        statements = body()
+        self._frame = frame.enclosing
+        node = ast.FunctionDef(
+            name=name, args=ast.arguments(
+                posonlyargs=[], args=[ast.arg(arg=param) for param in params], vararg=None,
+                kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[]),
+            body=frame.declarations() + statements, decorator_list=[], returns=None)
+        if "type_params" in ast.FunctionDef._fields:
+            node.type_params = []
+        return self._at(node)
+
+    def visit_literal_expr(self, expr):
+        return self._at(ast.Constant(expr.value))
+
+    def visit_grouping_expr(self, expr):
+        return self._expression(expr.expression)
+
+    def visit_variable_expr(self, expr):
+        return self._at(_name(self._lookup(expr.name)), expr.name)
+
+    def visit_assign_expr(self, expr):
+        value = self._expression(expr.value)
+        variable = self._lookup(expr.name)
+        self._assigns(variable)
+        if expr.depth is None:
+            # reading the global first fails if it is not defined
+            value = ast.Subscript(value=ast.Tuple(elts=[value, _name(variable)], ctx=ast.Load()),
+                                  slice=ast.Constant(0), ctx=ast.Load())
+        return self._at(ast.NamedExpr(target=_name(variable, True), value=value), expr.name)
+
+    def visit_unary_expr(self, expr):
+        evaluate, value = self._operand(expr.right)
+        self._at(evaluate, expr.operator)
+        if expr.operator.type == TokenType.BANG:
+            test = self._test(expr.right, evaluate, value)
+            return self._at(ast.UnaryOp(op=ast.Not(), operand=test))
+        negate = ast.UnaryOp(op=ast.USub(), operand=value)
+        return self._at(ast.IfExp(
+            test=_is(_call("type", evaluate), _name("float")), body=negate,
+            orelse=ast.UnaryOp(op=ast.USub(), operand=_call("float", value))))
+
+    def visit_binary_expr(self, expr):
+        left_evaluate, left = self._operand(expr.left)
+        right_evaluate, right = self._operand(expr.right)
+        token = expr.operator
+        self._at(left_evaluate, token)
+        if token.type in _EQUALITY:
+            return self._at(ast.Compare(left=left_evaluate, ops=[_EQUALITY[token.type]()],
+                                        comparators=[right_evaluate]))
+        if token.type == TokenType.PLUS:
+            # type(left) is type(right) is float, strings are joined by _add
+            test = ast.Compare(left=_call("type", left_evaluate), ops=[ast.Is(), ast.Is()],
+                               comparators=[_call("type", right_evaluate), _name("float")])
+            operation = ast.BinOp(left=left, op=ast.Add(), right=right)
+            return self._at(ast.IfExp(test=test, body=operation, orelse=_call("_add", left, right)))
+        if token.type in _COMPARISONS:
+            operation = ast.Compare(left=left, ops=[_COMPARISONS[token.type]()],
+                                    comparators=[right])
+        else:
+            operation = ast.BinOp(left=left, op=_ARITHMETIC[token.type](), right=right)
+        if isinstance(expr.right, Expr.Literal) and type(expr.right.value) is float:
+            test = _is(_call("type", left_evaluate), _name("float"))
+        elif isinstance(expr.left, Expr.Literal) and type(expr.left.value) is float:
+            test = _is(_call("type", right_evaluate), _name("float"))
+        else:
+            # type(left) is type(right) is float, evaluating both first
+            test = ast.Compare(left=_call("type", left_evaluate), ops=[ast.Is(), ast.Is()],
+                               comparators=[_call("type", right_evaluate), _name("float")])
+        if token.type in _COMPARISONS:
+            otherwise = _call("_operands")
+        else:
+            otherwise = _call("_vector", ast.Constant(token.lexeme), left, right)
+        return self._at(ast.IfExp(test=test, body=operation, orelse=otherwise))
+
+    def visit_logical_expr(self, expr):
+        evaluate, value = self._operand(expr.left)
+        self._at(evaluate, expr.operator)
+        right = self._expression(expr.right)
+        test = self._test(expr.left, evaluate, value)
+        if expr.operator.type == TokenType.OR:
+            return self._at(ast.IfExp(test=test, body=value, orelse=right))
+        return self._at(ast.IfExp(test=test, body=right, orelse=value))
+
+    def visit_call_expr(self, expr):
+        evaluate, callee = self._operand(expr.callee)
+        arguments = [self._expression(argument) for argument in expr.arguments]
+        self._at(evaluate, expr.paren)
+        # callee(*arguments) if it is a lox function of the right arity,
+        # else _call(callee, *arguments) checks the callee and calls it
+        arity = ast.Attribute(value=ast.Attribute(value=callee, attr="__code__", ctx=ast.Load()),
+                              attr="co_argcount", ctx=ast.Load())
+        test = ast.BoolOp(op=ast.And(), values=[
+            _is(_call("type", evaluate), _name("_FUNCTION")),
+            ast.Compare(left=arity, ops=[ast.Eq()], comparators=[ast.Constant(len(arguments))])])
+        direct = ast.Call(func=callee, args=arguments, keywords=[])
+        checked = _call("_call", callee, *arguments)
+        return self._at(ast.IfExp(test=test, body=direct, orelse=checked))
+
+    def visit_list_expr(self, expr):
+        elements = [self._expression(element) for element in expr.elements]
+        return self._at(ast.List(elts=elements, ctx=ast.Load()), expr.bracket)
+
+    def visit_map_expr(self, expr):
+        keys = ast.List(elts=[self._expression(key) for key in expr.keys], ctx=ast.Load())
+        values = ast.List(elts=[self._expression(value) for value in expr.values], ctx=ast.Load())
+        self._at(keys, expr.brace)
+        self._at(values)
+        return self._at(_call("_map", keys, values))
+
+    def visit_index_expr(self, expr):
+        collection = self._expression(expr.collection)
+        index = self._expression(expr.index)
+        return self._at(_call("_get", collection, index), expr.bracket)
+
+    def visit_setindex_expr(self, expr):
+        collection = self._expression(expr.collection)
+        index = self._expression(expr.index)
+        value = self._expression(expr.value)
+        return self._at(_call("_set", collection, index, value), expr.bracket)
+
+    def _site(self, expr):
+        """
+        :param expr: Get or Set
+        :return: node of the global naming it
+        """
+        name = self._unique("p") + "_" + expr.name.lexeme
+        self.sites[name] = expr
+        return _name(name)
+
+    def visit_get_expr(self, expr):
+        instance = self._expression(expr.object)
+        return self._at(_call("_property", instance, self._site(expr)), expr.name)
+
+    def visit_set_expr(self, expr):
+        instance = self._expression(expr.object)
+        value = self._expression(expr.value)
+        return self._at(_call("_set_property", instance, value, self._site(expr)), expr.name)
+
+    def visit_this_expr(self, expr):
+        return self._at(_name(self._lookup(expr.keyword)), expr.keyword)
+
+    def visit_super_expr(self, expr):
+        this = Token(TokenType.THIS, "this", None, expr.keyword.line)
+        return self._at(_call("_super", _name(self._lookup(expr.keyword)),
+                              _name(self._lookup(this)), ast.Constant(expr.method.lexeme)),
+                        expr.method)
+
+    def visit_class_stmt(self, stmt):
+        variable = self._declare(stmt.name)
+        self._assigns(variable)
+        params = []
+        superclass = []
+        if stmt.superclass is not None:
+            superclass = [self._expression(stmt.superclass)]
+            params = [Token(TokenType.SUPER, "super", None, stmt.superclass.name.line)]
+        name = self._unique("t")
+        self._scopes.append({})
+
+        def statements():
+            methods = [self._method(method) for method in stmt.methods]
+            names = [ast.Constant(method.name.lexeme) for method in stmt.methods]
+            klass = _call("_class", ast.Constant(stmt.name.lexeme),
+                          _name(self._lookup(params[0])) if params else ast.Constant(None),
+                          ast.Dict(keys=names, values=[_name(method.name) for method in methods]))
+            return methods + [self._at(ast.Return(value=klass),
+                                       stmt.superclass.name if params else stmt.name)]
+        wrapper = self._function(name, statements, False, params)
+        self._scopes.pop()
+        return [wrapper, self._at(ast.Assign(targets=[_name(variable, True)],
+                                             value=_call(name, *superclass)), stmt.name)]
+
+    def _method(self, stmt):
+        """
+        :param stmt: Function statement of a method
+        :return: ast.FunctionDef of the Python function of the method
+        """
+        this = Token(TokenType.THIS, "this", None, stmt.name.line)
+        initializer = stmt.name.lexeme == "init"
+        enclosing = self._initializer
+        self._initializer = initializer
+        self._scopes.append({})
+
+        def statements():
+            body = self._block(stmt.body)
+            if initializer:
+                body.append(self._at(ast.Return(value=_name(self._lookup(this)))))
+            return body
+        function = self._function(self._unique("v") + "_" + stmt.name.lexeme, statements, True,
+                                  [this] + stmt.params)
+        self._scopes.pop()
+        self._initializer = enclosing
+        return function
+
+    def visit_expression_stmt(self, stmt):
+        return [ast.Expr(value=self._expression(stmt.expression))]
+
+    def visit_print_stmt(self, stmt):
+        return [ast.Expr(value=_call("_print", self._expression(stmt.expression)))]
+
+    def visit_var_stmt(self, stmt):
+        value = self._expression(stmt.initializer) if stmt.initializer is not None \
+            else ast.Constant(None)
+        variable = self._declare(stmt.name)
+        self._assigns(variable)
+        return [self._at(ast.Assign(targets=[_name(variable, True)], value=value), stmt.name)]
+
+    def visit_function_stmt(self, stmt):
+        variable = self._declare(stmt.name)
+        self._assigns(variable)
+        enclosing = self._initializer
+        self._initializer = False
+        self._scopes.append({})
+        function = self._function(variable, lambda: self._block(stmt.body), True, stmt.params)
+        self._scopes.pop()
+        self._initializer = enclosing
+        return [function]
+
+    def visit_return_stmt(self, stmt):
+        self._line = stmt.keyword.line
+        if stmt.value is not None:
+            value = self._expression(stmt.value)
+        elif self._initializer:
+            value = _name(self._lookup(Token(TokenType.THIS, "this", None, stmt.keyword.line)))
+        else:
+            value = ast.Constant(None)
+        return [ast.Return(value=value)]
+
+    def visit_block_stmt(self, stmt):
+        self._scopes.append({})
+        body = [node for statement in stmt.statements for node in self._statement(statement)]
+        self._scopes.pop()
+        return body
+
+    def visit_if_stmt(self, stmt):
+        test = self._truthy(stmt.condition)
+        then_branch = self._block([stmt.then_branch])
+        else_branch = self._block([stmt.else_branch]) if stmt.else_branch is not None else []
+        return [ast.If(test=test, body=then_branch, orelse=else_branch)]
+
+    def visit_while_stmt(self, stmt):
+        test = self._truthy(stmt.condition)
+        setup, body = self._loop_body(stmt.body, [])
+        return setup + [ast.While(test=test, body=body, orelse=[])]
+
+    def visit_for_stmt(self, stmt):
+        self._scopes.append({})
+        setup = self._statement(stmt.initializer) if stmt.initializer is not None else []
+        test = self._truthy(stmt.condition)
+        increment = [self._at(ast.Expr(value=self._expression(stmt.increment)))] \
+            if stmt.increment is not None else []
+        wrapper, body = self._loop_body(stmt.body, increment)
+        self._scopes.pop()
+        return setup + wrapper + [ast.While(test=test, body=body, orelse=[])]
+
+    def _loop_body(self, body, increment):
+        """
+        :param body: body of a loop
+        :param increment: Python statements to run after it
+        :return: (statements defining the function the body runs in, if it
+        needs one, statements of the Python loop)
+        """
+        if not declares_function(body):
+            return [], self._block([body]) + increment
+        name = self._unique("t")
+
+        def statements():
+            return self._block([body]) + [ast.Return(value=_name("_DONE"))]
+        wrapper = self._function(name, statements, False)
+        if not self._frame.returns:
+            return [wrapper], [ast.Expr(value=_call(name))] + increment
+        result = self._unique("t")
+        call = ast.NamedExpr(target=_name(result, True), value=_call(name))
+        propagate = ast.If(test=_is(call, _name("_DONE"), True),
+                           body=[ast.Return(value=_name(result))], orelse=[])
+        return [wrapper], [propagate] + increment
+
+
+class TranspiledInterpreter:
+    """
+    TranspiledInterpreter: transpiles each statement and runs it in a
+    namespace shared by all of them
+    """
+    def __init__(self):
+        self._transpiler = Transpiler()
+        self.property_cache = PropertyCache()
+        self.namespace = {
+            "_FUNCTION": types.FunctionType,
+            "_DONE": object(),
+            "_operands": self._operands,
+            "_call": self._call,
+            "_print": self._print,
+            "_add": self._add,
+            "_vector": self._vector,
+            "_map": new_map,
+            "_get": get_index,
+            "_set": set_index,
+            "_class": self._class,
+            "_property": self._property,
+            "_set_property": self._set_property,
+            "_super": self._super,
+        }
+        for name, function in NATIVES.items():
+            self.define(name, function)
+
+    def define(self, name, value):
+        """
+        defines a global, e.g. a NativeFunction
+        :param name: name
+        :param value: value
+        :return: None
+        """
+        self.namespace["v_" + name] = value
+
+    def interpret(self, statements):
+        """
+        called by lox to interpret statements
+        :param statements: resolved statements
+        :return: None
+        """
+        try:
+            for statement in statements:
+                module = self._transpiler.transpile([statement])
+                self.namespace.update(self._transpiler.sites)
+                self._transpiler.sites.clear()
+                with warnings.catch_warnings():
+                    # e.g. calling a literal, a lox error only if it runs
+                    warnings.simplefilter("ignore", SyntaxWarning)
+                    code = compile(module, FILENAME, "exec")
+                exec(code, self.namespace)
+        except RecursionError as error:
+            raise Exception(LoxRuntimeError(_line(error), "Stack overflow."))
+        except NameError as error:
+            raise Exception(LoxRuntimeError(_line(error), "Undefined variable '{0}'.".format(
+                lox_name(error.name))))
+        except LoxRuntimeError as error:
+            if error.token is None:
+                error.token = _line(error)
+            raise Exception(error)
+        except RuntimeError as error:
+            raise Exception(error)
+
+    def statistics(self):
+        """
+        :return: dict of counter name -> value
+        """
+        return self.property_cache.statistics()
+
+    @staticmethod
+    def _operands():
+        raise LoxRuntimeError(None, "Operands must be numbers.")
+
+    @staticmethod
+    def _add(left, right):
+        """
+        + of operands not both numbers
+        :param left: value of the left operand
+        :param right: value of the right operand
+        :return: str or Rope, Vector, or None
+        """
+        if type(left) in STRINGS and type(right) in STRINGS:
+            return concat(left, right)
+        if type(left) is Vector or type(right) is Vector:
+            return arithmetic("+", left, right)
+        return None
+
+    @staticmethod
+    def _vector(lexeme, left, right):
+        """
+        arithmetic of operands not both numbers
+        :param lexeme: lexeme of the operator
+        :param left: value of the left operand
+        :param right: value of the right operand
+        :return: Vector
+        """
+        if type(left) is not Vector and type(right) is not Vector:
+            raise LoxRuntimeError(None, "Operands must be numbers.")
+        return arithmetic(lexeme, left, right)
+
+    @staticmethod
+    def _class(name, superclass, functions):
+        """
+        :param name: name of the class
+        :param superclass: value of its superclass, or None
+        :param functions: dict of name -> Python function, of its methods
+        :return: LoxClass
+        """
+        if superclass is not None and type(superclass) is not LoxClass:
+            raise LoxRuntimeError(None, "Superclass must be a class.")
+        return LoxClass(name, superclass, {
+            method: _Method(function) for method, function in functions.items()})
+
+    def _property(self, instance, expr):
+        """
+        property read, from the slot or method cached for the instance's
+        shape while it is the cached one
+        :param instance: value of the object
+        :param expr: Get
+        :return: the field, or the bound method
+        """
+        cache = expr.cache
+        if cache is not None and type(instance) is LoxInstance and instance.shape is cache[0]:
+            self.property_cache.hits += 1
+            slot = cache[1]
+            if slot is not None:
+                return instance.fields[slot]
+            return types.MethodType(cache[2].function, instance)
+        return self.property_cache.get(expr, instance)
+
+    def _set_property(self, instance, value, expr):
+        """
+        :param instance: value of the object
+        :param value: value assigned
+        :param expr: Set
+        :return: value
+        """
+        if type(instance) is not LoxInstance:
+            raise LoxRuntimeError(expr.name, "Only instances have fields.")
+        cache = expr.cache
+        if cache is not None and instance.shape is cache[0]:
+            self.property_cache.hits += 1
+            shape = cache[2]
+            if shape is None:
+                instance.fields[cache[1]] = value
+            else:
+                instance.fields.append(value)
+                instance.shape = shape
+            return value
+        return self.property_cache.set(expr, instance, value)
+
+    @staticmethod
+    def _super(superclass, instance, name):
+        """
+        :param superclass: LoxClass
+        :param instance: LoxInstance, this
+        :param name: name of the method
+        :return: the superclass's method bound to instance
+        """
+        method = superclass.find_method(name)
+        if method is None:
+            raise LoxRuntimeError(None, "Undefined property '{}'.".format(name))
+        return method.bind(instance)
+
+    def call_function(self, callee, arguments):
+        """
+        calls a lox value from Python, e.g. from a native
+        :param callee: value called
+        :param arguments: arguments
+        :return: the returned value
+        """
+        return self._call(callee, *arguments)
+
+    def _call(self, callee, *arguments):
+        """
+        calls anything but a lox function of the right arity
+        :param callee: value called
+        :param arguments: arguments
+        :return: the returned value
+        """
+        if type(callee) is NativeFunction and not callee.with_engine:
+            arity = callee.arity()
+            if arity is None or len(arguments) == arity:
+                return callee.function(*arguments)
+        if isinstance(callee, types.FunctionType):
+            arity = callee.__code__.co_argcount
+        elif type(callee) is types.MethodType:
+            arity = callee.__func__.__code__.co_argcount - 1
+        elif isinstance(callee, LoxCallable):
+            arity = callee.arity()
+        else:
+            raise LoxRuntimeError(None, "Can only call functions and classes.")
+        if arity is not None and len(arguments) != arity:
+            raise LoxRuntimeError(None, "Expected {} arguments, but got {}.".format(
+                arity, len(arguments)))
+        if isinstance(callee, (types.FunctionType, types.MethodType)):
+            return callee(*arguments)
+        if type(callee) is LoxClass:
+            instance = LoxInstance(callee.shape)
+            if callee.initializer is not None:
+                callee.initializer.function(instance, *arguments)
+            return instance
+        return callee.call(self, list(arguments))
+
+    @staticmethod
+    def _print(value):
+        if isinstance(value, (types.FunctionType, types.MethodType)):
+            print("<fn {}>".format(lox_name(value.__name__)))
+        else:
+            print(Interpreter.stringify(value))
+
+
+def _line(error):
+    """
+    :param error: exception raised running generated code
+    :return: lox line of the innermost generated code it was raised in
+    """
+    line = None
+    traceback = error.__traceback__
+    while traceback is not None:
+        if traceback.tb_frame.f_code.co_filename == FILENAME:
+            line = traceback.tb_lineno
+        traceback = traceback.tb_next
+    return line
@@ -0,0 +1,130 @@
+"""
+pylox.vector
+~~~~~~~~~~~~~~~~
+Vector, the lox value of a series of numbers, kept in a numpy array if
+numpy is installed and in an array('d') if not, so operations on a whole
+vector run in C instead of an element at a time in lox
+"""
+import operator
+from array import array
+from itertools import repeat
+from pylox.error import LoxRuntimeError
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# operator lexeme -> (operation on numbers, numpy ufunc name)
+_OPERATIONS = {
+    "+": (operator.add, "add"),
+    "-": (operator.sub, "subtract"),
+    "*": (operator.mul, "multiply"),
+    "/": (operator.truediv, "divide"),
+}
+
+
+class Vector:
+    """
+    Vector: numbers, whose arithmetic with another vector or a number is
+    elementwise
+    """
+    __slots__ = ("values",)
+
+    def __init__(self, values):
+        """
+        init
+        :param values: numpy array of float64, or array('d')
+        """
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __str__(self):
+        """
+        overrides string
+        :return: str
+        """
+        return "vec({})".format(", ".join(str(float(value)) for value in self.values))
+
+
+def vector(numbers):
+    """
+    :param numbers: iterable of floats
+    :return: Vector of them
+    """
+    if numpy is not None:
+        return Vector(numpy.fromiter(numbers, dtype=numpy.float64))
+    return Vector(array("d", numbers))
+
+
+def arithmetic(lexeme, left, right):
+    """
+    elementwise + - * or / of vectors of the same length, or of a vector
+    and a number
+    :param lexeme: lexeme of the operator
+    :param left: Vector or float
+    :param right: Vector or float
+    :return: Vector
+    """
+    if type(left) is Vector:
+        if type(right) is Vector:
+            if len(left.values) != len(right.values):
+                raise LoxRuntimeError(None, "Vectors must have the same length.")
+        elif type(right) is not float:
+            raise LoxRuntimeError(None, "Operands must be numbers or vectors.")
+    elif type(left) is not float or type(right) is not Vector:
+        raise LoxRuntimeError(None, "Operands must be numbers or vectors.")
+    operation, ufunc = _OPERATIONS[lexeme]
+    left_values = left.values if type(left) is Vector else left
+    right_values = right.values if type(right) is Vector else right
+    if numpy is not None:
+        try:
+            with numpy.errstate(divide="raise", invalid="raise"):
+                return Vector(getattr(numpy, ufunc)(left_values, right_values))
+        except FloatingPointError:
+            raise LoxRuntimeError(None, "Division by zero.")
+    if type(left) is not Vector:
+        left_values = repeat(left)
+    elif type(right) is not Vector:
+        right_values = repeat(right)
+    try:
+        return Vector(array("d", map(operation, left_values, right_values)))
+    except ZeroDivisionError:
+        raise LoxRuntimeError(None, "Division by zero.")
+
+
+def total(values):
+    """
+    :param values: Vector
+    :return: sum of its numbers
+    """
+    if numpy is not None:
+        return float(numpy.sum(values.values))
+    return float(sum(values.values))
+
+
+def dot(left, right):
+    """
+    :param left: Vector
+    :param right: Vector of the same length
+    :return: dot product
+    """
+    if len(left.values) != len(right.values):
+        raise LoxRuntimeError(None, "Vectors must have the same length.")
+    if numpy is not None:
+        return float(numpy.dot(left.values, right.values))
+    return float(sum(map(operator.mul, left.values, right.values)))
+
+
+def part(values, start, end):
+    """
+    :param values: Vector
+    :param start: index of the first number
+    :param end: index after the last number
+    :return: Vector of the numbers from start to end
+    """
+    part_values = values.values[start:end]
+    # a numpy slice is a view of the array sliced
+    return Vector(part_values.copy() if numpy is not None else part_values)
@@ -0,0 +1,549 @@
+"""
+pylox.vm
+~~~~~~~~~~~~~~~~
+stack based virtual machine running the bytecode of the Compiler
+"""
+from pylox.collection import new_map, get_index, set_index
+from pylox.compiler import Compiler, OpCode
+from pylox.error import LoxRuntimeError
+from pylox.inlinecache import PropertyCache
+from pylox.interpreter import Interpreter
+from pylox.loxcallable import LoxCallable
+from pylox.loxclass import LoxClass, LoxInstance
+from pylox.native import NATIVES
+from pylox.rope import STRINGS, concat
+from pylox.vector import Vector, arithmetic
+
+# most calls in progress at once before a stack overflow, by default. Call
+# frames are kept on a list of the VM's own, not on Python's stack, so this
+# is not limited by Python's recursion limit
+MAX_DEPTH = 1 << 16
+
+CONSTANT = OpCode.CONSTANT.value
+NIL = OpCode.NIL.value
+TRUE = OpCode.TRUE.value
+FALSE = OpCode.FALSE.value
+POP = OpCode.POP.value
+GET_LOCAL = OpCode.GET_LOCAL.value
+SET_LOCAL = OpCode.SET_LOCAL.value
+GET_GLOBAL = OpCode.GET_GLOBAL.value
+DEFINE_GLOBAL = OpCode.DEFINE_GLOBAL.value
+SET_GLOBAL = OpCode.SET_GLOBAL.value
+GET_UPVALUE = OpCode.GET_UPVALUE.value
+SET_UPVALUE = OpCode.SET_UPVALUE.value
+EQUAL = OpCode.EQUAL.value
+NOT_EQUAL = OpCode.NOT_EQUAL.value
+GREATER = OpCode.GREATER.value
+GREATER_EQUAL = OpCode.GREATER_EQUAL.value
+LESS = OpCode.LESS.value
+LESS_EQUAL = OpCode.LESS_EQUAL.value
+ADD = OpCode.ADD.value
+SUBTRACT = OpCode.SUBTRACT.value
+MULTIPLY = OpCode.MULTIPLY.value
+DIVIDE = OpCode.DIVIDE.value
+NOT = OpCode.NOT.value
+NEGATE = OpCode.NEGATE.value
+PRINT = OpCode.PRINT.value
+JUMP = OpCode.JUMP.value
+JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE.value
+LOOP = OpCode.LOOP.value
+CALL = OpCode.CALL.value
+CLOSURE = OpCode.CLOSURE.value
+CLOSE_UPVALUE = OpCode.CLOSE_UPVALUE.value
+RETURN = OpCode.RETURN.value
+BUILD_LIST = OpCode.BUILD_LIST.value
+BUILD_MAP = OpCode.BUILD_MAP.value
+GET_INDEX = OpCode.GET_INDEX.value
+SET_INDEX = OpCode.SET_INDEX.value
+CLASS = OpCode.CLASS.value
+GET_PROPERTY = OpCode.GET_PROPERTY.value
+SET_PROPERTY = OpCode.SET_PROPERTY.value
+GET_SUPER = OpCode.GET_SUPER.value
+
+# opcode -> lexeme of the operators working elementwise on vectors
+_VECTOR_OPERATORS = {ADD: "+", SUBTRACT: "-", MULTIPLY: "*", DIVIDE: "/"}
+
+
+class Closure:
+    """
+    Closure: a Function with the upvalues it captured
+    """
+    __slots__ = ("function", "upvalues")
+
+    def __init__(self, function, upvalues):
+        self.function = function
+        self.upvalues = upvalues
+
+    def arity(self):
+        """
+        :return: int, the arity of its function
+        """
+        return self.function.arity
+
+    def bind(self, instance):
+        """
+        :param instance: LoxInstance
+        :return: BoundMethod of this method and instance
+        """
+        return BoundMethod(instance, self)
+
+    def __str__(self):
+        return str(self.function)
+
+
+class BoundMethod(LoxCallable):
+    """
+    BoundMethod: the Closure of a method and the instance it is called
+    with, which takes the callee's stack slot, slot 0 of the method
+    """
+    __slots__ = ("receiver", "method")
+
+    def __init__(self, receiver, method):
+        self.receiver = receiver
+        self.method = method
+
+    def arity(self):
+        return self.method.function.arity
+
+    def call(self, interpreter, arguments):
+        return interpreter.call_function(self, arguments)
+
+    def __str__(self):
+        return str(self.method)
+
+
+class Upvalue:
+    """
+    Upvalue: a captured variable, the value at cells[index]. While the
+    variable is still on the stack cells is the stack itself; once it is
+    closed cells is a list of its own holding just the value
+    """
+    __slots__ = ("cells", "index")
+
+    def __init__(self, cells, index):
+        self.cells = cells
+        self.index = index
+
+
+class CallFrame:
+    """
+    CallFrame: a call in progress. base is the stack slot of the callee,
+    followed by its arguments and locals
+    """
+    __slots__ = ("closure", "ip", "base")
+
+    def __init__(self, closure, ip, base):
+        self.closure = closure
+        self.ip = ip
+        self.base = base
+
+
+class VM:
+    """
+    VM: compiles each top-level statement and runs it
+    """
+    def __init__(self, max_depth=MAX_DEPTH):
+        """
+        init
+        :param max_depth: most calls in progress at once
+        """
+        self.max_depth = max_depth
+        self.globals = {}
+        self._compiler = Compiler()
+        self.property_cache = PropertyCache()
+        self._stack = []
+        self._frames = []
+        # stack slot -> open Upvalue
+        self._open_upvalues = {}
+        for name, function in NATIVES.items():
+            self.define(name, function)
+
+    def define(self, name, value):
+        """
+        defines a global, e.g. a NativeFunction
+        :param name: name
+        :param value: value
+        :return: None
+        """
+        self.globals[name] = value
+
+    def statistics(self):
+        """
+        :return: dict of counter name -> value
+        """
+        return self.property_cache.statistics()
+
+    def interpret(self, statements):
+        """
+        called by lox to interpret statements
+        :param statements: resolved statements
+        :return: None
+        """
+        try:
+            for statement in statements:
+                self.run(self._compiler.compile([statement]))
+        except RuntimeError as error:
+            raise Exception(error)
+        finally:
+            self._stack.clear()
+            self._frames.clear()
+            self._open_upvalues.clear()
+
+    def run(self, function):
+        """
+        runs a compiled script
+        :param function: Function of the script
+        :return: None
+        """
+        closure = Closure(function, [])
+        self._stack.append(closure)
+        self._frames.append(CallFrame(closure, 0, len(self._stack) - 1))
+        self._execute()
+
+    def _capture(self, slot):
+        upvalue = self._open_upvalues.get(slot)
+        if upvalue is None:
+            upvalue = self._open_upvalues[slot] = Upvalue(self._stack, slot)
+        return upvalue
+
+    def _close_upvalues(self, last):
+        """
+        moves the variables in stack slots from last up off the stack
+        :param last: lowest slot to close
+        :return: None
+        """
+        for slot in [slot for slot in self._open_upvalues if slot >= last]:
+            upvalue = self._open_upvalues.pop(slot)
+            upvalue.cells = [self._stack[slot]]
+            upvalue.index = 0
+
+    @staticmethod
+    def _error(chunk, ip, message):
+        return LoxRuntimeError(chunk.line(ip - 1), message)
+
+    def _vector(self, chunk, ip, op, left, right):
+        """
+        arithmetic of operands not both numbers
+        :param chunk: chunk running
+        :param ip: offset after the instruction
+        :param op: opcode
+        :param left: value of the left operand
+        :param right: value of the right operand
+        :return: Vector
+        """
+        if op not in _VECTOR_OPERATORS or (type(left) is not Vector and type(right) is not Vector):
+            raise self._error(chunk, ip, "Operands must be numbers.")
+        try:
+            return arithmetic(_VECTOR_OPERATORS[op], left, right)
+        except LoxRuntimeError as error:
+            raise self._error(chunk, ip, error.message)
+
+    def call_function(self, callee, arguments):
+        """
+        calls a lox value from Python, e.g. from a native, running a
+        closure's frames until it returns
+        :param callee: value called
+        :param arguments: arguments
+        :return: the returned value
+        """
+        receiver = callee
+        if type(callee) is BoundMethod:
+            receiver = callee.receiver
+            callee = callee.method
+        if type(callee) is Closure:
+            arity = callee.function.arity
+        elif isinstance(callee, LoxCallable):
+            arity = callee.arity()
+        else:
+            raise LoxRuntimeError(None, "Can only call functions and classes.")
+        if arity is not None and len(arguments) != arity:
+            raise LoxRuntimeError(None, "Expected {} arguments, but got {}.".format(
+                arity, len(arguments)))
+        if type(callee) is not Closure:
+            return callee.call(self, arguments)
+        if len(self._frames) >= self.max_depth:
+            raise LoxRuntimeError(None, "Stack overflow.")
+        depth = len(self._frames)
+        self._stack.append(receiver)
+        self._stack.extend(arguments)
+        self._frames.append(CallFrame(callee, 0, len(self._stack) - len(arguments) - 1))
+        return self._execute(depth)
+
+    def _execute(self, depth=0):
+        """
+        runs the frame on top until it returns
+        :param depth: number of frames below the one run
+        :return: the value it returned
+        """
+        stack = self._stack
+        frames = self._frames
+        values = self.globals
+        max_depth = self.max_depth
+        stringify = Interpreter.stringify
+        property_cache = self.property_cache
+        frame = frames[-1]
+        chunk = frame.closure.function.chunk
+        code = chunk.code
+        constants = chunk.constants
+        upvalues = frame.closure.upvalues
+        base = frame.base
+        ip = frame.ip
+        while True:
+            op = code[ip]
+            ip += 1
+            if op == GET_LOCAL:
+                stack.append(stack[base + code[ip]])
+                ip += 1
+            elif op == CONSTANT:
+                stack.append(constants[code[ip]])
+                ip += 1
+            elif op == SET_LOCAL:
+                stack[base + code[ip]] = stack[-1]
+                ip += 1
+            elif op == POP:
+                stack.pop()
+            elif op == GET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name not in values:
+                    raise self._error(chunk, ip, "Undefined variable '{0}'.".format(name))
+                stack.append(values[name])
+            elif op == JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += code[ip]
+                ip += 1
+            elif op == LOOP:
+                ip += 1 - code[ip]
+            elif op == JUMP:
+                ip += code[ip] + 1
+            elif op == ADD:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left + right
+                elif type(left) in STRINGS and type(right) in STRINGS:
+                    stack[-1] = concat(left, right)
+                elif type(left) is Vector or type(right) is Vector:
+                    stack[-1] = self._vector(chunk, ip, op, left, right)
+                else:
+                    stack[-1] = None
+            elif op == SUBTRACT or op == MULTIPLY or op == DIVIDE \
+                    or op == LESS or op == LESS_EQUAL or op == GREATER or op == GREATER_EQUAL:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    stack[-1] = self._vector(chunk, ip, op, left, right)
+                elif op == SUBTRACT:
+                    stack[-1] = left - right
+                elif op == LESS:
+                    stack[-1] = left < right
+                elif op == MULTIPLY:
+                    stack[-1] = left * right
+                elif op == DIVIDE:
+                    stack[-1] = left / right
+                elif op == LESS_EQUAL:
+                    stack[-1] = left <= right
+                elif op == GREATER:
+                    stack[-1] = left > right
+                else:
+                    stack[-1] = left >= right
+            elif op == EQUAL:
+                right = stack.pop()
+                stack[-1] = stack[-1] == right
+            elif op == NOT_EQUAL:
+                right = stack.pop()
+                stack[-1] = stack[-1] != right
+            elif op == CALL:
+                count = code[ip]
+                ip += 1
+                callee = stack[-1 - count]
+                if type(callee) is not Closure:
+                    if type(callee) is BoundMethod:
+                        stack[-1 - count] = callee.receiver
+                        callee = callee.method
+                    elif type(callee) is LoxClass:
+                        # the instance takes the class's slot, slot 0 of init
+                        stack[-1 - count] = LoxInstance(callee.shape)
+                        if callee.initializer is None:
+                            if count:
+                                raise self._error(chunk, ip, "Expected 0 arguments, but got {}."
+                                                  .format(count))
+                            continue
+                        callee = callee.initializer
+                if type(callee) is Closure:
+                    function = callee.function
+                    if count != function.arity:
+                        raise self._error(chunk, ip, "Expected {} arguments, but got {}.".format(
+                            function.arity, count))
+                    if len(frames) >= max_depth:
+                        raise self._error(chunk, ip, "Stack overflow.")
+                    frame.ip = ip
+                    frame = CallFrame(callee, 0, len(stack) - count - 1)
+                    frames.append(frame)
+                    chunk = function.chunk
+                    code = chunk.code
+                    constants = chunk.constants
+                    upvalues = callee.upvalues
+                    base = frame.base
+                    ip = 0
+                elif isinstance(callee, LoxCallable):
+                    arity = callee.arity()
+                    if arity is not None and count != arity:
+                        raise self._error(chunk, ip, "Expected {} arguments, but got {}.".format(
+                            arity, count))
+                    arguments = stack[len(stack) - count:]
+                    del stack[len(stack) - count - 1:]
+                    try:
+                        stack.append(callee.call(self, arguments))
+                    except LoxRuntimeError as error:
+                        if error.token is None:
+                            error.token = chunk.line(ip - 1)
+                        raise
+                else:
+                    raise self._error(chunk, ip, "Can only call functions and classes.")
+            elif op == RETURN:
+                result = stack.pop()
+                if self._open_upvalues:
+                    self._close_upvalues(base)
+                del stack[base:]
+                frames.pop()
+                if len(frames) == depth:
+                    return result
+                stack.append(result)
+                frame = frames[-1]
+                chunk = frame.closure.function.chunk
+                code = chunk.code
+                constants = chunk.constants
+                upvalues = frame.closure.upvalues
+                base = frame.base
+                ip = frame.ip
+            elif op == GET_INDEX:
+                index = stack.pop()
+                try:
+                    stack[-1] = get_index(stack[-1], index)
+                except LoxRuntimeError as error:
+                    raise self._error(chunk, ip, error.message)
+            elif op == SET_INDEX:
+                value = stack.pop()
+                index = stack.pop()
+                try:
+                    stack[-1] = set_index(stack[-1], index, value)
+                except LoxRuntimeError as error:
+                    raise self._error(chunk, ip, error.message)
+            elif op == GET_UPVALUE:
+                upvalue = upvalues[code[ip]]
+                stack.append(upvalue.cells[upvalue.index])
+                ip += 1
+            elif op == SET_UPVALUE:
+                upvalue = upvalues[code[ip]]
+                upvalue.cells[upvalue.index] = stack[-1]
+                ip += 1
+            elif op == NIL:
+                stack.append(None)
+            elif op == TRUE:
+                stack.append(True)
+            elif op == FALSE:
+                stack.append(False)
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif op == NEGATE:
+                stack[-1] = -float(stack[-1])
+            elif op == PRINT:
+                print(stringify(stack.pop()))
+            elif op == SET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name not in values:
+                    raise self._error(chunk, ip, "Undefined variable '{0}'.".format(name))
+                values[name] = stack[-1]
+            elif op == DEFINE_GLOBAL:
+                values[constants[code[ip]]] = stack.pop()
+                ip += 1
+            elif op == CLOSURE:
+                function = constants[code[ip]]
+                ip += 1
+                captured = []
+                for _ in range(function.upvalue_count):
+                    if code[ip]:
+                        captured.append(self._capture(base + code[ip + 1]))
+                    else:
+                        captured.append(upvalues[code[ip + 1]])
+                    ip += 2
+                stack.append(Closure(function, captured))
+            elif op == BUILD_LIST:
+                count = code[ip]
+                ip += 1
+                if count:
+                    elements = stack[-count:]
+                    del stack[-count:]
+                    stack.append(elements)
+                else:
+                    stack.append([])
+            elif op == BUILD_MAP:
+                count = code[ip]
+                ip += 1
+                entries = stack[len(stack) - 2 * count:]
+                del stack[len(stack) - 2 * count:]
+                try:
+                    stack.append(new_map(entries[::2], entries[1::2]))
+                except LoxRuntimeError as error:
+                    raise self._error(chunk, ip, error.message)
+            elif op == GET_PROPERTY:
+                expr = constants[code[ip]]
+                ip += 1
+                instance = stack[-1]
+                cache = expr.cache
+                if cache is not None and type(instance) is LoxInstance \
+                        and instance.shape is cache[0]:
+                    property_cache.hits += 1
+                    slot = cache[1]
+                    stack[-1] = instance.fields[slot] if slot is not None \
+                        else BoundMethod(instance, cache[2])
+                else:
+                    stack[-1] = property_cache.get(expr, instance)
+            elif op == SET_PROPERTY:
+                expr = constants[code[ip]]
+                ip += 1
+                value = stack.pop()
+                instance = stack[-1]
+                if type(instance) is not LoxInstance:
+                    raise self._error(chunk, ip, "Only instances have fields.")
+                cache = expr.cache
+                if cache is not None and instance.shape is cache[0]:
+                    property_cache.hits += 1
+                    shape = cache[2]
+                    if shape is None:
+                        instance.fields[cache[1]] = value
+                    else:
+                        instance.fields.append(value)
+                        instance.shape = shape
+                else:
+                    property_cache.set(expr, instance, value)
+                stack[-1] = value
+            elif op == GET_SUPER:
+                name = constants[code[ip]]
+                ip += 1
+                superclass = stack.pop()
+                method = superclass.find_method(name)
+                if method is None:
+                    raise self._error(chunk, ip, "Undefined property '{}'.".format(name))
+                stack[-1] = BoundMethod(stack[-1], method)
+            elif op == CLASS:
+                name = constants[code[ip]]
+                count = code[ip + 1]
+                inherits = code[ip + 2]
+                ip += 3
+                methods = stack[len(stack) - count:]
+                del stack[len(stack) - count:]
+                superclass = stack[-1] if inherits else None
+                if inherits and type(superclass) is not LoxClass:
+                    raise self._error(chunk, ip, "Superclass must be a class.")
+                stack.append(LoxClass(name, superclass, {
+                    method.function.name: method for method in methods}))
+            elif op == CLOSE_UPVALUE:
+                self._close_upvalues(len(stack) - 1)
+                stack.pop()
+            else:
+                raise self._error(chunk, ip, "Unknown opcode {}.".format(op))
@@ -3,55 +3,72 @@ test.integration.test_integration
 ~~~~~~~~~~~~~~~~
 """
 
-from pylox.lox import Lox
+import io
+
+import pytest
+
+from pylox.lox import Lox, ENGINES
+
+
+@pytest.fixture(params=sorted(ENGINES))
+def engine(request):
+    return request.param
 
 
 class TestConditions:
-    def test_if(self, capsys):
+    def test_if(self, capsys, engine):
         line = "var num = 9; \
                if(num >= 0 and num <= 10) \
                print(true);"
-        lox = Lox()
+        lox = Lox(engine=engine)
         lox.run(line)
         out, err = capsys.readouterr()
         assert err == ''
         assert out == "True\n"
 
-    def test_of(self, capsys):
+    def test_of(self, capsys, engine):
         line = 'var s = "hi"; \
                if(s == "hi" or s == "hello") \
                print("Greetings");'
-        lox = Lox()
+        lox = Lox(engine=engine)
         lox.run(line)
         out, err = capsys.readouterr()
         assert err == ''
         assert out == "Greetings\n"
 
+    def test_and(self, capsys, engine):
+        line = 'print 1 and 2; print nil and 2; print false or "x";'
+        lox = Lox(engine=engine)
+        lox.run(line)
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "2.0\nNone\nx\n"
+
 
 class TestFunction:
-    def test_string_parameters(self, capsys):
+    def test_string_parameters(self, capsys, engine):
         line = 'fun strAppend(str1, str2) { \
         var str = str1 + str2; \
         return str;} \
         print(strAppend("foo", "bar"));'
-        lox = Lox()
+        lox = Lox(engine=engine)
         lox.run(line)
         out, err = capsys.readouterr()
         assert err == ''
         assert out == "foobar\n"
 
-    def test_num_parameters(self, capsys):
+    def test_num_parameters(self, capsys, engine):
         line = 'fun add(a, b){ \
         return(a + b); \
         } \
         print(add(10, 5));'
-        lox = Lox()
+        lox = Lox(engine=engine)
         lox.run(line)
         out, err = capsys.readouterr()
         assert err == ''
         assert out == "15.0\n"
 
-    def test_fun_with_conditional(self, capsys):
+    def test_fun_with_conditional(self, capsys, engine):
         line = 'fun checkNegative(num){ \
         if(num <= 0) \
         return(true); \
@@ -59,13 +76,13 @@ class TestFunction:
         return(false); \
         } \
         print(checkNegative(-1));'
-        lox = Lox()
+        lox = Lox(engine=engine)
         lox.run(line)
         out, err = capsys.readouterr()
         assert err == ''
         assert out == "True\n"
 
-    def test_recursion(self, capsys):
+    def test_recursion(self, capsys, engine):
         line='fun isOdd(n) { \
         if (n == 0) return false; \
         return isEven(n - 1); \
@@ -75,7 +92,7 @@ class TestFunction:
         return isOdd(n - 1); \
         } \
         print(isEven(3));'
-        lox = Lox()
+        lox = Lox(engine=engine)
         lox.run(line)
         out, err = capsys.readouterr()
         assert err == ''
@@ -83,22 +100,211 @@ class TestFunction:
 
 
 class TestLoops:
-    def test_while_loop(self, capsys):
+    def test_while_loop(self, capsys, engine):
         line = 'var i = 0; \
         while(i < 10) { \
         print(i); \
         i = i + 1; \
         }'
-        lox = Lox()
+        lox = Lox(engine=engine)
         lox.run(line)
         out, err = capsys.readouterr()
         assert err == ''
         assert out == "0.0\n1.0\n2.0\n3.0\n4.0\n5.0\n6.0\n7.0\n8.0\n9.0\n"
 
-    def test_for_loop(self, capsys):
+    def test_for_loop(self, capsys, engine):
         line = 'for (var i = 0; i < 10; i = i + 1) print i;'
-        lox = Lox()
+        lox = Lox(engine=engine)
         lox.run(line)
         out, err = capsys.readouterr()
         assert err == ''
         assert out == "0.0\n1.0\n2.0\n3.0\n4.0\n5.0\n6.0\n7.0\n8.0\n9.0\n"
+
+
+class TestBulkScanning:
+    def test_for_loop(self, capsys):
+        line = 'for (var i = 0; i < 3; i = i + 1) print i;'
+        lox = Lox(bulk=True)
+        lox.run(line)
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "0.0\n1.0\n2.0\n"
+
+    def test_compact_tokens(self, capsys):
+        line = 'fun add(a, b){ return a + b; } print add(1, 2);'
+        lox = Lox(compact=True)
+        lox.run(line)
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "3.0\n"
+
+
+class TestStreaming:
+    def test_run_stream(self, capsys):
+        lox = Lox()
+        lox.run_stream(io.StringIO('var a = "x";\nfun f(s) {\n return s + s;\n}\nprint f(a);\n'))
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "xx\n"
+
+    def test_output_before_end_of_input(self, capsys):
+        seen = []
+
+        def chunks():
+            yield 'print 1;\n'
+            yield '\n'
+            seen.append(capsys.readouterr().out)
+            yield 'print 2;'
+
+        Lox().run_stream(chunks())
+        out, err = capsys.readouterr()
+        assert seen == ["1.0\n"]
+        assert out == "2.0\n"
+
+
+class TestPrattParsing:
+    def test_recursion(self, capsys):
+        line = 'fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); } \
+        print fib(10);'
+        lox = Lox(pratt=True)
+        lox.run(line)
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "55.0\n"
+
+
+class TestCache:
+    def test_run_file_cached(self, capsys, tmp_path, monkeypatch):
+        script = tmp_path / "script.lox"
+        script.write_text('fun add(a, b){ return a + b; } print add(1, 2);')
+        cache_dir = str(tmp_path / "cache")
+        Lox(cache_dir=cache_dir).run_file(str(script))
+        monkeypatch.setattr(Lox, "parse", None)
+        Lox(cache_dir=cache_dir).run_file(str(script))
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "3.0\n3.0\n"
+
+
+class TestOptimized:
+    def test_loops(self, capsys):
+        line = 'var day = 0; var i = 0; \
+        while (i < 3) { \
+        if (true and i > 0) day = day + 60 * 60 * 24; \
+        i = i + 1; \
+        } \
+        while (false) print "never"; \
+        print day;'
+        lox = Lox(optimize=True)
+        lox.run(line)
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "172800.0\n"
+
+    def test_runtime_error_line(self):
+        line = 'print 1;\nprint "a" - 1;'
+        lox = Lox(optimize=True)
+        with pytest.raises(Exception, match=r"Operands must be numbers.\n\[line 2\]"):
+            lox.run(line)
+
+
+class TestEngines:
+    def test_closures(self, capsys, engine):
+        line = 'fun counter() { var n = 0; fun inc() { n = n + 1; return n; } return inc; } \
+        var c = counter(); c(); print c(); \
+        var fs; for (var i = 0; i < 3; i = i + 1) { var j = i; fun f() { print j; } \
+        if (i == 1) fs = f; } fs();'
+        lox = Lox(engine=engine)
+        lox.run(line)
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "2.0\n1.0\n"
+
+    def test_nested_scopes(self, capsys, engine):
+        line = 'var a = "global"; { var b = "b"; { var c = "c"; { print a + b + c; b = "x"; } } \
+        print b; } print nil == nil; print !nil; print -"3"; print 1 + "a";'
+        lox = Lox(engine=engine)
+        lox.run(line)
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "globalbc\nx\nTrue\nTrue\n-3.0\nNone\n"
+
+    def test_runtime_error(self, engine):
+        lox = Lox(engine=engine)
+        with pytest.raises(Exception, match=r"Expected 1 arguments, but got 0.\n\[line 2\]"):
+            lox.run('fun f(a) { return a; }\nf();')
+        with pytest.raises(Exception, match="Undefined variable 'missing'"):
+            lox.run('missing = 1;')
+
+    def test_natives(self, capsys, engine):
+        lox = Lox(engine=engine)
+        lox.define_native("sum", lambda *values: sum(values))
+        lox.run('var start = clock(); print sum(sqrt(4), pow(2, 3), 1) + len("ab"); \
+        print clock() >= start; print substr("lox", 0, 1) + str(nil);')
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "13.0\nTrue\nlNone\n"
+        with pytest.raises(Exception, match=r"Argument must be a string.\n\[line 2\]"):
+            lox.run('print 1;\nprint len(1);')
+
+    def test_vectors(self, capsys, engine):
+        lox = Lox(engine=engine)
+        lox.run('var a = vec(1, 2, 3); fun square(x) { return x * x; } \
+        print a + a * 2 - 1; print 12 / a; print dot(a, map(square, a)); print slice(a, 0, 2);')
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "vec(2.0, 5.0, 8.0)\nvec(12.0, 6.0, 4.0)\n36.0\nvec(1.0, 2.0)\n"
+
+    def test_collections(self, capsys, engine):
+        lox = Lox(engine=engine)
+        lox.run('var xs = [1, "a"]; append(xs, [true]); xs[0] = xs[0] + 1; \
+        var m = {"n": xs, 1: nil}; m["k"] = len(xs); print m; print xs[2][0] and m["n"][1]; \
+        print keys(m); print pop(xs) == [true]; print str(fill(2, m["missing"]));')
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "{n: [2.0, a, [True]], 1.0: None, k: 3.0}\na\n[n, 1.0, k]\nTrue\n[None, None]\n"
+        with pytest.raises(Exception, match=r"Index out of range.\n\[line 2\]"):
+            lox.run('var ys = [];\nprint ys[0];')
+
+    def test_string_building(self, capsys, engine):
+        lox = Lox(engine=engine)
+        lox.run('var s = ""; for (var i = 0; i < 50; i = i + 1) s = s + "ab"; \
+        var t = ""; for (var i = 0; i < 50; i = i + 1) t = t + "ab"; \
+        var m = {}; m[s] = 1; print len(s + "!"); print s == t; print m[t]; print substr(s, 0, 3);')
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "101.0\nTrue\n1.0\naba\n"
+
+    def test_folded_string_building(self, capsys, engine):
+        lox = Lox(engine=engine, optimize=True)
+        lox.run('print "{}" + "b";'.format("a" * 70))
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "a" * 70 + "b\n"
+
+    def test_classes(self, capsys, engine):
+        lox = Lox(engine=engine)
+        line = 'class Shape { init(name) { this.name = name; } describe() { \
+        return this.name + " of area " + str(this.area()); } } \
+        class Square < Shape { init(side) { super.init("square"); this.side = side; } \
+        area() { return this.side * this.side; } } \
+        var s = Square(3); var describe = s.describe; s.side = 4; \
+        print describe(); print s; print Square; print s.init(2) == s;'
+        lox.run(line)
+        out, err = capsys.readouterr()
+        assert err == ''
+        assert out == "square of area 16.0\nSquare instance\nSquare\nTrue\n"
+        with pytest.raises(Exception, match=r"Undefined property 'missing'.\n\[line 2\]"):
+            lox.run('var t = Square(1);\nprint t.missing;')
+
+    def test_static_error_before_running(self, capsys, engine):
+        lox = Lox(engine=engine)
+        with pytest.raises(Exception, match="Cannot return from top-level code."):
+            lox.run('print "ran";\nreturn 1;')
+        out, _ = capsys.readouterr()
+        assert out == ''
+
+    def test_stack_overflow(self, engine):
+        lox = Lox(engine=engine, max_depth=100 if engine == "vm" else None)
+        with pytest.raises(Exception, match=r"Stack overflow.\n\[line 2\]"):
+            lox.run('fun f(n) {\n return 1 + f(n + 1); }\nf(0);')
@@ -0,0 +1,47 @@
+"""
+test.test_batch
+~~~~~~~~~~~~~~~~
+Test file for batch check and compile
+"""
+import os
+
+from pylox import batch
+from pylox.cache import ASTCache
+
+
+class TestBatch:
+    def test_find_scripts(self, tmp_path):
+        (tmp_path / "sub").mkdir()
+        for name in ("a.lox", "b.txt", "sub/c.lox"):
+            (tmp_path / name).write_text("print 1;")
+        found = batch.find_scripts([str(tmp_path)])
+        assert sorted(os.path.relpath(path, str(tmp_path)) for path in found) == ["a.lox", "sub/c.lox"]
+        assert batch.find_scripts([str(tmp_path / "*.lox")]) == [str(tmp_path / "a.lox")]
+
+    def test_collects_every_error(self, tmp_path):
+        script = tmp_path / "bad.lox"
+        script.write_text('var = 1;\nprint (1;\nvar b = @;\nprint 2;')
+        path, diagnostics, tokens = batch.check_file(str(script))
+        assert path == str(script)
+        assert diagnostics == [
+            (1, "Error at '=': Expect variable name."),
+            (2, "Error at ';': Expect ')' after expression."),
+            (3, "Error: unexpected character: @"),
+            (3, "Error at ';': Expect expression.")]
+        assert tokens == 16
+
+    def test_compile(self, tmp_path, capsys):
+        script = tmp_path / "good.lox"
+        script.write_text('print 1;')
+        cache_dir = str(tmp_path / "cache")
+        assert batch.main(["compile", "--cache-dir", cache_dir, "-j", "1", str(script)]) == 0
+        assert ASTCache(cache_dir).load('print 1;') is not None
+        out, err = capsys.readouterr()
+        assert out == ''
+        assert err.startswith('compiled 1 files, 0 with errors')
+
+    def test_check_fails(self, tmp_path, capsys):
+        (tmp_path / "bad.lox").write_text('print ;')
+        assert batch.main(["check", "-j", "1", str(tmp_path)]) == 65
+        out, _ = capsys.readouterr()
+        assert out == "{}:1: Error at ';': Expect expression.\n".format(tmp_path / "bad.lox")
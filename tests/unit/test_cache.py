@@ -0,0 +1,68 @@
+"""
+test.test_cache
+~~~~~~~~~~~~~~~~
+Test file for the AST cache
+"""
+import os
+
+from pylox import cache
+from pylox.cache import ASTCache
+from pylox.parser import Parser
+from pylox.scanner import Scanner
+from pylox import stmt
+
+
+def _parse(source):
+    return Parser(Scanner(source).scan_tokens(), "").parse()
+
+
+class TestASTCache:
+    def test_round_trip(self, tmp_path):
+        source = 'var a = 1 + 2;'
+        ast_cache = ASTCache(str(tmp_path))
+        assert ast_cache.load(source) is None
+        ast_cache.store(source, _parse(source))
+        ast = ast_cache.load(source)
+        assert isinstance(ast[0], stmt.Var)
+        assert ast[0].name.lexeme == 'a'
+        assert ast[0].initializer.right.value == 2
+
+    def test_keyed_by_version(self, tmp_path, monkeypatch):
+        source = 'print 1;'
+        ast_cache = ASTCache(str(tmp_path))
+        ast_cache.store(source, _parse(source))
+        monkeypatch.setattr(cache, "__version__", "0.0.0")
+        assert ast_cache.load(source) is None
+
+    def test_keyed_by_schema(self, tmp_path, monkeypatch):
+        source = 'print 1;'
+        ast_cache = ASTCache(str(tmp_path))
+        ast_cache.store(source, _parse(source))
+        monkeypatch.setattr(cache, "SCHEMA", b"older nodes")
+        assert ast_cache.load(source) is None
+
+    def test_stale_file_is_a_miss(self, tmp_path):
+        source = 'print 1;'
+        ast_cache = ASTCache(str(tmp_path))
+        # a pickle of a class that no longer exists
+        with open(ast_cache.path(source), "wb") as content:
+            content.write(b"cpylox.stmt\nGone\n.")
+        assert ast_cache.load(source) is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        ast_cache = ASTCache(str(tmp_path))
+        sources = ['print {};'.format(i) for i in range(3)]
+        for i, source in enumerate(sources):
+            ast_cache.store(source, _parse(source))
+            os.utime(ast_cache.path(source), (i, i))
+        size = os.path.getsize(ast_cache.path(sources[0]))
+        ast_cache.max_size = 2 * size
+        ast_cache.evict()
+        assert ast_cache.load(sources[0]) is None
+        assert ast_cache.load(sources[1]) is not None
+        assert ast_cache.load(sources[2]) is not None
+
+    def test_no_temporary_files_left(self, tmp_path):
+        source = 'print 1;'
+        ASTCache(str(tmp_path)).store(source, _parse(source))
+        assert [name for name in os.listdir(str(tmp_path)) if not name.endswith(cache.SUFFIX)] == []
@@ -0,0 +1,47 @@
+"""
+test.test_collection
+~~~~~~~~~~~~~~~~
+Test file for lists and maps
+"""
+import pytest
+from pylox.collection import new_map, get_index, set_index, show, lox_key
+from pylox.error import LoxRuntimeError
+from pylox.vector import vector
+
+
+class TestCollection:
+    def test_list_index(self):
+        values = [1.0, "a"]
+        assert get_index(values, 1.0) == "a"
+        assert set_index(values, 0.0, True) is True
+        assert values == [True, "a"]
+
+    def test_map_keys(self):
+        entries = new_map([True, 1.0, "a"], ["t", "one", "x"])
+        assert len(entries) == 3
+        assert get_index(entries, True) == "t"
+        assert get_index(entries, 1.0) == "one"
+        assert get_index(entries, "b") is None
+        assert [lox_key(key) for key in entries] == [True, 1.0, "a"]
+
+    def test_vector_index(self):
+        values = vector([1.0, 2.0])
+        set_index(values, 1.0, 5.0)
+        assert get_index(values, 1.0) == 5.0
+
+    def test_errors(self):
+        for collection, index, message in (
+                ([1.0], 1.0, "Index out of range."),
+                ([1.0], -1.0, "Index out of range."),
+                ([1.0], 0.5, "Index must be an integer."),
+                ([1.0], "0", "Index must be an integer."),
+                ({}, [], "Lists and maps cannot be map keys."),
+                ("ab", 0.0, "Can only index lists, maps and vectors.")):
+            with pytest.raises(LoxRuntimeError) as error:
+                get_index(collection, index)
+            assert error.value.message == message
+
+    def test_show(self):
+        values = [1.0, "a", None, new_map([False], [[]])]
+        values.append(values)
+        assert show(values) == "[1.0, a, None, {False: []}, [...]]"
@@ -0,0 +1,64 @@
+"""
+test.test_compiler
+~~~~~~~~~~~~~~~~
+Test file for the bytecode compiler
+"""
+from pylox.compiler import Chunk, Compiler, OpCode
+from pylox.parser import Parser
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner
+
+
+def _compile(line):
+    statements = Parser(Scanner(line).scan_tokens(), "").parse()
+    return Compiler().compile(Resolver("").resolve(statements))
+
+
+class TestCompiler:
+    def test_global(self):
+        function = _compile('var a = 1 + 2; print a;')
+        assert function.chunk.code == [
+            OpCode.CONSTANT, 0, OpCode.CONSTANT, 1, OpCode.ADD, OpCode.DEFINE_GLOBAL, 2,
+            OpCode.GET_GLOBAL, 2, OpCode.PRINT, OpCode.NIL, OpCode.RETURN]
+        assert function.chunk.constants == [1.0, 2.0, "a"]
+
+    def test_locals(self):
+        function = _compile('{ var a = true; var b = a; b = nil; }')
+        assert function.chunk.code == [
+            OpCode.TRUE, OpCode.GET_LOCAL, 1, OpCode.NIL, OpCode.SET_LOCAL, 2, OpCode.POP,
+            OpCode.POP, OpCode.POP, OpCode.NIL, OpCode.RETURN]
+
+    def test_upvalues(self):
+        function = _compile('fun outer() { var x = 1; fun inner() { return x; } return inner; }')
+        outer = function.chunk.constants[0]
+        inner = outer.chunk.constants[1]
+        assert inner.upvalue_count == 1
+        assert inner.chunk.code[:2] == [OpCode.GET_UPVALUE, 0]
+        index = outer.chunk.code.index(OpCode.CLOSURE)
+        assert outer.chunk.code[index:index + 4] == [OpCode.CLOSURE, 1, 1, 1]
+
+    def test_line_table(self):
+        function = _compile('print a;\n\nprint -a;')
+        chunk = function.chunk
+        assert chunk.line(chunk.code.index(OpCode.GET_GLOBAL)) == 1
+        assert chunk.line(chunk.code.index(OpCode.NEGATE)) == 3
+        assert chunk.lines == [1, 3]
+
+    def test_constants_shared(self):
+        chunk = Chunk()
+        assert chunk.add_constant(1.0) == chunk.add_constant(1.0)
+        assert chunk.add_constant(True) != chunk.add_constant(1.0)
+
+    def test_methods(self):
+        function = _compile('class A { init() { return; } get() { return this; } } \
+        class B < A { get() { return super.get(); } }')
+        chunk = function.chunk
+        assert chunk.code[4:8] == [OpCode.CLASS, chunk.constants.index("A"), 2, 0]
+        # the superclass is the local super, closed over by the methods
+        assert chunk.code[-9:-2] == [OpCode.CLASS, chunk.constants.index("B"), 1, 1,
+                                     OpCode.DEFINE_GLOBAL, chunk.constants.index("B"),
+                                     OpCode.CLOSE_UPVALUE]
+        init, get = chunk.constants[:2]
+        # init returns this, in slot 0, and this is slot 0 of every method
+        assert init.chunk.code == [OpCode.GET_LOCAL, 0, OpCode.RETURN] * 2
+        assert get.chunk.code[:3] == [OpCode.GET_LOCAL, 0, OpCode.RETURN]
@@ -0,0 +1,59 @@
+"""
+test.test_inlinecache
+~~~~~~~~~~~~~~~~
+Test file for the inline caches of call sites
+"""
+import pytest
+from pylox.inlinecache import CallCache, MEGAMORPHIC
+from pylox.interpreter import Interpreter
+from pylox.parser import Parser
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner
+
+
+def _run(line, interpreter):
+    statements = list(Resolver("").resolve(Parser(Scanner(line).scan_tokens(), "").parse()))
+    interpreter.interpret(statements)
+    return statements
+
+
+class TestCallCache:
+    def test_monomorphic(self, capsys):
+        interpreter = Interpreter()
+        statements = _run('fun add(a, b) { return a + b; } var s = 0; \
+        for (var i = 0; i < 5; i = i + 1) s = add(s, i); print s;', interpreter)
+        call = statements[2].body.expression.value
+        assert call.cache is interpreter.globals.values["add"]
+        assert interpreter.call_cache.hits == 4
+        assert interpreter.call_cache.misses == 1
+        out, _ = capsys.readouterr()
+        assert out == "10.0\n"
+
+    def test_megamorphic(self, capsys):
+        interpreter = Interpreter()
+        interpreter.call_cache = CallCache(max_rebinds=2)
+        statements = _run('fun a() { return 1; } fun b() { return 2; } \
+        fun call(f) { return f(); } print call(a) + call(b) + call(a) + call(a);', interpreter)
+        call = statements[2].body[0].value
+        assert call.cache is MEGAMORPHIC
+        assert interpreter.call_cache.megamorphic == 1
+        out, _ = capsys.readouterr()
+        assert out == "5.0\n"
+
+    def test_miss_checks(self):
+        interpreter = Interpreter()
+        with pytest.raises(Exception, match="Expected 1 arguments, but got 0."):
+            _run('fun f(a) { return a; } fun call(g) { return g(); } \
+            fun h() { return 0; } call(h); call(f);', interpreter)
+        with pytest.raises(Exception, match="Can only call functions and classes."):
+            _run('fun call(g) { return g(); } fun h() { return 0; } call(h); call(1);',
+                 interpreter)
+
+    def test_statistics(self):
+        interpreter = Interpreter()
+        _run('fun f() {} f(); f(); f(); f();', interpreter)
+        statistics = interpreter.statistics()
+        assert statistics["call cache misses"] == 4
+        assert statistics["call cache hit rate"] == 0.0
+        _run('fun g() {} for (var i = 0; i < 4; i = i + 1) g();', interpreter)
+        assert interpreter.statistics()["call cache hit rate"] == 3 / 8
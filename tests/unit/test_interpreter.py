@@ -7,6 +7,12 @@ Test file for interpreter
 from pylox.scanner import Scanner
 from pylox.parser import Parser
 from pylox.interpreter import Interpreter
+from pylox.resolver import Resolver
+
+
+def _run(line):
+    statements = Parser(Scanner(line).scan_tokens(), "").parse()
+    Interpreter().interpret(Resolver("").resolve(statements))
 
 
 class TestInterpreter:
@@ -17,3 +23,77 @@ class TestInterpreter:
         parser = Parser(tokens, "")
         statements = parser.parse();
         Interpreter().interpret(statements)
+
+    def test_for_body_scope(self, capsys):
+        line = 'for (var i = 0; i < 3; i = i + 1) { var j = i * 2; print j; }'
+        _run(line)
+        out, _ = capsys.readouterr()
+        assert out == "0.0\n2.0\n4.0\n"
+
+    def test_for_closure_per_iteration(self, capsys):
+        line = 'var i = 0; var first; \
+        for (; i < 2; i = i + 1) { var x = i; fun f() { print x; } if (i == 0) first = f; } \
+        first();'
+        _run(line)
+        out, _ = capsys.readouterr()
+        assert out == "0.0\n"
+
+    def test_nested_scope_lookup(self, capsys):
+        line = 'fun outer() { var a = "outer"; { { print a; a = "set"; } } print a; } outer();'
+        _run(line)
+        out, _ = capsys.readouterr()
+        assert out == "outer\nset\n"
+
+    def test_recursion(self, capsys):
+        line = 'fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); } print fib(10);'
+        _run(line)
+        out, _ = capsys.readouterr()
+        assert out == "55.0\n"
+
+    def test_return_from_loops(self, capsys):
+        line = 'fun f(n) { for (var i = 0; ; i = i + 1) { while (true) { if (i == n) { return i; } \
+        else return nil; } } } print f(0); print f(1); \
+        fun g() { { var a = 1; } } print g();'
+        _run(line)
+        out, _ = capsys.readouterr()
+        assert out == "0.0\nNone\nNone\n"
+
+    def test_tail_calls(self, capsys):
+        line = 'fun isOdd(n) { if (n == 0) return false; return isEven(n - 1); } \
+        fun isEven(n) { if (n == 0) return true; return isOdd(n - 1); } print isEven(20001); \
+        fun count(n, acc) { if (n == 0) return acc; { var m = n - 1; return count(m, acc + 1); } } \
+        print count(20000, 0) + 1; fun twice(n) { return count(n, 0) * 2; } print twice(3);'
+        _run(line)
+        out, _ = capsys.readouterr()
+        assert out == "False\n20001.0\n6.0\n"
+
+    def test_frames_pooled(self, capsys):
+        line = 'fun fib(n) { if (n < 2) return n; var a = fib(n - 1); return a + fib(n - 2); } \
+        print fib(12); fun adder(n) { fun add(m) { return n + m; } return add; } \
+        var a = adder(1); var b = adder(2); print a(10) + b(20);'
+        statements = list(Resolver("").resolve(Parser(Scanner(line).scan_tokens(), "").parse()))
+        interpreter = Interpreter()
+        interpreter.interpret(statements)
+        out, _ = capsys.readouterr()
+        assert out == "144.0\n33.0\n"
+        assert statements[0].leaf and not statements[2].leaf
+        fib = interpreter.globals.values["fib"]
+        assert 0 < len(fib._frames) <= 12
+        assert interpreter.globals.values["adder"]._frames is None
+
+    def test_scope_free_blocks(self, capsys, monkeypatch):
+        import pylox.interpreter
+        made = []
+
+        class Counting(pylox.interpreter.Environment):
+            def __init__(self, *args):
+                made.append(args)
+                super().__init__(*args)
+
+        monkeypatch.setattr(pylox.interpreter, "Environment", Counting)
+        _run('var i = 0; while (i < 5) { { if (i > 2) { print i; } } i = i + 1; } \
+        { var a = "a"; { print a; } }')
+        out, _ = capsys.readouterr()
+        assert out == "3.0\n4.0\na\n"
+        # the globals, and the one block declaring a name
+        assert len(made) == 2
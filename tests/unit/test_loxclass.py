@@ -0,0 +1,64 @@
+"""
+test.test_loxclass
+~~~~~~~~~~~~~~~~
+Test file for classes, their shapes and the inline caches of property sites
+"""
+from pylox.inlinecache import PropertyCache, MEGAMORPHIC_PROPERTY
+from pylox.interpreter import Interpreter
+from pylox.loxclass import LoxClass, LoxInstance
+from pylox.parser import Parser
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner
+
+
+def _run(line, interpreter):
+    statements = list(Resolver("").resolve(Parser(Scanner(line).scan_tokens(), "").parse()))
+    interpreter.interpret(statements)
+    return statements
+
+
+class TestShape:
+    def test_shared_transitions(self):
+        klass = LoxClass("A", None, {})
+        shape = klass.shape.add("x").add("y")
+        assert shape is klass.shape.add("x").add("y")
+        assert shape.slots == {"x": 0, "y": 1}
+        assert klass.shape.add("y").add("x") is not shape
+        assert str(LoxInstance(shape)) == "A instance"
+
+
+class TestPropertyCache:
+    def test_monomorphic(self, capsys):
+        interpreter = Interpreter()
+        statements = _run('class P { init(x) { this.x = x; } get() { return this.x; } } \
+        var s = 0; for (var i = 0; i < 5; i = i + 1) s = s + P(i).get(); print s;', interpreter)
+        klass = interpreter.globals.values["P"]
+        shape = klass.shape.add("x")
+        init, get = statements[0].methods
+        assert init.body[0].expression.cache == (klass.shape, 0, shape)
+        assert get.body[0].value.cache == (shape, 0, None)
+        out, _ = capsys.readouterr()
+        assert out == "10.0\n"
+        statistics = interpreter.statistics()
+        # this.x = x, P(i).get and this.x miss once each
+        assert statistics["property cache misses"] == 3
+        assert statistics["property cache hits"] == 12
+
+    def test_megamorphic(self, capsys):
+        interpreter = Interpreter()
+        interpreter.property_cache = PropertyCache(max_rebinds=2)
+        statements = _run('class A { init() { this.a = 1; this.v = 1; } } \
+        class B { init() { this.v = 2; } } \
+        fun v(o) { return o.v; } print v(A()) + v(B()) + v(A()) + v(B());', interpreter)
+        assert statements[2].body[0].value.cache is MEGAMORPHIC_PROPERTY
+        assert interpreter.property_cache.megamorphic == 1
+        out, _ = capsys.readouterr()
+        assert out == "6.0\n"
+
+    def test_fields_shadow_methods(self, capsys):
+        interpreter = Interpreter()
+        _run('class A { m() { return "method"; } } var a = A(); var b = A(); \
+        fun call(o) { return o.m(); } print call(a); \
+        b.m = A; print b.m(); print call(a);', interpreter)
+        out, _ = capsys.readouterr()
+        assert out == "method\nA instance\nmethod\n"
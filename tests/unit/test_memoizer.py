@@ -0,0 +1,61 @@
+"""
+test.test_memoizer
+~~~~~~~~~~~~~~~~
+Test file for memoized functions
+"""
+from pylox.lox import Lox
+
+
+class TestMemoizer:
+    def test_memoize_pure(self, capsys):
+        lox = Lox(memoize=True)
+        lox.run('fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); } \
+        print fib(50); fun noisy(n) { print n; return n; } noisy(1); noisy(1);')
+        out, _ = capsys.readouterr()
+        assert out == "12586269025.0\n1.0\n1.0\n"
+        statistics = lox.statistics()
+        assert statistics["memo misses"] == 51
+        assert statistics["memo hit rate fib"] == 48 / (48 + 51)
+        assert "memo hit rate noisy" not in statistics
+
+    def test_marked(self, capsys):
+        lox = Lox(pure=["noisy"])
+        lox.run('fun noisy(n) { print n; return n; } noisy(1); noisy(2); noisy(1);')
+        out, _ = capsys.readouterr()
+        assert out == "1.0\n2.0\n"
+        assert lox.statistics()["memo hits"] == 1
+
+    def test_types_in_key(self, capsys):
+        lox = Lox(memoize=True)
+        lox.run('fun same(a) { return a; } print same(1); print same(true);')
+        out, _ = capsys.readouterr()
+        assert out == "1.0\nTrue\n"
+
+    def test_collection_arguments(self, capsys):
+        lox = Lox(pure=["first"])
+        lox.run('fun first(xs) { return xs[0]; } var xs = [1]; print first(xs); \
+        xs[0] = 2; print first(xs);')
+        out, _ = capsys.readouterr()
+        assert out == "1.0\n2.0\n"
+        assert lox.statistics()["memo hits"] == 0
+
+    def test_lru(self, capsys):
+        lox = Lox(pure=["noisy"], memo_size=2)
+        lox.run('fun noisy(n) { print n; return n; } \
+        noisy(1); noisy(2); noisy(1); noisy(3); noisy(1); noisy(2);')
+        out, _ = capsys.readouterr()
+        assert out == "1.0\n2.0\n3.0\n2.0\n"
+        statistics = lox.statistics()
+        assert statistics["memo evictions"] == 2
+        assert statistics["memo hit rate"] == 2 / 6
+
+    def test_tail_calls(self, capsys):
+        lox = Lox(memoize=True)
+        lox.run('fun isOdd(n) { if (n == 0) return false; return isEven(n - 1); } \
+        fun isEven(n) { if (n == 0) return true; return isOdd(n - 1); } print isEven(2000); \
+        fun count(n, acc) { if (n == 0) return acc; return count(n - 1, acc + 1); } \
+        print count(5000, 0); print isOdd(1001); print isEven(2000);')
+        out, _ = capsys.readouterr()
+        assert out == "True\n5000.0\nTrue\nTrue\n"
+        # isOdd(1001) tail calls down to a result still cached from isEven(2000)
+        assert lox.statistics()["memo hits"] == 2
@@ -0,0 +1,59 @@
+"""
+test.test_native
+~~~~~~~~~~~~~~~~
+Test file for native functions
+"""
+import pytest
+from pylox.lox import Lox
+from pylox.native import NATIVES, NativeFunction
+
+
+class TestNative:
+    def test_clock(self, capsys):
+        Lox().run('var start = clock(); print clock() >= start;')
+        out, _ = capsys.readouterr()
+        assert out == "True\n"
+
+    def test_standard(self, capsys):
+        Lox().run('print floor(2.5) + ceil(2.5) + abs(-1) + min(3, 1, 2); \
+        print lower("A") + upper("b") + substr("hello", 1, 3) + str(len("four"));')
+        out, _ = capsys.readouterr()
+        assert out == "7.0\naBel4.0\n"
+
+    def test_collections(self, capsys):
+        Lox().run('var xs = fill(2, 0); append(xs, 1); var m = dict("a", xs, false, 2); \
+        print len(xs) + len(m); print has(m, false); print remove(m, "a") == xs; print m;')
+        out, _ = capsys.readouterr()
+        assert out == "5.0\nTrue\nTrue\n{False: 2.0}\n"
+        with pytest.raises(Exception, match="Pop from an empty list."):
+            Lox().run('pop([]);')
+        with pytest.raises(Exception, match="Expected a value for every key."):
+            Lox().run('dict(1);')
+
+    def test_arguments(self):
+        with pytest.raises(Exception, match=r"Argument must be a number.\n\[line 2\]"):
+            Lox().run('print 1;\nprint sqrt("a");')
+        with pytest.raises(Exception, match="Expected 1 arguments, but got 2."):
+            Lox().run('sqrt(1, 2);')
+        with pytest.raises(Exception, match="Expected at least 1 argument."):
+            Lox().run('max();')
+
+    def test_math_errors(self):
+        with pytest.raises(Exception, match=r"Math error: .*\n\[line 1\]"):
+            Lox().run('floor(pow(10, 300) * pow(10, 300));')
+        with pytest.raises(Exception, match=r"Math error: .*\n\[line 1\]"):
+            Lox().run('ceil(num("nan"));')
+
+    def test_define_native(self, capsys):
+        lox = Lox()
+        lox.define_native("join", lambda *parts: "-".join(parts))
+        lox.define_native("twice", lambda value: value * 2, 1)
+        lox.run('print join("a", "b", "c"); print twice(2); print join; print join();')
+        out, _ = capsys.readouterr()
+        assert out == "a-b-c\n4.0\n<native fn join>\n\n"
+
+    def test_registry(self):
+        assert isinstance(NATIVES["clock"], NativeFunction)
+        assert NATIVES["clock"].arity() == 0
+        assert NATIVES["min"].arity() is None
+        assert set(NATIVES) >= {"clock", "sqrt", "floor", "len", "substr", "str", "num"}
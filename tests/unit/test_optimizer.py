@@ -0,0 +1,63 @@
+"""
+test.test_optimizer
+~~~~~~~~~~~~~~~~
+Test file for the optimizer
+"""
+from pylox.optimizer import Optimizer
+from pylox.parser import Parser
+from pylox.scanner import Scanner
+from pylox import expr
+from pylox import stmt
+
+
+def _optimize(line):
+    statements = Parser(Scanner(line).scan_tokens(), "").parse()
+    return list(Optimizer().optimize(statements))
+
+
+class TestOptimizer:
+    def test_fold_binary(self):
+        ast = _optimize('print 60 * 60 * 24;')
+        assert isinstance(ast[0].expression, expr.Literal)
+        assert ast[0].expression.value == 86400
+
+    def test_strip_grouping(self):
+        ast = _optimize('print a * (b + 1);')
+        assert isinstance(ast[0].expression.right, expr.Binary)
+
+    def test_fold_unary_and_grouping(self):
+        ast = _optimize('print -(2 + 3) < 0 == !nil;')
+        assert ast[0].expression.value is True
+
+    def test_fold_strings(self):
+        ast = _optimize('print "a" + "b";')
+        assert ast[0].expression.value == "ab"
+
+    def test_fold_logical(self):
+        assert _optimize('print true or a;')[0].expression.value is True
+        assert _optimize('print nil and a;')[0].expression.value is None
+        assert isinstance(_optimize('print false or a;')[0].expression, expr.Variable)
+        assert isinstance(_optimize('print 1 and a;')[0].expression, expr.Variable)
+
+    def test_keep_runtime_errors(self):
+        ast = _optimize('print "a" - 1;')
+        assert isinstance(ast[0].expression, expr.Binary)
+        ast = _optimize('print 1 / 0;')
+        assert isinstance(ast[0].expression, expr.Binary)
+
+    def test_prune_if(self):
+        ast = _optimize('if (1 > 2) print "never"; else print "always";')
+        assert isinstance(ast[0], stmt.Print)
+        assert ast[0].expression.value == "always"
+        assert _optimize('if (nil) print "never";') == []
+
+    def test_prune_while(self):
+        assert _optimize('while (false) print "never";') == []
+        ast = _optimize('{ while (1 < 0) { print "never"; } print "after"; }')
+        assert len(ast[0].statements) == 1
+        assert isinstance(ast[0].statements[0], stmt.Print)
+
+    def test_keep_nested_branch(self):
+        ast = _optimize('if (a) if (false) print 1;')
+        assert isinstance(ast[0], stmt.If)
+        assert isinstance(ast[0].then_branch, stmt.Block)
@@ -4,7 +4,7 @@ test.test_parser
 Test file for parser
 """
 from pylox.parser import Parser
-from pylox.scanner import Scanner
+from pylox.scanner import Scanner, TokenStream
 from pylox import expr
 from pylox import stmt
 
@@ -71,3 +71,85 @@ class TestExpressions:
         assert ast[0].expression.right.expression.left.value == 5
         assert ast[0].expression.right.expression.operator.lexeme == '+'
         assert ast[0].expression.right.expression.right.value == 8
+
+
+class TestTokenBuffer:
+    def test_add(self):
+        line = '3 + 4;'
+        ast = Parser(Scanner(line).scan_buffer(), "").parse()
+        assert isinstance(ast[0], stmt.Expression)
+        assert ast[0].expression.left.value == 3
+        assert ast[0].expression.operator.lexeme == '+'
+        assert ast[0].expression.right.value == 4
+
+    def test_paren(self):
+        line = '2 * (5 + 8);'
+        ast = Parser(Scanner(line).scan_buffer(), "").parse()
+        assert ast[0].expression.left.value == 2
+        assert ast[0].expression.right.__class__ == expr.Grouping
+        assert ast[0].expression.right.expression.right.value == 8
+
+
+class TestDeclarations:
+    def test_stream(self):
+        tokens = TokenStream(Scanner().scan_chunks(['var a = 1;', ' print a', ';']))
+        declarations = Parser(tokens, "").declarations()
+        first = next(declarations)
+        assert isinstance(first, stmt.Var)
+        assert first.name.lexeme == 'a'
+        assert isinstance(next(declarations), stmt.Print)
+        assert list(declarations) == []
+
+
+class TestStatements:
+    def test_for(self):
+        line = 'for (var i = 0; i < 10; i = i + 1) print i;'
+        ast = Parser(Scanner(line).scan_tokens(), "").parse()
+        assert isinstance(ast[0], stmt.For)
+        assert ast[0].initializer.name.lexeme == 'i'
+        assert ast[0].condition.operator.lexeme == '<'
+        assert isinstance(ast[0].increment, expr.Assign)
+        assert isinstance(ast[0].body, stmt.Print)
+
+    def test_for_without_clauses(self):
+        ast = Parser(Scanner('for (;;) {}').scan_tokens(), "").parse()
+        assert ast[0].initializer is None
+        assert ast[0].condition.value is True
+        assert ast[0].increment is None
+
+
+class TestCollections:
+    def test_literals(self):
+        ast = Parser(Scanner('[1, [2], {"a": 3}];').scan_tokens(), "").parse()
+        literal = ast[0].expression
+        assert isinstance(literal, expr.List)
+        assert isinstance(literal.elements[1], expr.List)
+        assert isinstance(literal.elements[2], expr.Map)
+        assert literal.elements[2].keys[0].value == "a"
+
+    def test_index_assignment(self):
+        ast = Parser(Scanner('a[0][1] = b[2];').scan_tokens(), "").parse()
+        assignment = ast[0].expression
+        assert isinstance(assignment, expr.SetIndex)
+        assert isinstance(assignment.collection, expr.Index)
+        assert isinstance(assignment.value, expr.Index)
+
+
+class TestClasses:
+    def test_class(self):
+        ast = Parser(Scanner('class B < A { init(x) { this.x = x; } get() { return super.get(); } }')
+                     .scan_tokens(), "").parse()
+        assert isinstance(ast[0], stmt.Class)
+        assert ast[0].superclass.name.lexeme == 'A'
+        assert [method.name.lexeme for method in ast[0].methods] == ['init', 'get']
+        assignment = ast[0].methods[0].body[0].expression
+        assert isinstance(assignment, expr.Set)
+        assert isinstance(assignment.object, expr.This)
+        assert ast[0].methods[1].body[0].value.callee.method.lexeme == 'get'
+
+    def test_property_chain(self):
+        ast = Parser(Scanner('a.b(1).c;').scan_tokens(), "").parse()
+        get = ast[0].expression
+        assert isinstance(get, expr.Get)
+        assert get.name.lexeme == 'c'
+        assert isinstance(get.object, expr.Call)
@@ -0,0 +1,51 @@
+"""
+test.test_prattparser
+~~~~~~~~~~~~~~~~
+Test file for the Pratt parser
+"""
+from pylox.parser import Parser
+from pylox.prattparser import PrattParser
+from pylox.scanner import Scanner, Token
+from pylox import expr
+
+
+def _dump(node):
+    if isinstance(node, list):
+        return [_dump(item) for item in node]
+    if isinstance(node, Token):
+        return node.type, node.lexeme, node.line
+    if hasattr(node, '__dict__'):
+        return type(node).__name__, {key: _dump(value) for key, value in vars(node).items()}
+    return node
+
+
+class TestPrattParser:
+    def test_same_nodes_as_parser(self):
+        lines = ['a = b = c;', '1 + 2 * 3 - 4 / 5;', '-a * !b;', '-f(1)(2, 3 + 4)(g(h()));',
+                 '(a)(b);', 'a or b and c == d < e;', 'x = (1 + 2) * -(3);', '!!a;',
+                 '1 >= 2 != 3 <= 4;', 'print f(a = 1, b);',
+                 'a[1][-i] = [f(x)[0], {"k": -m[k]}, []];', '-a[0] * {}["b"];',
+                 'a.b.c = -this.d(e).f + super.g;', '(a).b[0].c = d;']
+        for line in lines:
+            expected = _dump(Parser(Scanner(line).scan_tokens(), "").parse())
+            assert _dump(PrattParser(Scanner(line).scan_tokens(), "").parse()) == expected
+
+    def test_precedence(self):
+        ast = PrattParser(Scanner('1 + 2 * 3;').scan_tokens(), "").parse()
+        assert ast[0].expression.left.value == 1
+        assert ast[0].expression.right.operator.lexeme == '*'
+
+    def test_invalid_assignment_target(self):
+        errors = []
+        line = 'a + b = c;'
+        PrattParser(Scanner(line).scan_tokens(), lambda token, message: errors.append(message)).parse()
+        assert errors == ["Invalid assignment target."]
+
+    def test_deep_nesting(self):
+        depth = 10000
+        line = '(' * depth + '1' + ')' * depth + ';'
+        node = PrattParser(Scanner(line).scan_tokens(), "").parse()[0].expression
+        for _ in range(depth):
+            assert isinstance(node, expr.Grouping)
+            node = node.expression
+        assert node.value == 1
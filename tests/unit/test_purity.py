@@ -0,0 +1,58 @@
+"""
+test.test_purity
+~~~~~~~~~~~~~~~~
+Test file for the analysis finding pure functions
+"""
+from pylox.parser import Parser
+from pylox.purity import Purity
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner
+
+
+def _pure(line):
+    """
+    :param line: lox source
+    :return: name -> pure of the top-level functions
+    """
+    statements = list(Resolver("").resolve(Parser(Scanner(line).scan_tokens(), "").parse()))
+    Purity().analyse(statements)
+    return {statement.name.lexeme: statement.pure for statement in statements
+            if hasattr(statement, "pure")}
+
+
+class TestPurity:
+    def test_pure(self):
+        assert _pure('fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); } \
+        fun sum(n) { var s = 0; for (var i = 0; i < n; i = i + 1) s = s + i; return s; }') == \
+            {"fib": True, "sum": True}
+
+    def test_mutual_recursion(self):
+        assert _pure('fun isOdd(n) { if (n == 0) return false; return isEven(n - 1); } \
+        fun isEven(n) { if (n == 0) return true; return isOdd(n - 1); }') == \
+            {"isOdd": True, "isEven": True}
+
+    def test_print(self):
+        assert _pure('fun f(n) { print n; return n; } fun g(n) { return f(n); }') == \
+            {"f": False, "g": False}
+
+    def test_collections(self):
+        assert _pure('fun f() { return [1]; } fun g(m) { return m["k"]; } \
+        fun h(n) { return n * 2; }') == {"f": False, "g": False, "h": True}
+
+    def test_captured_variables(self):
+        assert _pure('var count = 0; fun f() { count = count + 1; return count; } \
+        fun g() { return count; } fun h(a) { var count = a; count = count + 1; return count; }') \
+            == {"f": False, "g": False, "h": True}
+
+    def test_callees(self):
+        assert _pure('fun f(g) { return g(); } fun h() { return clock(); } \
+        fun k() { return k; } k = nil;') == {"f": False, "h": False, "k": False}
+
+    def test_nested_functions(self):
+        statements = list(Resolver("").resolve(Parser(Scanner(
+            'fun outer(n) { fun inner(m) { return m * 2; } return inner(n); } \
+            fun counter() { var i = 0; fun next() { i = i + 1; return i; } return next; }'
+        ).scan_tokens(), "").parse()))
+        Purity().analyse(statements)
+        assert statements[0].pure and statements[0].body[0].pure
+        assert not statements[1].pure and not statements[1].body[1].pure
@@ -0,0 +1,102 @@
+"""
+test.test_resolver
+~~~~~~~~~~~~~~~~
+Test file for the resolver
+"""
+import pytest
+from pylox.parser import Parser
+from pylox.resolver import Resolver, SHARED_SCOPE, REUSED_SCOPE, FRESH_SCOPE
+from pylox.scanner import Scanner
+
+
+def _error(location, message):
+    raise Exception(message)
+
+
+def _resolve(line):
+    statements = Parser(Scanner(line).scan_tokens(), "").parse()
+    return list(Resolver(_error).resolve(statements))
+
+
+class TestResolver:
+    def test_global(self):
+        ast = _resolve('var a = 1; print a;')
+        assert ast[0].slot is None
+        assert ast[1].expression.depth is None
+
+    def test_block_slots(self):
+        ast = _resolve('{ var a = 1; var b = 2; print b; }')
+        block = ast[0]
+        assert block.slots == 2
+        assert [statement.slot for statement in block.statements[:2]] == [0, 1]
+        variable = block.statements[2].expression
+        assert (variable.depth, variable.slot) == (0, 1)
+
+    def test_depth(self):
+        ast = _resolve('{ var a = 1; { var b = 2; { a = b; } } }')
+        assign = ast[0].statements[1].statements[1].statements[0].expression
+        # the innermost block declares nothing, so it has no scope
+        assert (assign.depth, assign.slot) == (1, 0)
+        assert (assign.value.depth, assign.value.slot) == (0, 0)
+
+    def test_scope_free_block(self):
+        ast = _resolve('fun f(n) { while (n > 0) { n = n - 1; } { { var a = n; } } }')
+        loop, outer = ast[0].body
+        assert not loop.body.scoped and loop.body.slots == 0
+        assert loop.body.statements[0].expression.depth == 0
+        assert not outer.scoped and outer.statements[0].scoped
+        assert outer.statements[0].statements[0].initializer.depth == 1
+
+    def test_function_params(self):
+        ast = _resolve('fun add(a, b) { var c = a + b; return c; }')
+        function = ast[0]
+        assert function.slot is None
+        assert function.slots == 3
+        assert function.body[0].slot == 2
+        assert function.body[0].initializer.right.slot == 1
+
+    def test_for_scope(self):
+        ast = _resolve('for (var i = 0; i < 1; i = i + 1) print i;')
+        assert ast[0].scope == SHARED_SCOPE
+        assert ast[0].condition.left.depth == 0
+        ast = _resolve('for (var i = 0; i < 1; i = i + 1) { var j = i; }')
+        assert ast[0].scope == REUSED_SCOPE
+        assert ast[0].body.statements[0].initializer.depth == 1
+        ast = _resolve('for (;;) { var j = 1; fun f() { print j; } }')
+        assert ast[0].scope == FRESH_SCOPE
+
+    def test_redeclare(self):
+        with pytest.raises(Exception, match="Already a variable"):
+            _resolve('{ var a = 1; var a = 2; }')
+
+    def test_own_initializer(self):
+        with pytest.raises(Exception, match="own initializer"):
+            _resolve('{ var a = a; }')
+
+    def test_top_level_return(self):
+        with pytest.raises(Exception, match="top-level"):
+            _resolve('return 1;')
+
+    def test_tail_calls(self):
+        ast = _resolve('fun f(n) { if (n) return f(n - 1); return 1 + f(n); } \
+        fun g() { return (f(1)); }')
+        assert ast[0].body[0].then_branch.tail
+        assert not ast[0].body[1].tail
+        assert not ast[1].body[0].tail
+
+    def test_this_and_super(self):
+        ast = _resolve('class A { m() { return this; } } \
+        class B < A { m() { fun f() { return super.m(); } return f; } }')
+        this = ast[0].methods[0].body[0].value
+        assert (this.depth, this.slot) == (1, 0)
+        method = ast[1].methods[0].body[0].body[0].value.callee
+        assert (method.depth, method.slot) == (3, 0)
+
+    def test_class_errors(self):
+        for line, message in (
+                ('print this;', "Cannot use 'this' outside of a class."),
+                ('class A { m() { return super.m(); } }', "no superclass"),
+                ('class A < A {}', "inherit from itself"),
+                ('class A { init() { return 1; } }', "Cannot return a value from an initializer.")):
+            with pytest.raises(Exception, match=message):
+                _resolve(line)
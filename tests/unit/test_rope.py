@@ -0,0 +1,36 @@
+"""
+test.test_rope
+~~~~~~~~~~~~~~~~
+Test file for rope strings
+"""
+from pylox.rope import Rope, ROPE_MIN, concat, flat
+from pylox.scanner import Scanner
+
+
+class TestRope:
+    def test_short_strings_joined(self):
+        assert concat("a", "b") == "ab"
+        assert type(concat("a", "b")) is str
+
+    def test_long_strings(self):
+        part = "x" * ROPE_MIN
+        rope = concat(part, "y")
+        assert type(rope) is Rope
+        assert len(rope) == ROPE_MIN + 1
+        assert rope == part + "y"
+        assert part + "y" == rope
+        assert hash(rope) == hash(part + "y")
+        assert str(concat("<", rope)) == "<" + part + "y"
+
+    def test_shared_parts(self):
+        base = concat("x" * ROPE_MIN, "-")
+        left = concat(base, "a")
+        right = concat(base, "b")
+        assert flat(left) == "x" * ROPE_MIN + "-a"
+        assert flat(right) == "x" * ROPE_MIN + "-b"
+        assert flat(base) == "x" * ROPE_MIN + "-"
+        assert concat(left, left) == flat(left) * 2
+
+    def test_interned_literals(self):
+        tokens = Scanner('"key" "key"').scan_tokens()
+        assert tokens[0].literal is tokens[1].literal
@@ -1,4 +1,4 @@
-from pylox.scanner import Scanner, TokenType
+from pylox.scanner import Scanner, TokenStream, TokenType
 
 
 class TestScannerStatement:
@@ -101,3 +101,104 @@ class TestScannerSingleChars:
         assert scanner.tokens[0].__dict__['type'] == TokenType.STAR
         assert scanner.tokens[1].__dict__['lexeme'] == ''
         assert scanner.tokens[1].__dict__['type'] == TokenType.EOF
+
+
+def _token_stream(tokens):
+    return [(t.type, t.lexeme, t.literal, t.line) for t in tokens]
+
+
+class TestBulkScanner:
+    def test_matches_scan_tokens(self):
+        line = 'var a = 1.5;\n// comment\nif (a >= 2 and a != 3) print "two\nlines";\n{ a = a / 2; }'
+        expected = _token_stream(Scanner(line).scan_tokens())
+        assert _token_stream(Scanner(line).scan_tokens_bulk()) == expected
+
+    def test_matches_examples(self):
+        for name in ("conditions", "functions", "loops"):
+            with open("example/{}.lox".format(name)) as f:
+                source = f.read()
+            expected = _token_stream(Scanner(source).scan_tokens())
+            assert _token_stream(Scanner(source).scan_tokens_bulk()) == expected
+
+    def test_operators(self):
+        line = '!= ! == = <= < >= >'
+        scanner = Scanner(line)
+        scanner.scan_tokens_bulk()
+        assert [t.type for t in scanner.tokens] == [
+            TokenType.BANG_EQUAL, TokenType.BANG, TokenType.EQUAL_EQUAL, TokenType.EQUAL,
+            TokenType.LESS_EQUAL, TokenType.LESS, TokenType.GREATER_EQUAL, TokenType.GREATER,
+            TokenType.EOF]
+
+    def test_keywords(self):
+        line = 'while whilst'
+        scanner = Scanner(line)
+        scanner.scan_tokens_bulk()
+        assert scanner.tokens[0].__dict__['type'] == TokenType.WHILE
+        assert scanner.tokens[1].__dict__['type'] == TokenType.IDENTIFIER
+        assert scanner.tokens[1].__dict__['lexeme'] == 'whilst'
+
+    def test_trailing_whitespace(self):
+        errors = []
+        for line in ('print 1;  ', 'print 1;\t\r', 'print 1;\n  '):
+            expected = _token_stream(Scanner(line).scan_tokens())
+            assert _token_stream(Scanner(line, lambda *error: errors.append(error)).scan_tokens_bulk()) == expected
+            buffer = Scanner(line, lambda *error: errors.append(error)).scan_buffer()
+            assert _token_stream(buffer[i] for i in range(len(buffer))) == expected
+        assert errors == []
+
+
+class TestTokenBuffer:
+    def test_matches_scan_tokens(self):
+        for name in ("conditions", "functions", "loops"):
+            with open("example/{}.lox".format(name)) as f:
+                source = f.read()
+            expected = _token_stream(Scanner(source).scan_tokens())
+            buffer = Scanner(source).scan_buffer()
+            assert len(buffer) == len(expected)
+            assert _token_stream(buffer[i] for i in range(len(buffer))) == expected
+
+    def test_lazy_literals(self):
+        buffer = Scanner('print "hi" + 2.5;').scan_buffer()
+        assert buffer.type_at(1) == TokenType.STRING
+        assert buffer.lexeme(1) == '"hi"'
+        assert buffer.literal(1) == 'hi'
+        assert buffer.literal(3) == 2.5
+        assert buffer.literal(0) is None
+
+    def test_eof_line(self):
+        buffer = Scanner('a;\nb;\n').scan_buffer()
+        assert buffer.type_at(len(buffer) - 1) == TokenType.EOF
+        assert buffer.lines[len(buffer) - 1] == 3
+        assert buffer.lexeme(len(buffer) - 1) == ''
+
+
+class TestScanChunks:
+    def test_matches_scan_tokens(self):
+        with open("example/functions.lox") as f:
+            source = f.read()
+        expected = _token_stream(Scanner(source).scan_tokens())
+        for size in (1, 2, 3, 7, 64):
+            chunks = [source[i:i + size] for i in range(0, len(source), size)]
+            assert _token_stream(Scanner().scan_chunks(chunks)) == expected
+
+    def test_lexeme_split_across_chunks(self):
+        tokens = list(Scanner().scan_chunks(['var ab', 'c = 1', '2.5 ', '=', '= "x', '\ny"; /', '/ note']))
+        assert [t.lexeme for t in tokens] == ['var', 'abc', '=', '12.5', '==', '"x\ny"', ';', '']
+        assert tokens[5].line == 2
+
+    def test_number_split_at_decimal_point(self):
+        tokens = list(Scanner().scan_chunks(['print 12.', '5;']))
+        assert [(t.type, t.literal) for t in tokens[1:3]] == [(TokenType.NUMBER, 12.5),
+                                                              (TokenType.SEMICOLON, None)]
+        tokens = list(Scanner().scan_chunks(['a.', 'b 1', '.', '25']))
+        assert [t.lexeme for t in tokens] == ['a', '.', 'b', '1.25', '']
+
+
+class TestTokenStream:
+    def test_window(self):
+        stream = TokenStream(Scanner().scan_chunks(['a + b;']))
+        assert stream[0].lexeme == 'a'
+        assert stream[1].lexeme == '+'
+        assert stream[2].lexeme == 'b'
+        assert stream[1].lexeme == '+'
+        assert stream[4].type == TokenType.EOF
@@ -0,0 +1,61 @@
+"""
+test.test_specializer
+~~~~~~~~~~~~~~~~
+Test file for node specialization
+"""
+import operator
+from pylox.interpreter import Interpreter
+from pylox.parser import Parser
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner, TokenType
+from pylox.specializer import GENERIC, Specializer
+
+
+def _run(line, interpreter):
+    statements = list(Resolver("").resolve(Parser(Scanner(line).scan_tokens(), "").parse()))
+    interpreter.interpret(statements)
+    return statements
+
+
+class TestSpecializer:
+    def test_specialize(self, capsys):
+        interpreter = Interpreter()
+        interpreter.specializer = Specializer(specialize_after=3)
+        statements = _run('fun add(a, b) { return a + b; } \
+        var s = 0; for (var i = 0; i < 5; i = i + 1) s = add(s, i); print s;', interpreter)
+        add = statements[0].body[0].value
+        assert add.specialization == ((TokenType.PLUS, float, float), operator.add)
+        assert interpreter.specializer.hits > 0
+        out, _ = capsys.readouterr()
+        assert out == "10.0\n"
+
+    def test_deoptimize(self, capsys):
+        interpreter = Interpreter()
+        interpreter.specializer = Specializer(specialize_after=2, max_deopts=2)
+        statements = _run('fun add(a, b) { return a + b; } \
+        print add(1, 2); print add(1, 2); print add("a", "b"); print add(1, 2); print add(1, 2); \
+        print add("a", "b"); print add(1, "b");', interpreter)
+        add = statements[0].body[0].value
+        assert add.specialization is None
+        assert add.feedback is GENERIC
+        assert interpreter.specializer.deopts == 2
+        out, _ = capsys.readouterr()
+        assert out == "3.0\n3.0\nab\n3.0\n3.0\nab\nNone\n"
+
+    def test_unary_and_logical(self, capsys):
+        interpreter = Interpreter()
+        interpreter.specializer = Specializer(specialize_after=1)
+        statements = _run('fun f(a) { return !a or -1; } print f(false); print f(false); \
+        print f(nil); print f(true);', interpreter)
+        logical = statements[0].body[0].value
+        assert logical.left.specialization is not None
+        out, _ = capsys.readouterr()
+        assert out == "True\nTrue\nTrue\n-1.0\n"
+
+    def test_statistics(self):
+        interpreter = Interpreter()
+        _run('var i = 0; while (i < 20) i = i + 1;', interpreter)
+        statistics = interpreter.statistics()
+        assert statistics["specializations"] == 2
+        assert 0 < statistics["hit rate"] < 1
+        assert statistics["deopt rate"] == 0
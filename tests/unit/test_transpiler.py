@@ -0,0 +1,77 @@
+"""
+test.test_transpiler
+~~~~~~~~~~~~~~~~
+Test file for the Lox to Python transpiler
+"""
+import ast
+import warnings
+import pytest
+from pylox.parser import Parser
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner
+from pylox.transpiler import Transpiler, TranspiledInterpreter
+
+
+def _resolve(line):
+    return Resolver("").resolve(Parser(Scanner(line).scan_tokens(), "").parse())
+
+
+def _run(line, interpreter=None):
+    interpreter = interpreter or TranspiledInterpreter()
+    interpreter.interpret(_resolve(line))
+    return interpreter
+
+
+class TestTranspiler:
+    def test_names(self):
+        source = ast.unparse(Transpiler().transpile(_resolve('var a = 1; { var b = a; var a = b; }')))
+        assert "v_a = 1.0" in source
+        assert "v1_b = v_a" in source
+        assert "v2_a = v1_b" in source
+
+    def test_global_assignment_checked(self):
+        with pytest.raises(Exception, match="Undefined variable 'b'.\n\\[line 2\\]"):
+            _run('var a = 1;\nb = a;')
+
+    def test_assign_enclosing(self, capsys):
+        _run('fun f() { var n = 0; fun g() { n = n + 1; } g(); g(); print n; } f();')
+        out, _ = capsys.readouterr()
+        assert out == "2.0\n"
+
+    def test_loop_closures(self, capsys):
+        _run('fun f() { var fs = nil; var i = 0; while (i < 3) { var j = i; \
+        fun g() { return j; } if (i == 1) fs = g; if (i == 2) return fs; i = i + 1; } } \
+        print f()();')
+        out, _ = capsys.readouterr()
+        assert out == "1.0\n"
+
+    def test_error_line(self):
+        with pytest.raises(Exception, match="Operands must be numbers.\n\\[line 3\\]"):
+            _run('fun f(a) {\n return a\n < "b"; }\nf(1);')
+
+    def test_arity(self):
+        with pytest.raises(Exception, match="Expected 2 arguments, but got 1."):
+            _run('fun f(a, b) {} f(1);')
+
+    def test_namespace_shared(self, capsys):
+        interpreter = _run('fun f() { return "x"; }')
+        _run('print f() + f(); print f;', interpreter)
+        out, _ = capsys.readouterr()
+        assert out == "xx\n<fn f>\n"
+
+    def test_classes(self, capsys):
+        interpreter = _run('class A { init(n) { this.n = n; if (n > 1) return; this.n = 0; } \
+        get() { fun g() { return this.n; } return g; } } \
+        class B < A { get() { return super.get(); } }')
+        _run('var b = B(1); print b.get()(); b.n = 2; print b.get()(); print B(3).n; \
+        print b.get; print A;', interpreter)
+        out, _ = capsys.readouterr()
+        assert out == "0.0\n2.0\n3.0\n<fn get>\nA\n"
+        assert interpreter.statistics()["property cache hits"] > 0
+
+    def test_no_python_warnings(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            with pytest.raises(Exception, match="Can only call functions and classes."):
+                _run('"x"();')
+        assert caught == []
@@ -0,0 +1,54 @@
+"""
+test.test_vector
+~~~~~~~~~~~~~~~~
+Test file for numeric vectors
+"""
+import pytest
+from pylox.error import LoxRuntimeError
+from pylox.lox import Lox
+from pylox.vector import Vector, vector, arithmetic, dot, part, total
+
+
+def _numbers(values):
+    return [float(value) for value in values.values]
+
+
+class TestVector:
+    def test_arithmetic(self):
+        left = vector([1.0, 2.0, 3.0])
+        right = vector([4.0, 5.0, 6.0])
+        assert _numbers(arithmetic("+", left, right)) == [5.0, 7.0, 9.0]
+        assert _numbers(arithmetic("-", left, 1.0)) == [0.0, 1.0, 2.0]
+        assert _numbers(arithmetic("/", 6.0, left)) == [6.0, 3.0, 2.0]
+        assert _numbers(arithmetic("*", left, right)) == [4.0, 10.0, 18.0]
+
+    def test_errors(self):
+        for left, operator, right, message in (
+                (vector([1.0]), "+", vector([1.0, 2.0]), "Vectors must have the same length."),
+                (vector([1.0]), "+", "a", "Operands must be numbers or vectors."),
+                (vector([1.0]), "/", 0.0, "Division by zero.")):
+            with pytest.raises(LoxRuntimeError) as error:
+                arithmetic(operator, left, right)
+            assert error.value.message == message
+
+    def test_reductions(self):
+        values = vector([1.0, 2.0, 3.0])
+        assert total(values) == 6.0
+        assert dot(values, values) == 14.0
+        assert _numbers(part(values, 1, 3)) == [2.0, 3.0]
+        assert str(values) == "vec(1.0, 2.0, 3.0)"
+        assert isinstance(part(values, 0, 1), Vector)
+
+    def test_natives(self, capsys):
+        Lox().run('var a = vec(1, 2, 3); fun half(x) { return x / 2; } \
+        print map(half, a) * 2 + a; print sum(slice(a, 1, 3)); print len(vec());')
+        out, _ = capsys.readouterr()
+        assert out == "vec(2.0, 4.0, 6.0)\n5.0\n0.0\n"
+
+    def test_binary_errors(self):
+        with pytest.raises(Exception, match=r"Vectors must have the same length.\n\[line 2\]"):
+            Lox().run('var a = vec(1, 2);\nprint a - vec(1);')
+        with pytest.raises(Exception, match=r"Operands must be numbers."):
+            Lox().run('print vec(1) < 2;')
+        with pytest.raises(Exception, match=r"Argument must be a vector."):
+            Lox().run('print sum(1);')
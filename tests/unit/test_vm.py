@@ -0,0 +1,73 @@
+"""
+test.test_vm
+~~~~~~~~~~~~~~~~
+Test file for the virtual machine
+"""
+import pytest
+from pylox.parser import Parser
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner
+from pylox.vm import VM
+
+
+def _run(line, vm=None):
+    statements = Parser(Scanner(line).scan_tokens(), "").parse()
+    vm = vm or VM()
+    vm.interpret(Resolver("").resolve(statements))
+    return vm
+
+
+class TestVM:
+    def test_closed_upvalues(self, capsys):
+        _run('fun counter() { var n = 0; fun inc() { n = n + 1; return n; } return inc; } \
+        var a = counter(); var b = counter(); a(); a(); b(); print a(); print b();')
+        out, _ = capsys.readouterr()
+        assert out == "3.0\n2.0\n"
+
+    def test_shared_upvalue(self, capsys):
+        _run('var get; var set; { var x = 1; fun g() { return x; } fun s(v) { x = v; } \
+        get = g; set = s; } set(5); print get();')
+        out, _ = capsys.readouterr()
+        assert out == "5.0\n"
+
+    def test_globals_persist(self, capsys):
+        vm = _run('var a = "x";')
+        _run('print a + a;', vm)
+        out, _ = capsys.readouterr()
+        assert out == "xx\n"
+
+    def test_stack_reset_after_error(self, capsys):
+        vm = VM()
+        with pytest.raises(Exception, match=r"Operands must be numbers.\n\[line 1\]"):
+            _run('fun f() { return 1 - "a"; } f();', vm)
+        _run('print 1;', vm)
+        out, _ = capsys.readouterr()
+        assert out == "1.0\n"
+
+    def test_stack_overflow(self):
+        with pytest.raises(Exception, match="Stack overflow."):
+            _run('fun f() { f(); } f();')
+
+    def test_not_callable(self):
+        with pytest.raises(Exception, match="Can only call functions and classes."):
+            _run('"a"();')
+
+    def test_deep_recursion(self, capsys):
+        _run('fun isOdd(n) { if (n == 0) return false; return isEven(n - 1); } \
+        fun isEven(n) { if (n == 0) return true; return isOdd(n - 1); } print isEven(20000);')
+        out, _ = capsys.readouterr()
+        assert out == "True\n"
+
+    def test_max_depth(self, capsys):
+        vm = VM(max_depth=11)
+        _run('fun down(n) { if (n > 0) down(n - 1); } down(9);', vm)
+        with pytest.raises(Exception, match=r"Stack overflow.\n\[line 1\]"):
+            _run('down(10);', vm)
+
+    def test_classes(self, capsys):
+        vm = _run('fun make() { class A { init(n) { this.n = n; } get() { fun g() { return this.n; } \
+        return g; } } class B < A { get() { return super.get(); } } return B; } \
+        var B = make(); var b = B(1); print b.get()(); b.n = 2; print b.get()(); print B(3).n;')
+        out, _ = capsys.readouterr()
+        assert out == "1.0\n2.0\n3.0\n"
+        assert vm.statistics()["property cache hits"] > 0